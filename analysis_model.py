@@ -0,0 +1,352 @@
+"""Compiled, read-only analysis model shared by every tarot reading.
+
+The keyword tables and the VADER lexicon are fixed for the life of the
+process, so they are built once and handed to every request thread instead
+of being rebuilt inside each ``analyze_personality`` call.
+"""
+import threading
+from types import MappingProxyType
+
+from keyword_matcher import KeywordMatcher
+
+THEME_KEYWORDS = {
+    # Professional Growth
+    'technical_growth': {
+        # Core Tech
+        'code', 'programming', 'dev', 'data', 'ai', 'software', 'engineering', 'technology', 
+        'coding', 'development',
+        # Modern Tech Stack
+        'machine learning', 'blockchain', 'cloud', 'devops', 'frontend', 'backend', 'fullstack',
+        'python', 'javascript', 'typescript', 'react', 'node', 'kubernetes', 'docker',
+        # Emerging Tech
+        'web3', 'crypto', 'nft', 'artificial intelligence', 'neural networks', 'deep learning',
+        'cybersecurity', 'iot', 'quantum', 'ar', 'vr', 'metaverse', 'generative ai'
+    },
+    'professional_development': {
+        # Career
+        'career', 'job', 'work', 'professional', 'business', 'industry', 'corporate', 
+        'startup', 'entrepreneur', 'leadership', 'management',
+        # Modern Workplace
+        'remote work', 'hybrid', 'digital nomad', 'freelance', 'side hustle', 'passive income',
+        'personal brand', 'networking', 'mentorship', 'career change', 'upskilling',
+        # Business Focus
+        'saas', 'b2b', 'b2c', 'product', 'marketing', 'sales', 'growth hacking',
+        'venture capital', 'funding', 'bootstrapping', 'monetization', 'roi'
+    },
+    # Personal Growth
+    'education': {
+        'learning', 'study', 'education', 'course', 'degree', 'university', 'college',
+        'school', 'knowledge', 'skills', 'training', 'workshop', 'lecture', 'seminar',
+        'academia', 'scholarship', 'research', 'thesis', 'dissertation', 'homework',
+        'assignment', 'exam', 'test', 'quiz', 'grading', 'professor', 'teacher', 'instructor',
+        'student', 'classroom', 'textbook', 'library', 'lab', 'experiment', 'fieldwork',
+        'internship', 'apprenticeship', 'diploma', 'certificate', 'graduation', 'alumni',
+
+        'mooc', 'online course', 'bootcamp', 'certification', 'self-taught', 'tutorial',
+        'documentation', 'learning path', 'roadmap', 'curriculum', 'mentoring', 'coaching',
+        'e-learning', 'virtual classroom', 'webinar', 'online degree', 'distance learning',
+        'self-paced learning', 'microlearning', 'gamification', 'interactive learning',
+        'peer learning', 'collaborative learning', 'project-based learning', 'flipped classroom',
+        'blended learning', 'adaptive learning', 'lifelong learning', 'skill development',
+        'critical thinking', 'problem solving', 'creativity', 'innovation', 'soft skills',
+        'technical skills', 'coding', 'programming', 'data science', 'machine learning',
+        'artificial intelligence', 'cybersecurity', 'cloud computing', 'devops', 'ui/ux design',
+
+        'udemy', 'coursera', 'edx', 'linkedin learning', 'pluralsight', 'codecademy',
+        'khan academy', 'skillshare', 'udacity', 'futurelearn', 'alison', 'duolingo',
+        'memrise', 'brilliant', 'datacamp', 'treehouse', 'freecodecamp', 'kaggle',
+        'leetcode', 'hackerrank', 'codewars', 'edmodo', 'google classroom', 'moodle',
+        'canvas', 'blackboard', 'zoom', 'teams', 'slack', 'notion', 'evernote', 'anki',
+        'quizlet', 'rosetta stone', 'babbel', 'busuu', 'lingoda', 'sololearn', 'grasshopper',
+        'scratch', 'code.org', 'w3schools', 'mdn web docs', 'stack overflow', 'github',
+        'gitlab', 'bitbucket', 'docker', 'kubernetes', 'aws', 'azure', 'google cloud',
+        'visual studio code', 'pycharm', 'intellij', 'jupyter notebook', 'rstudio',
+        'tableau', 'power bi', 'figma', 'adobe xd', 'sketch', 'invision', 'miro', 'trello',
+        'asana', 'clickup', 'notion', 'obsidian', 'roam research', 'logseq', 'remnote',
+        'zotero', 'mendeley', 'endnote', 'grammarly', 'hemingway', 'prowritingaid',
+        'google scholar', 'researchgate', 'academia.edu', 'arxiv', 'ieee xplore', 'jstor',
+        'pubmed', 'springer', 'elsevier', 'wiley', 'sage', 'taylor & francis', 'oxford academic',
+        'cambridge core', 'nature', 'science', 'cell', 'plos one', 'frontiers', 'bmc'
+    },
+    'self_improvement': {
+        # Growth
+        'growth', 'goals', 'progress', 'improvement', 'development', 'motivation',
+        'inspiration', 'success', 'achievement', 'mindset',
+        # Modern Self-Help
+        'productivity', 'time management', 'habit building', 'morning routine',
+        'journaling', 'goal setting', 'accountability', 'personal development',
+        # Mental Models
+        'decision making', 'critical thinking', 'problem solving', 'cognitive bias',
+        'systems thinking', 'first principles', 'mental models'
+        # Modern Self-Help
+        'productivity', 'time management', 'habit building', 'morning routine',
+        'journaling', 'goal setting', 'accountability', 'personal development',
+        'life design', 'habit stacking', 'deep work', 'flow state', 'focus',
+        'minimalism', 'digital declutter', 'time blocking', 'batching',
+        'intentional living', 'lifestyle design', 'self-optimization',
+
+        # Mental Models
+        'decision making', 'critical thinking', 'problem solving', 'cognitive bias',
+        'systems thinking', 'first principles', 'mental models', 'lateral thinking',
+        'strategic planning', 'root cause analysis', 'framework thinking',
+        'probabilistic thinking', 'inversion', 'second-order thinking',
+        'thought experiments', 'rationality', 'metacognition'
+    },
+    # Lifestyle & Interests
+    'health_wellness': {
+        # Physical Health
+        'health', 'fitness', 'exercise', 'yoga', 'meditation', 'mindfulness', 'wellness',
+        'nutrition', 'diet', 'mental health', 'self-care',
+        # Modern Wellness
+        'biohacking', 'intermittent fasting', 'keto', 'plant-based', 'supplements',
+        'sleep optimization', 'recovery', 'stress management', 'immune system',
+        # Mental Wellness
+        'therapy', 'counseling', 'anxiety', 'depression', 'burnout', 'work-life balance',
+        'digital wellbeing', 'mental fitness', 'emotional intelligence'
+        # Modern Wellness
+        'biohacking', 'intermittent fasting', 'keto', 'plant-based', 'supplements',
+        'sleep optimization', 'recovery', 'stress management', 'immune system',
+        'cold therapy', 'heat therapy', 'breathwork', 'circadian rhythm',
+        'hormesis', 'microbiome', 'nootropics', 'peptides', 'longevity',
+        'blood testing', 'wearable technology',
+
+        # Mental Wellness
+        'therapy', 'counseling', 'anxiety', 'depression', 'burnout', 'work-life balance',
+        'digital wellbeing', 'mental fitness', 'emotional intelligence',
+        'mindset coaching', 'positive psychology', 'cognitive behavioral therapy',
+        'trauma-informed care', 'stress resilience', 'boundary setting',
+        'self-compassion', 'emotional regulation', 'psychological safety'
+    },
+    'creativity_arts': {
+        # Traditional Arts
+        'art', 'music', 'photography', 'writing', 'creative', 'design', 'drawing',
+        'painting', 'dance', 'film', 'poetry', 'craft',
+        # Digital Arts
+        'digital art', 'graphic design', '3d modeling', 'animation', 'motion graphics',
+        'ui design', 'ux design', 'web design', 'illustration', 'video editing',
+        # Creative Tech
+        'generative art', 'creative coding', 'procedural generation', 'digital sculpture',
+        'virtual production', 'creative ai', 'nft art'
+        # Digital Arts
+        'digital art', 'graphic design', '3d modeling', 'animation', 'motion graphics',
+        'ui design', 'ux design', 'web design', 'illustration', 'video editing',
+        'digital painting', 'character design', 'concept art', 'typography',
+        'visual effects', 'compositing', 'color grading', 'digital composition',
+        'parametric design', 'interactive design',
+
+        # Creative Tech
+        'generative art', 'creative coding', 'procedural generation', 'digital sculpture',
+        'virtual production', 'creative ai', 'nft art', 'augmented reality',
+        'virtual reality', 'mixed reality', 'algorithmic art', 'shader art',
+        'real-time graphics', 'projection mapping', 'interactive installations',
+        'data visualization', 'sound design', 'experimental media'
+    },
+    'travel_adventure': {
+        # Travel
+        'travel', 'adventure', 'explore', 'journey', 'wanderlust', 'vacation', 'trip',
+        'destination', 'culture', 'experience',
+        # Modern Travel
+        'digital nomad', 'workation', 'slow travel', 'sustainable travel', 'local experience',
+        'travel hacking', 'remote work travel', 'vanlife', 'backpacking',
+        # Adventure Sports
+        'hiking', 'camping', 'climbing', 'surfing', 'skydiving', 'scuba diving',
+        'mountaineering', 'skiing', 'snowboarding'
+        # Modern Travel
+        'digital nomad', 'workation', 'slow travel', 'sustainable travel', 'local experience',
+        'travel hacking', 'remote work travel', 'vanlife', 'backpacking',
+        'house sitting', 'coworking abroad', 'travel blogging', 'minimalist travel',
+        'destination coworking', 'travel photography', 'travel vlogging',
+        'location independence', 'geo arbitrage', 'travel rewards',
+
+        # Adventure Sports
+        'hiking', 'camping', 'climbing', 'surfing', 'skydiving', 'scuba diving',
+        'mountaineering', 'skiing', 'snowboarding', 'paragliding', 'white water rafting',
+        'kayaking', 'canyoneering', 'bouldering', 'ice climbing', 'wingsuit flying',
+        'kiteboarding', 'mountain biking', 'trail running', 'free diving'
+    },
+    # Social & Community
+    'relationships': {
+        # Personal
+        'family', 'friends', 'relationship', 'love', 'partner', 'marriage', 'dating',
+        'social', 'community', 'connection', 'support',
+        # Modern Dating
+        'online dating', 'dating apps', 'virtual dating', 'long distance', 'relationship goals',
+        'conscious relationships', 'attachment styles', 'boundaries',
+        # Community Building
+        'community management', 'online communities', 'discord', 'slack', 'meetups',
+        'networking events', 'mentorship', 'accountability partners'
+    },
+    'emotional_depth': {
+        # Core Emotions
+        'happy', 'joyful', 'delighted', 'elated', 'ecstatic', 'jubilant', 'cheerful', 'blissful',
+        'content', 'pleased', 'thrilled', 'overjoyed', 'radiant', 'beaming', 'glowing', 'uplifted',
+        'sad', 'melancholy', 'heartbroken', 'blue', 'down', 'depressed', 'gloomy', 'sorrowful',
+        'grieving', 'mourning', 'tearful', 'hurting', 'devastated', 'lonely', 'hopeless', 'despair',
+        'angry', 'frustrated', 'irritated', 'furious', 'outraged', 'enraged', 'bitter', 'resentful',
+        'indignant', 'irate', 'hostile', 'annoyed', 'agitated', 'exasperated', 'livid', 'seething',
+        
+        # Complex Emotions
+        'grateful', 'thankful', 'blessed', 'appreciative', 'moved', 'touched', 'humbled', 'honored',
+        'indebted', 'recognized', 'valued', 'cherished', 'acknowledged', 'supported', 'seen', 'heard',
+        'love', 'adore', 'cherish', 'treasure', 'devoted', 'smitten', 'passionate', 'affectionate',
+        'tender', 'fond', 'warmth', 'caring', 'romantic', 'intimate', 'attached', 'connected',
+        'excited', 'eager', 'anticipating', 'hopeful', 'optimistic', 'enthusiastic', 'motivated',
+        'inspired', 'driven', 'ambitious', 'determined', 'focused', 'ready', 'energized',
+        
+        # Emotional Growth & Resilience
+        'strong', 'resilient', 'brave', 'courageous', 'persevering', 'enduring', 'tenacious',
+        'hardy', 'tough', 'unbreakable', 'steadfast', 'persistent', 'resolute', 'unwavering',
+        'vulnerable', 'open', 'authentic', 'raw', 'honest', 'exposed', 'sensitive', 'fragile',
+        'delicate', 'tender', 'emotional', 'genuine', 'transparent', 'real', 'true', 'unguarded',
+        
+        # Empathy & Connection
+        'understanding', 'compassionate', 'empathetic', 'sympathetic', 'caring', 'kind',
+        'considerate', 'thoughtful', 'nurturing', 'supportive', 'helping', 'comforting',
+        'consoling', 'validating', 'accepting', 'embracing', 'bonded', 'close', 'united',
+        'together', 'belonging', 'welcomed', 'understood',
+        
+        # Transformation & Healing
+        'transforming', 'evolving', 'growing', 'changing', 'developing', 'progressing',
+        'learning', 'improving', 'advancing', 'expanding', 'flourishing', 'thriving',
+        'blooming', 'blossoming', 'emerging', 'becoming', 'healing', 'recovering', 'mending',
+        'restoring', 'renewing', 'rebuilding', 'processing', 'overcoming', 'surviving',
+        'coping', 'adapting', 'reconciling', 'accepting', 'forgiving', 'releasing',
+        
+        # Common Expression Words
+        'feel', 'feeling', 'felt', 'emotion', 'mood', 'spirit', 'heart', 'soul',
+        'mind', 'peace', 'calm', 'storm', 'light', 'dark', 'deep', 'shallow',
+        'high', 'low', 'up', 'down', 'better', 'worse', 'good', 'bad',
+        'positive', 'negative', 'intense', 'mild', 'strong', 'weak'
+    },
+    'social_causes': {
+        # Traditional Causes
+        'environment', 'sustainability', 'climate', 'social justice', 'equality',
+        'diversity', 'inclusion', 'activism', 'volunteer',
+        # Modern Movements
+        'climate tech', 'renewable energy', 'zero waste', 'circular economy',
+        'ethical consumption', 'fair trade', 'social impact', 'green tech',
+        # Social Issues
+        'mental health awareness', 'lgbtq+ rights', 'racial justice', 'gender equality',
+        'accessibility', 'digital privacy', 'tech ethics', 'responsible ai'
+    },
+    # Entertainment & Media
+    'entertainment': {
+        # Traditional
+        'movie', 'film', 'tv', 'show', 'series', 'game', 'gaming', 'book',
+        'reading', 'literature', 'podcast', 'entertainment',
+        # Modern Gaming
+        'esports', 'streaming', 'twitch', 'youtube', 'content creation',
+        'indie games', 'mobile gaming', 'vr gaming', 'game development',
+        # Digital Media
+        'streaming services', 'podcasting', 'audiobooks', 'digital content',
+        'social media', 'influencer', 'creator economy', 'live streaming'
+    },
+    'sports': {
+        # Traditional Sports
+        'sports', 'football', 'basketball', 'soccer', 'tennis', 'athlete',
+        'team', 'competition', 'fitness', 'workout',
+        # Modern Sports
+        'esports', 'fantasy sports', 'sports analytics', 'sports tech',
+        'sports science', 'performance tracking', 'sports medicine',
+        # Fitness Tech
+        'wearables', 'fitness apps', 'smart equipment', 'virtual coaching',
+        'connected fitness', 'fitness tracking', 'home gym'
+    }
+}
+
+
+class AnalysisModel:
+    """Immutable keyword tables plus the sentiment analyzer used to score tweets."""
+
+    __slots__ = (
+        'themes', 'theme_keywords', 'keyword_counts', 'matcher', 'keywords',
+        'theme_membership', 'theme_weights', 'theme_sizes', 'sentiment_analyzer'
+    )
+
+    def __init__(self, theme_keywords, sentiment_analyzer):
+        # Theme order is significant: it decides tie-breaks between themes
+        # with equal scores in the dominant theme ranking.
+        self.themes = tuple(theme_keywords)
+        self.theme_keywords = MappingProxyType({
+            theme: frozenset(keywords) for theme, keywords in theme_keywords.items()
+        })
+        self.keyword_counts = MappingProxyType({
+            theme: len(keywords) for theme, keywords in self.theme_keywords.items()
+        })
+        # Reverse index so one scan's matches can be credited to every theme
+        keyword_themes = {}
+        for theme in self.themes:
+            for keyword in self.theme_keywords[theme]:
+                keyword_themes.setdefault(keyword, []).append(theme)
+        self.matcher = KeywordMatcher(keyword_themes)
+
+        import numpy as np
+
+        # Keyword IDs from the matcher index the columns of tweet x keyword
+        # count matrices; these (keywords x themes) matrices project them
+        # onto the themes
+        self.keywords = self.matcher.keywords
+        membership = np.zeros((len(self.keywords), len(self.themes)))
+        theme_index = {theme: index for index, theme in enumerate(self.themes)}
+        for keyword_id, keyword in enumerate(self.keywords):
+            for theme in keyword_themes[keyword]:
+                membership[keyword_id, theme_index[theme]] = 1
+        # More weight for multi-word matches
+        weights = np.array([2 if ' ' in keyword else 1 for keyword in self.keywords], dtype=np.float64)
+        self.theme_membership = membership
+        self.theme_weights = membership * weights[:, None]
+        self.theme_sizes = np.array([self.keyword_counts[theme] for theme in self.themes], dtype=np.float64)
+        for matrix in (self.theme_membership, self.theme_weights, self.theme_sizes):
+            matrix.flags.writeable = False
+
+        self.sentiment_analyzer = sentiment_analyzer
+
+    def theme_scores(self, counts):
+        """Weighted theme scores and matched-keyword counts for keyword counts.
+
+        ``counts`` is a dense keyword-count vector, or a (rows x keywords)
+        array of them. Returns two arrays with a column per theme, in
+        ``themes`` order: the weighted keyword occurrences and the number of
+        distinct keywords matched.
+        """
+        return counts @ self.theme_weights, (counts > 0) @ self.theme_membership
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def compact_sentiment_analyzer(analyzer):
+    """Shrink a VADER analyzer's lexicon in place and return the analyzer.
+
+    The analyzer keeps both lexicon files' raw text after parsing them, and
+    its ~7,500 valences hold only a few dozen distinct values. Dropping the
+    text and sharing one float object per value leaves less memory per
+    process, and far fewer objects whose reference counts dirty
+    copy-on-write pages in forked workers on every lookup.
+    """
+    analyzer.lexicon_full_filepath = ""
+    analyzer.emoji_full_filepath = ""
+    valences = {}
+    analyzer.lexicon = {
+        word: valences.setdefault(valence, valence) for word, valence in analyzer.lexicon.items()
+    }
+    return analyzer
+
+
+def build_analysis_model():
+    """Build a fresh analysis model, loading the VADER lexicon."""
+    # Imported here so processes only pay for VADER once they build a model
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    return AnalysisModel(THEME_KEYWORDS, compact_sentiment_analyzer(SentimentIntensityAnalyzer()))
+
+
+def get_analysis_model():
+    """Return the process-wide analysis model, building it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = build_analysis_model()
+    return _model
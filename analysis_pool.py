@@ -0,0 +1,111 @@
+"""Optional process pool for tweet featurization.
+
+Keyword scanning and VADER scoring are pure Python, so under threaded
+serving the featurization of concurrent readings is serialized by the GIL.
+With ``ANALYSIS_WORKERS`` > 0 the texts are sent to a pool of worker
+processes instead. Each serving process gets its own pool, created on first
+use or by ``start``, never in a parent that only preloads the app. Workers
+are started with forkserver (or spawn) rather than forked from a process
+that may already run threads, and each builds its analysis model once, in
+the pool initializer.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis_model import get_analysis_model
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    get_analysis_model()
+
+
+def _featurize_texts(texts):
+    """Worker side: ``(keyword_counts, word_count, sentiment)`` for each lower-cased text."""
+    model = get_analysis_model()
+    results = []
+    for text in texts:
+        keyword_counts, word_count = model.matcher.scan_ids(text)
+        sentiment = model.sentiment_analyzer.polarity_scores(text)['compound']
+        results.append((keyword_counts, word_count, sentiment))
+    return results
+
+
+def _ping():
+    return True
+
+
+class AnalysisPool:
+    """Featurizes batches of texts on ``workers`` processes.
+
+    Batches are split into at most one chunk per worker, but never into
+    chunks smaller than ``min_chunk`` texts, where the IPC round trip would
+    cost more than the work.
+    """
+
+    def __init__(self, workers, start_method=None, min_chunk=8):
+        self.workers = workers
+        self.start_method = start_method
+        self.min_chunk = min_chunk
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _context(self):
+        start_method = self.start_method
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        return multiprocessing.get_context(start_method)
+
+    def _current(self):
+        # Built in the process that uses it; one inherited through fork (e.g.
+        # by preloaded gunicorn workers) has no management thread in the child
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=self._context(),
+                        initializer=_init_worker
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        """Start this process's workers now and wait until each has its model loaded."""
+        if not self.enabled:
+            return
+        executor = self._current()
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        logger.info("Analysis pool started with %d workers", self.workers)
+
+    def featurize(self, texts):
+        """``(keyword_counts, word_count, sentiment)`` for each lower-cased text, in order."""
+        if not texts:
+            return []
+        chunk = max(self.min_chunk, math.ceil(len(texts) / self.workers))
+        executor = self._current()
+        futures = [
+            executor.submit(_featurize_texts, texts[start:start + chunk])
+            for start in range(0, len(texts), chunk)
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def shutdown(self):
+        """Stop this process's workers; the next batch starts new ones."""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._pid = None
@@ -0,0 +1,158 @@
+"""Async entry point serving ``/user/tweets`` and ``/user/tarot-reading``.
+
+Upstream RapidAPI calls go through ``aiohttp`` on the event loop, so a
+reading waiting on the network holds no thread. Tokenizing, scoring and
+card selection are dispatched to a thread pool (and from there to the
+analysis process pool when ``ANALYSIS_WORKERS`` is set), so they never
+block the loop. Responses have the same JSON shapes as the Flask routes,
+and the caches, tweet store and percentile index are the ones the Flask app
+uses.
+
+    python async_app.py
+    gunicorn async_app:app --worker-class aiohttp.GunicornWebWorker
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from aiohttp import web
+
+import async_client
+import metrics
+import rapidapi
+import tweet_provider
+from fetch_tweets import LAZY_STARTUP, finish_reading, fold_page, hot_cached_reading, tweet_store, warm_up
+from singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the upstream call failed, like RequestException in the Flask apps
+UPSTREAM_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+cpu_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ASYNC_CPU_WORKERS", 4)),
+    thread_name_prefix="tarot-cpu"
+)
+
+reading_flights = AsyncSingleFlight("reading")
+
+
+async def run_cpu(fn, *args):
+    """Run CPU-bound work on the CPU pool without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor, fn, *args)
+
+
+async def fetch_user_details(username):
+    """``TwitterTarotReader.fetch_user_details`` over the async client."""
+    url = f"{rapidapi.BASE_URL}/user/details"
+    querystring = {"username": username}
+    headers = {
+        "x-rapidapi-host": os.environ.get("RAPIDAPI_HOST1"),
+        "x-rapidapi-key": os.environ.get("RAPIDAPI_KEY1")
+    }
+    try:
+        user_data = await rapidapi.get_json_async("details", url, headers, querystring)
+        return {
+            "follower_count": user_data.get("follower_count", 0),
+            "number_of_tweets": user_data.get("number_of_tweets", 0)
+        }
+    except UPSTREAM_ERRORS as e:
+        logger.warning("Error fetching user details for %s: %s", username, e)
+        return {"follower_count": 0, "number_of_tweets": 0}
+
+
+async def load_timeline(username):
+    """``fetch_tweets.load_timeline`` with the pages fetched on the event loop."""
+    tweets, state = await run_cpu(tweet_store.ingest, username, [])
+    previous = (state, None)
+    pages = tweet_provider.iter_tweet_pages_async(username, since_id=tweet_store.newest_id(username))
+    first_page = True
+    try:
+        async for page in pages:
+            tweets, state, previous, converged = await run_cpu(fold_page, username, page, previous, first_page)
+            first_page = False
+            if converged:
+                break
+    finally:
+        await pages.aclose()
+    return tweets, state, previous[1] if previous[0] == state else None
+
+
+async def create_tarot_reading(username):
+    """``fetch_tweets.create_tarot_reading`` for the event loop."""
+    cache_key = username.lower()
+    # A reading not held in memory is looked up in SQLite, so off the loop
+    reading = await asyncio.to_thread(hot_cached_reading, cache_key)
+    if reading is not None:
+        return reading
+    return await reading_flights.do(cache_key, _create_tarot_reading, username)
+
+
+async def _create_tarot_reading(username):
+    user_details_task = asyncio.ensure_future(fetch_user_details(username))
+    try:
+        tweets, state, analysis = await load_timeline(username)
+    except BaseException:
+        user_details_task.cancel()
+        raise
+    user_details = await user_details_task
+    return await run_cpu(finish_reading, username, tweets, state, user_details, analysis)
+
+
+async def get_user_tweets(request):
+    username = request.query.get("username")
+    if not username:
+        return web.json_response({"error": "Username is required."}, status=400)
+    try:
+        tweets = await tweet_provider.fetch_user_tweets_async(username)
+        return web.json_response({"tweets": tweets, "count": len(tweets)})
+    except UPSTREAM_ERRORS as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_tarot_reading(request):
+    username = request.query.get("username")
+    if not username:
+        return web.json_response({"error": "Username is required."}, status=400)
+    try:
+        reading = await create_tarot_reading(username)
+        return web.json_response(reading)
+    except UPSTREAM_ERRORS as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_metrics(request):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+
+async def _warm_up(app):
+    # Warm up behind the first requests instead of delaying startup
+    asyncio.get_running_loop().run_in_executor(cpu_executor, warm_up)
+
+
+async def _close_client(app):
+    await async_client.close_session()
+
+
+def create_app():
+    app = web.Application()
+    app.router.add_get("/user/tweets", get_user_tweets)
+    app.router.add_get("/user/tarot-reading", get_tarot_reading)
+    app.router.add_get("/metrics", get_metrics)
+    if LAZY_STARTUP:
+        app.on_startup.append(_warm_up)
+    app.on_cleanup.append(_close_client)
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    web.run_app(
+        app,
+        host=os.environ.get("ASYNC_HOST", "127.0.0.1"),
+        port=int(os.environ.get("ASYNC_PORT", 8000))
+    )
@@ -0,0 +1,92 @@
+"""Shared non-blocking HTTP client for the async app.
+
+The asyncio counterpart of ``http_client``: one ``aiohttp.ClientSession``
+per event loop with keep-alive connection pooling, the same connect and
+read timeouts, and the same bounded retries with exponential backoff for
+5xx responses and connection errors. Waiting on RapidAPI holds no thread,
+so one process can keep thousands of upstream requests in flight.
+"""
+import asyncio
+import os
+
+import aiohttp
+
+from http_client import RETRY_STATUSES, max_retry_after
+
+
+class HTTPStatusError(aiohttp.ClientError):
+    """An upstream response with an error status, after any retries."""
+
+    def __init__(self, status, url, headers):
+        super().__init__(f"{status} Error for url: {url}")
+        self.status = status
+        self.headers = headers
+
+
+_sessions = {}
+
+
+def build_session():
+    """Create a session with a connection pool and default timeouts from the environment."""
+    connector = aiohttp.TCPConnector(
+        limit=int(os.environ.get("HTTP_ASYNC_MAX_CONNECTIONS", 1000)),
+        limit_per_host=int(os.environ.get("HTTP_ASYNC_MAX_CONNECTIONS_PER_HOST", 0))
+    )
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05)),
+        sock_read=float(os.environ.get("HTTP_READ_TIMEOUT", 10))
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def get_session():
+    """Return the running loop's session, building it on first use."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _sessions[loop] = build_session()
+    return session
+
+
+async def close_session():
+    """Close the running loop's session, e.g. on app shutdown."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def _retry_delay(attempt, backoff_factor, retry_after):
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), max_retry_after())
+        except ValueError:
+            pass
+    return backoff_factor * (2 ** attempt)
+
+
+async def get_json(url, headers=None, params=None):
+    """GET ``url`` and return ``(status, decoded JSON, response headers)``.
+
+    5xx responses and connection errors are retried up to
+    ``HTTP_MAX_RETRIES`` times; a 429 is not, the caller picks another key.
+    A final error status raises ``HTTPStatusError`` carrying the status.
+    """
+    max_retries = int(os.environ.get("HTTP_MAX_RETRIES", 3))
+    backoff_factor = float(os.environ.get("HTTP_BACKOFF_FACTOR", 0.3))
+    session = get_session()
+    # Like requests, leave out headers whose value is unset
+    headers = {name: value for name, value in (headers or {}).items() if value is not None}
+    for attempt in range(max_retries + 1):
+        try:
+            async with session.get(url, headers=headers, params=params) as response:
+                if response.status in RETRY_STATUSES and attempt < max_retries:
+                    delay = _retry_delay(attempt, backoff_factor, response.headers.get("Retry-After"))
+                else:
+                    if response.status >= 400:
+                        raise HTTPStatusError(response.status, url, response.headers)
+                    return response.status, await response.json(content_type=None), response.headers
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= max_retries:
+                raise
+            delay = _retry_delay(attempt, backoff_factor, None)
+        await asyncio.sleep(delay)
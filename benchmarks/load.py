@@ -0,0 +1,155 @@
+"""End-to-end latency and throughput benchmark, fully offline.
+
+Starts the stub RapidAPI server, serves the Flask apps from ``fetch_tweets.py``
+and ``app.py`` on local threaded servers pointed at it, then drives
+``/user/tarot-reading`` (and ``/user/tweets``) at each concurrency level and
+reports p50/p95/p99 latency and throughput.
+
+    python -m benchmarks.load --concurrency 1,4,16,64 --requests 200 --latency 0.3
+
+``--cold`` turns every in-process cache off so each request pays for the
+full upstream round trips and analysis; by default requests cycle over
+``--usernames`` distinct accounts and the caches warm up as they would in
+production.
+"""
+import argparse
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_server import start_stub
+
+CACHE_SIZE_SETTINGS = (
+    "TWEETS_CACHE_SIZE", "CONTINUATION_CACHE_SIZE", "DETAILS_CACHE_SIZE",
+    "READING_CACHE_SIZE", "TWEET_STORE_SIZE"
+)
+
+
+def configure_environment(stub_url, cold):
+    """Point the apps at the stub. Must run before they are imported."""
+    os.environ["RAPIDAPI_BASE_URL"] = stub_url
+    os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+    os.environ.setdefault("RAPIDAPI_HOST", "twitter154.p.rapidapi.com")
+    os.environ.setdefault("RAPIDAPI_KEY1", "benchmark")
+    os.environ.setdefault("RAPIDAPI_HOST1", "twitter154.p.rapidapi.com")
+    # The stub has no quota; keep the scheduler from throttling the benchmark
+    os.environ.setdefault("RAPIDAPI_RATE", "100000")
+    os.environ.setdefault("RAPIDAPI_RATE1", "100000")
+    # Keep the benchmark's scores out of the real percentile snapshot
+    os.environ["PERCENTILE_SNAPSHOT_PATH"] = ""
+    # ... and the stub's pages and readings out of the persistent store
+    os.environ["PERSISTENT_STORE_PATH"] = ""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if cold:
+        for setting in CACHE_SIZE_SETTINGS:
+            os.environ[setting] = "0"
+
+
+def serve(flask_app):
+    """Serve a Flask app on a threaded local server; returns its base URL."""
+    from werkzeug.serving import make_server
+
+    # One access-log line per request would drown the report
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(q * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def run_level(url, path, usernames, concurrency, total_requests):
+    """Fire ``total_requests`` GETs with ``concurrency`` client threads."""
+    import requests
+
+    local = threading.local()
+    errors = []
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        username = usernames[i % len(usernames)]
+        started = time.perf_counter()
+        response = session.get(f"{url}{path}", params={"username": username}, timeout=60)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(total_requests)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": len(errors),
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "throughput": total_requests / wall if wall else 0.0
+    }
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    print(f"{'conc':>5} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for row in rows:
+        print(
+            f"{row['concurrency']:>5} {row['requests']:>6} {row['errors']:>5} "
+            f"{row['p50'] * 1000:>9.1f} {row['p95'] * 1000:>9.1f} {row['p99'] * 1000:>9.1f} "
+            f"{row['throughput']:>9.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline latency/throughput benchmark.")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        help="comma-separated client concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per level")
+    parser.add_argument("--usernames", type=int, default=100, help="distinct usernames to cycle over")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub seconds per upstream call")
+    parser.add_argument("--jitter", type=float, default=0.05, help="stub latency jitter in seconds")
+    parser.add_argument("--cold", action="store_true", help="disable every in-process cache")
+    parser.add_argument("--skip-tweets", action="store_true", help="only benchmark /user/tarot-reading")
+    args = parser.parse_args(argv)
+
+    stub, stub_state = start_stub(latency=args.latency, jitter=args.jitter)
+    configure_environment(f"http://127.0.0.1:{stub.server_port}", args.cold)
+
+    try:
+        import app as tweets_app
+        import fetch_tweets
+
+        levels = [int(level) for level in args.concurrency.split(",") if level]
+        usernames = [f"bench_user_{i}" for i in range(args.usernames)]
+        print(f"Stub latency {args.latency * 1000:.0f} ms +/- {args.jitter * 1000:.0f} ms, "
+              f"{len(usernames)} usernames, caches {'off' if args.cold else 'on'}")
+
+        tarot_url = serve(fetch_tweets.app)
+        rows = [run_level(tarot_url, "/user/tarot-reading", usernames, level, args.requests) for level in levels]
+        report("GET /user/tarot-reading (fetch_tweets.py)", rows)
+
+        if not args.skip_tweets:
+            tweets_url = serve(tweets_app.app)
+            rows = [run_level(tweets_url, "/user/tweets", usernames, level, args.requests) for level in levels]
+            report("GET /user/tweets (app.py)", rows)
+
+        print("\nUpstream calls served by the stub:")
+        for key, count in sorted(stub_state.counts.items()):
+            print(f"  {key}: {count}")
+    finally:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
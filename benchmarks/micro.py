@@ -0,0 +1,74 @@
+"""Microbenchmarks for the analysis hot path, fully offline.
+
+Times ``analyze_personality``, ``select_tarot_card`` and raw VADER scoring
+over 50, 500 and 5,000 tweets built from the recorded fixtures.
+
+    python -m benchmarks.micro --sizes 50,500,5000 --repeat 5
+"""
+import argparse
+import os
+import time
+
+from benchmarks.stub_server import load_fixtures
+
+
+def fixture_tweets(count):
+    """``count`` upstream tweet dicts, cycling the fixtures with unique IDs."""
+    pool = []
+    for fixture in load_fixtures():
+        pool.extend(fixture["tweets_page"]["results"])
+        pool.extend(fixture["continuation_page"]["results"])
+    tweets = []
+    for i in range(count):
+        tweet = dict(pool[i % len(pool)])
+        tweet["tweet_id"] = str(1800000000000000000 - i)
+        tweets.append(tweet)
+    return tweets
+
+
+def best_of(fn, repeat):
+    """Best wall time of ``repeat`` runs of ``fn``, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analysis microbenchmarks.")
+    parser.add_argument("--sizes", default="50,500,5000", help="comma-separated tweet counts")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    args = parser.parse_args(argv)
+
+    os.environ["PERCENTILE_SNAPSHOT_PATH"] = ""
+    os.environ["PERSISTENT_STORE_PATH"] = ""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    import fetch_tweets
+    from percentile_index import PercentileIndex
+    from tweet_record import as_tweets
+
+    reader = fetch_tweets.reader
+    analyzer = reader.sentiment_analyzer
+    user_details = {"follower_count": 12000, "number_of_tweets": 3400}
+    score_index = PercentileIndex(seed_scores=[0.12, 0.18, 0.05, 0.22, 0.15, 0.10, 0.08, 0.20, 0.25, 0.30])
+
+    print(f"{'benchmark':<22} {'tweets':>7} {'best ms':>10} {'us/tweet':>10}")
+    for size in [int(size) for size in args.sizes.split(",") if size]:
+        tweets = as_tweets(fixture_tweets(size))
+        analysis = reader.analyze_personality(tweets)
+        texts = [tweet.text.lower() for tweet in tweets]
+        cases = (
+            ("analyze_personality", lambda: reader.analyze_personality(tweets)),
+            ("select_tarot_card", lambda: reader.select_tarot_card(analysis, score_index, tweets, user_details)),
+            ("vader_polarity", lambda: [analyzer.polarity_scores(text) for text in texts]),
+        )
+        for name, fn in cases:
+            seconds = best_of(fn, args.repeat)
+            print(f"{name:<22} {size:>7} {seconds * 1000:>10.2f} {seconds * 1e6 / size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold-start benchmark and import-time budget check.
+
+Imports each app module in fresh interpreters, with and without
+``LAZY_STARTUP``, and reports the best import time and the slowest imports
+``-X importtime`` saw. Exits non-zero when a lazy import is over
+``--budget-ms`` or pulls in a dependency that should be deferred.
+
+    python -m benchmarks.startup --modules fetch_tweets,app --repeat 5 --budget-ms 500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only loaded on first use (or by warm_up) when LAZY_STARTUP=1
+DEFERRED_MODULES = ("numpy", "vaderSentiment.vaderSentiment", "dotenv")
+
+CHILD = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(elapsed, ",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+
+def import_once(module, lazy):
+    """Import ``module`` in a fresh interpreter.
+
+    Returns ``(seconds, deferred modules loaded, importtime lines)``.
+    """
+    env = dict(
+        os.environ,
+        LAZY_STARTUP="1" if lazy else "0",
+        PERCENTILE_SNAPSHOT_PATH="",
+        PERSISTENT_STORE_PATH="",
+        LOG_LEVEL="WARNING"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    seconds, _, loaded = result.stdout.splitlines()[-1].partition(" ")
+    return float(seconds), [name for name in loaded.split(",") if name], result.stderr.splitlines()
+
+
+def slowest_imports(lines, module, top):
+    """``module``'s ``top`` slowest direct imports, by cumulative microseconds."""
+    children = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented two spaces per level and listed before their parent
+        depth = (len(name) - 1 - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == module:
+                return sorted(children, reverse=True)[:top]
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark.")
+    parser.add_argument("--modules", default="fetch_tweets,app", help="comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--budget-ms", type=float, default=500, help="most a lazy import may take")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    import startup
+    deferred = [name for name in DEFERRED_MODULES if not (name == "dotenv" and startup.find_env_file())]
+
+    failures = []
+    print(f"{'module':<16} {'mode':<6} {'best ms':>9}  deferred modules loaded")
+    for module in [module for module in args.modules.split(",") if module]:
+        for lazy in (False, True):
+            runs = [import_once(module, lazy) for _ in range(args.repeat)]
+            seconds, loaded, lines = min(runs, key=lambda run: run[0])
+            mode = "lazy" if lazy else "eager"
+            print(f"{module:<16} {mode:<6} {seconds * 1000:>9.1f}  {', '.join(loaded) or '-'}")
+            for cumulative, name in slowest_imports(lines, module, args.top):
+                print(f"{'':<16} {'':<6} {cumulative / 1000:>9.1f}  {name}")
+            if lazy:
+                if seconds * 1000 > args.budget_ms:
+                    failures.append(f"{module}: lazy import took {seconds * 1000:.0f} ms, budget {args.budget_ms:.0f} ms")
+                early = [name for name in loaded if name in deferred]
+                if early:
+                    failures.append(f"{module}: lazy import loaded {', '.join(early)}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("Import-time budget met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Local stand-in for the twitter154 RapidAPI endpoints.
+
+Serves ``/user/tweets``, ``/user/tweets/continuation`` and ``/user/details``
+from the recorded fixtures in ``benchmarks/fixtures`` with a configurable
+latency, so the apps can be benchmarked offline. With ``quota`` set, each
+API key may make that many calls per ``quota_window`` seconds; responses
+carry RapidAPI's ``X-RateLimit-*`` headers and calls over quota get a 429. Any username is answered:
+unknown names are mapped onto one of the fixtures, with tweet IDs and the
+continuation token rewritten so every username gets its own timeline.
+
+Run standalone with ``python -m benchmarks.stub_server --port 8099`` and point
+the apps at it with ``RAPIDAPI_BASE_URL=http://127.0.0.1:8099``.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.json"))):
+        with open(path) as f:
+            fixtures.append(json.load(f))
+    if not fixtures:
+        raise RuntimeError(f"No fixtures found in {fixtures_dir}")
+    return fixtures
+
+
+class StubState:
+    """Fixtures, latency settings and per-endpoint request counters."""
+
+    def __init__(self, fixtures, latency=0.3, jitter=0.1, seed=0, quota=0, quota_window=60):
+        self.fixtures = fixtures
+        self.by_name = {fixture["username"]: fixture for fixture in fixtures}
+        self.latency = latency
+        self.jitter = jitter
+        self.counts = {}
+        self.quota = quota
+        self.quota_window = quota_window
+        self._quota_used = {}  # API key -> (window start, calls)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fixture_for(self, username):
+        if username in self.by_name:
+            return self.by_name[username], 0
+        index = zlib.crc32(username.encode()) % len(self.fixtures)
+        # Shift IDs per username so different users never share tweets
+        return self.fixtures[index], zlib.crc32(username.encode()) % 10**9
+
+    def delay(self):
+        with self._lock:
+            seconds = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(seconds, 0))
+
+    def spend_quota(self, api_key):
+        """Charge one call to ``api_key``; returns its rate-limit headers and whether it was allowed."""
+        if not self.quota:
+            return {}, True
+        with self._lock:
+            now = time.monotonic()
+            started, used = self._quota_used.get(api_key, (now, 0))
+            if now - started >= self.quota_window:
+                started, used = now, 0
+            allowed = used < self.quota
+            if allowed:
+                used += 1
+            self._quota_used[api_key] = (started, used)
+        reset = max(self.quota_window - (now - started), 0)
+        headers = {
+            "X-RateLimit-Requests-Limit": str(self.quota),
+            "X-RateLimit-Requests-Remaining": str(self.quota - used),
+            "X-RateLimit-Requests-Reset": str(int(math.ceil(reset)))
+        }
+        return headers, allowed
+
+    def count(self, endpoint, status):
+        with self._lock:
+            key = f"{endpoint} {status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def _shift_page(page, offset):
+    if not offset:
+        return page
+    results = []
+    for tweet in page.get("results", []):
+        tweet = dict(tweet)
+        tweet["tweet_id"] = str(int(tweet["tweet_id"]) + offset)
+        results.append(tweet)
+    return dict(page, results=results)
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        quota_headers = {}
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            username = params.get("username", "")
+            state.delay()
+
+            self.quota_headers, allowed = state.spend_quota(self.headers.get("X-RapidAPI-Key", ""))
+            if not allowed:
+                return self._send(url.path, 429, {"message": "Too many requests"})
+            if not username:
+                return self._send(url.path, 400, {"detail": "username is required"})
+            fixture, offset = state.fixture_for(username)
+            if url.path == "/user/tweets":
+                page = _shift_page(fixture["tweets_page"], offset)
+                page = dict(page, continuation_token=f"{username}:2")
+                return self._send(url.path, 200, page)
+            if url.path == "/user/tweets/continuation":
+                if params.get("continuation_token") != f"{username}:2":
+                    return self._send(url.path, 200, {"results": [], "continuation_token": None})
+                return self._send(url.path, 200, _shift_page(fixture["continuation_page"], offset))
+            if url.path == "/user/details":
+                return self._send(url.path, 200, dict(fixture["user_details"], username=username))
+            return self._send(url.path, 404, {"detail": "not found"})
+
+        def _send(self, endpoint, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in self.quota_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            state.count(endpoint, status)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(port=0, latency=0.3, jitter=0.1, quota=0, quota_window=60, fixtures_dir=FIXTURES_DIR):
+    """Start the stub on a background thread; returns ``(server, state)``."""
+    state = StubState(
+        load_fixtures(fixtures_dir), latency=latency, jitter=jitter, quota=quota, quota_window=quota_window
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per upstream call")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds of random jitter")
+    parser.add_argument("--quota", type=int, default=0, help="calls per key per quota window (0 = unlimited)")
+    parser.add_argument("--quota-window", type=float, default=60, help="quota window in seconds")
+    args = parser.parse_args()
+
+    server, _ = start_stub(args.port, args.latency, args.jitter, args.quota, args.quota_window)
+    print(f"Stub RapidAPI listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Persistent key-value store shared by every worker process on a host.
+
+A single SQLite database in WAL mode holds upstream tweet pages, user
+details and finished readings, each with an expiry time. It sits behind the
+in-memory caches: a process that starts cold, or misses in memory, finds
+what any other worker already fetched. Short-lived leases let one worker
+fetch a missing page while the others wait for it to land, instead of all
+of them calling RapidAPI.
+
+``PERSISTENT_STORE_PATH`` sets the database file (default
+``tarot_store.sqlite3``); an empty value disables the store.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leases (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+# Expired rows are swept after every this many writes
+PURGE_EVERY = 1000
+
+
+class DiskStore:
+    """JSON values with expiry in a SQLite database, safe across threads and processes."""
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        # One connection per thread, and a fresh one after a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = self._local.connection = self._connect()
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, namespace, key):
+        """The stored value, or None if it is missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, self.clock())
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if row is None else json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl):
+        """Store ``value`` for ``ttl`` seconds."""
+        if ttl <= 0:
+            return
+        now = self.clock()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, separators=(",", ":")), now + ttl)
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY == 0
+        if purge:
+            self.purge_expired()
+
+    def claim(self, namespace, key, ttl):
+        """Take the lease on ``key`` for ``ttl`` seconds; False if another owner holds it."""
+        now = self.clock()
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT owner, expires_at FROM leases WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                connection.execute("COMMIT")
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, owner, now + ttl)
+            )
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, namespace, key):
+        self._connection().execute(
+            "DELETE FROM leases WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def purge_expired(self):
+        now = self.clock()
+        connection = self._connection()
+        connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    def stats(self):
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+_store = None
+_store_lock = threading.Lock()
+_store_loaded = False
+
+
+def get_store():
+    """Return the process-wide store, or None when it is disabled or unusable."""
+    global _store, _store_loaded
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                path = os.environ.get("PERSISTENT_STORE_PATH", "tarot_store.sqlite3")
+                if path:
+                    try:
+                        _store = DiskStore(path)
+                    except sqlite3.Error as e:
+                        logger.warning("Persistent store %s disabled: %s", path, e)
+                _store_loaded = True
+    return _store
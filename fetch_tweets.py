@@ -1,513 +1,159 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS 
-from dotenv import load_dotenv
+import contextvars
+import hashlib
+import logging
+import multiprocessing
 import os
-import requests
-from random import choice
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from collections import Counter
-import re
+import sqlite3
+import time
 from collections import defaultdict
-import numpy as np
-import math
+from concurrent.futures import ThreadPoolExecutor
+from random import choice
 
-load_dotenv()
+import requests
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+
+import disk_store
+import logs
+import metrics
+import quota
+import rapidapi
+import scoring
+import startup
+import tweet_provider
+from analysis_model import get_analysis_model
+from analysis_pool import AnalysisPool
+from cache import TTLCache
+from keyword_matrix import dense_counts
+from percentile_index import PercentileIndex
+from refresher import CallBudget, HotKeys, Refresher
+from singleflight import SingleFlight
+from tarot_card import CARD_GROUPS, CATALOG
+from tweet_record import Tweet, as_tweets
+from tweet_store import AnalysisState, TweetFeatures, TweetStore, pinned_tweet_id, tweet_id_key
+
+startup.load_env()
+logs.configure_logging()
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
 CORS(app)
 
-RAPIDAPI_HOST = os.environ.get("RAPIDAPI_HOST")
-RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
-
 class TwitterTarotReader:
-    CARD_GROUPS = {
-        'growth_and_potential': [
-            'The Fool', 'Ace of Wands', 'Page of Wands', 'The Star', 
-            'The World', 'The Magician'
-        ],
-        'leadership_and_authority': [
-            'The Emperor', 'King of Wands', 'King of Swords',
-            'The Chariot', 'Queen of Wands'
-        ],
-        'learning_and_wisdom': [
-            'The Hierophant', 'The Hermit', 'Page of Swords',
-            'The High Priestess', 'Queen of Swords'
-        ],
-        'transformation_and_change': [
-            'Death', 'The Tower', 'The World', 'Judgement',
-            'Six of Swords'
-        ],
-        'success_and_achievement': [
-            'The Sun', 'Six of Wands', 'The World',
-            'The Chariot', 'Ten of Wands'
-        ],
-        'challenges_and_obstacles': [
-            'Five of Wands', 'Seven of Wands', 'Five of Swords',
-            'The Tower', 'The Devil'
-        ]
-    }
-
-    TAROT_CARDS = {
-    "The Fool": {
-        "meaning": "New beginnings, spontaneity, free spirit, potential.",
-        "career_advice": "Take that leap into a new technology or role - your fresh perspective is valuable.",
-    },
-    "The Magician": {
-        "meaning": "Manifestation, resourcefulness, power, inspired action.",
-        "career_advice": "Time to showcase your technical skills and take initiative on projects.",
-    },
-    "The High Priestess": {
-        "meaning": "Intuition, subconscious, mystery, divine femininity.",
-        "career_advice": "Trust your instincts when solving complex problems.",
-    },
-    "The Empress": {
-        "meaning": "Abundance, creativity, nurture, fertility.",
-        "career_advice": "Nurture your team's growth and foster creative solutions.",
-    },
-    "The Emperor": {
-        "meaning": "Authority, structure, stability, father figure.",
-        "career_advice": "Establish strong coding standards and best practices.",
-    },
-    "The Hierophant": {
-        "meaning": "Tradition, spirituality, guidance, education.",
-        "career_advice": "Seek mentorship and share knowledge with others.",
-    },
-    "The Lovers": {
-        "meaning": "Love, harmony, partnerships, alignment of values.",
-        "career_advice": "Focus on team collaboration and partnership projects.",
-    },
-    "The Chariot": {
-        "meaning": "Control, willpower, determination, success.",
-        "career_advice": "Drive projects forward with clear technical direction.",
-    },
-    "Strength": {
-        "meaning": "Courage, confidence, compassion, inner strength.",
-        "career_advice": "Take on challenging technical problems with confidence.",
-    },
-    "The Hermit": {
-        "meaning": "Introspection, solitude, inner guidance, reflection.",
-        "career_advice": "Focus on deep work and independent projects.",
-    },
-    "Wheel of Fortune": {
-        "meaning": "Luck, karma, cycles of life, turning points.",
-        "career_advice": "Be ready to adapt to technological changes.",
-    },
-    "Justice": {
-        "meaning": "Fairness, truth, law, accountability.",
-        "career_advice": "Ensure code quality and ethical considerations.",
-    },
-    "The Hanged Man": {
-        "meaning": "Pause, surrender, letting go, new perspective.",
-        "career_advice": "Step back and review your technical approach.",
-    },
-    "Death": {
-        "meaning": "Transformation, endings, new beginnings, transition.",
-        "career_advice": "Time for major technical transitions or stack changes.",
-    },
-    "Temperance": {
-        "meaning": "Balance, moderation, patience, harmony.",
-        "career_advice": "Balance technical debt with new development.",
-        "tech_focus": "Optimize system integration and compatibility."
-    },
-    "The Devil": {
-        "meaning": "Addiction, materialism, entrapment, shadow self.",
-        "career_advice": "Don't get trapped by outdated technologies.",
-        "tech_focus": "Address technical debt and dependencies."
-    },
-    "The Tower": {
-        "meaning": "Sudden change, upheaval, chaos, revelation.",
-        "career_advice": "Be prepared for technical challenges and system failures.",
-        "tech_focus": "Time to rebuild and refactor problematic systems."
-    },
-    "The Star": {
-        "meaning": "Hope, inspiration, renewal, spirituality.",
-        "career_advice": "Great time for learning and starting new projects.",
-        "tech_focus": "Explore emerging technologies and innovative solutions."
-    },
-    "The Moon": {
-        "meaning": "Illusion, fear, intuition, subconscious.",
-        "career_advice": "Don't let imposter syndrome hold you back.",
-        "tech_focus": "Look beyond surface-level solutions to find root causes."
-    },
-    "The Sun": {
-        "meaning": "Positivity, success, joy, vitality.",
-        "career_advice": "Your technical achievements will be recognized and celebrated.",
-        "tech_focus": "Share your knowledge and contribute to open source."
-    },
-    "Judgement": {
-        "meaning": "Reflection, reckoning, awakening, inner calling.",
-        "career_advice": "Evaluate your technical journey and future direction.",
-        "tech_focus": "Audit and improve your technical skills."
-    },
-    "The World": {
-        "meaning": "Completion, accomplishment, travel, integration.",
-        "career_advice": "Celebrate project completions and plan next challenges.",
-        "tech_focus": "Integration and deployment of complete systems."
-    },
-    
-    "Ace of Wands": {
-        "meaning": "Inspiration, new opportunities, creativity, potential.",
-        "career_advice": "Start new technical initiatives with enthusiasm.",
-        "tech_focus": "Experiment with innovative technologies."
-    },
-    "Two of Wands": {
-        "meaning": "Planning, progress, decisions, discovery.",
-        "career_advice": "Plan your technical roadmap carefully.",
-        "tech_focus": "Research and compare technical solutions."
-    },
-    "Ace of Swords": {
-        "meaning": "Breakthrough, clarity, sharp mind, new ideas.",
-        "career_advice": "Cut through technical complexity with clear thinking.",
-        "tech_focus": "Focus on algorithmic problem-solving."
-    },
-    "Two of Swords": {
-        "meaning": "Indecision, choices, stalemate, difficult decisions.",
-        "career_advice": "Evaluate technical trade-offs carefully.",
-        "tech_focus": "Compare competing technical solutions."
-    }
-    }
-
-    def __init__(self):
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+    # Shared views of the card catalog, built and validated once at import
+    CARD_GROUPS = CARD_GROUPS
+    TAROT_CARDS = CATALOG.cards
+
+    def __init__(self, model=None, pool=None):
+        # Resolved on first use, so a lazy start doesn't load the lexicon
+        self._model = model
+        # Optional AnalysisPool that featurizes batches in worker processes
+        self.pool = pool
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_analysis_model()
+        return self._model
+
+    @property
+    def sentiment_analyzer(self):
+        return self.model.sentiment_analyzer
 
     def get_similar_cards(self, card_name):
         """Return list of cards with similar traits"""
-        similar_cards = []
-        for group, cards in self.CARD_GROUPS.items():
-            if card_name in cards:
-                similar_cards.extend(cards)
-        return list(set(similar_cards)) 
+        return list(CATALOG.similar_cards(card_name))
 
     def select_card_from_group(self, primary_card):
         """Select either the primary card or a similar one randomly"""
-        similar_cards = self.get_similar_cards(primary_card)
+        similar_cards = CATALOG.similar_cards(primary_card)
         if similar_cards:
             return choice(similar_cards)
         return primary_card
 
     def get_card_reading(self, card_name):
         """Get a reading for a card, potentially selecting from similar cards"""
-        selected_card = self.select_card_from_group(card_name)
+        similar_cards = CATALOG.similar_cards(card_name)
+        selected_card = choice(similar_cards) if similar_cards else card_name
         return {
             "selected_card": selected_card,
             "reading": self.TAROT_CARDS[selected_card],
-            "similar_cards": self.get_similar_cards(card_name)
+            "similar_cards": list(similar_cards)
         }
 
     def get_tweets(self, screenname):
-        url = f"http://127.0.0.1:5000/user/tweets?username={screenname}"
-        print(f"Fetching tweets for {screenname} from {url}")
-        response = requests.get(url)
-        print(f"Response status code: {response.status_code}")
-
-        if response.status_code == 200:
-            data = response.json()
-
-            if 'tweets' not in data or not data['tweets']:
-                print("No tweets found in the response.")
-                return []
-
-            return [{
-                'text': tweet.get('text', ''),
-                'hashtags': [
-                    word[1:] for word in tweet.get('text', '').split() 
-                    if word.startswith('#')
-                ],
-                'views': tweet.get('views', 'Unknown'),
-                'retweet_count': tweet.get('retweet_count', 0),
-                'quote_count': tweet.get('quote_count', 0),
-                'reply_count': tweet.get('reply_count', 0),
-            } for tweet in data['tweets']]
-        else:
-            print(f"Error fetching tweets: {response.status_code}")
-            raise Exception(f"Error fetching tweets: {response.status_code}")
- 
+        """Fetch the user's latest tweets straight from the tweet provider."""
+        logger.debug("Fetching tweets for %s", screenname)
+        tweets = tweet_provider.fetch_user_tweets(screenname)
+        if not tweets:
+            logger.info("No tweets found for %s.", screenname)
+        return [Tweet.from_api(tweet) for tweet in tweets]
         
+    def extract_features(self, tweet):
+        """Tokenize and sentiment-score a single tweet."""
+        text = tweet.text.lower()
+        # One pass over the text finds every keyword of every theme
+        with metrics.stage_timer("tokenization"):
+            keyword_counts, word_count = self.model.matcher.scan_ids(text)
+        with metrics.stage_timer("sentiment"):
+            sentiment = self.sentiment_analyzer.polarity_scores(text)['compound']
+        return TweetFeatures(tweet.tweet_id, keyword_counts, word_count, sentiment)
+
+    def extract_features_batch(self, tweets):
+        """Tokenize and sentiment-score a list of tweets, on the analysis pool if there is one."""
+        if self.pool is None or not self.pool.enabled:
+            return [self.extract_features(tweet) for tweet in tweets]
+        with metrics.stage_timer("featurization_pool"):
+            results = self.pool.featurize([tweet.text.lower() for tweet in tweets])
+        return [
+            TweetFeatures(tweet.tweet_id, keyword_counts, word_count, sentiment)
+            for tweet, (keyword_counts, word_count, sentiment) in zip(tweets, results)
+        ]
+
+    def build_state(self, tweets):
+        """Build the mergeable analysis state for a list of tweets."""
+        return AnalysisState.from_features(self.extract_features_batch(as_tweets(tweets)))
+
+    def tweet_theme_vectors(self, features):
+        """Weighted theme scores of each tweet's ``TweetFeatures``.
+
+        Returns a (tweets x themes) array, columns in ``model.themes`` order.
+        """
+        import numpy as np
+
+        n_keywords = len(self.model.keywords)
+        rows = np.array([dense_counts(feature.keyword_counts, n_keywords) for feature in features])
+        return self.model.theme_scores(rows.reshape(len(features), n_keywords))[0]
+
     def analyze_personality(self, tweets):
-        themes = defaultdict(int)
-        sentiments = []
-        combined_text = ' '.join(tweet['text'].lower() for tweet in tweets)
+        return self.analyze_state(self.build_state(tweets))
 
-        words = re.findall(r'\b\w+\b', combined_text)
-        word_freq = Counter(words)
-        total_words = len(words)
-    
+    def analyze_state(self, state):
+        """Turn an ``AnalysisState`` into the personality analysis."""
+        with metrics.stage_timer("theme_scoring"):
+            return self._analyze_state(state)
 
-        for tweet in tweets:
-            text = tweet['text'].lower()
-            sentiment_scores = self.sentiment_analyzer.polarity_scores(text)
-            sentiments.append(sentiment_scores['compound'])
-        
-        theme_keywords = {
-            # Professional Growth
-            'technical_growth': {
-                # Core Tech
-                'code', 'programming', 'dev', 'data', 'ai', 'software', 'engineering', 'technology', 
-                'coding', 'development',
-                # Modern Tech Stack
-                'machine learning', 'blockchain', 'cloud', 'devops', 'frontend', 'backend', 'fullstack',
-                'python', 'javascript', 'typescript', 'react', 'node', 'kubernetes', 'docker',
-                # Emerging Tech
-                'web3', 'crypto', 'nft', 'artificial intelligence', 'neural networks', 'deep learning',
-                'cybersecurity', 'iot', 'quantum', 'ar', 'vr', 'metaverse', 'generative ai'
-            },
-            'professional_development': {
-                # Career
-                'career', 'job', 'work', 'professional', 'business', 'industry', 'corporate', 
-                'startup', 'entrepreneur', 'leadership', 'management',
-                # Modern Workplace
-                'remote work', 'hybrid', 'digital nomad', 'freelance', 'side hustle', 'passive income',
-                'personal brand', 'networking', 'mentorship', 'career change', 'upskilling',
-                # Business Focus
-                'saas', 'b2b', 'b2c', 'product', 'marketing', 'sales', 'growth hacking',
-                'venture capital', 'funding', 'bootstrapping', 'monetization', 'roi'
-            },
-            # Personal Growth
-            'education': {
-                'learning', 'study', 'education', 'course', 'degree', 'university', 'college',
-                'school', 'knowledge', 'skills', 'training', 'workshop', 'lecture', 'seminar',
-                'academia', 'scholarship', 'research', 'thesis', 'dissertation', 'homework',
-                'assignment', 'exam', 'test', 'quiz', 'grading', 'professor', 'teacher', 'instructor',
-                'student', 'classroom', 'textbook', 'library', 'lab', 'experiment', 'fieldwork',
-                'internship', 'apprenticeship', 'diploma', 'certificate', 'graduation', 'alumni',
-
-                'mooc', 'online course', 'bootcamp', 'certification', 'self-taught', 'tutorial',
-                'documentation', 'learning path', 'roadmap', 'curriculum', 'mentoring', 'coaching',
-                'e-learning', 'virtual classroom', 'webinar', 'online degree', 'distance learning',
-                'self-paced learning', 'microlearning', 'gamification', 'interactive learning',
-                'peer learning', 'collaborative learning', 'project-based learning', 'flipped classroom',
-                'blended learning', 'adaptive learning', 'lifelong learning', 'skill development',
-                'critical thinking', 'problem solving', 'creativity', 'innovation', 'soft skills',
-                'technical skills', 'coding', 'programming', 'data science', 'machine learning',
-                'artificial intelligence', 'cybersecurity', 'cloud computing', 'devops', 'ui/ux design',
-
-                'udemy', 'coursera', 'edx', 'linkedin learning', 'pluralsight', 'codecademy',
-                'khan academy', 'skillshare', 'udacity', 'futurelearn', 'alison', 'duolingo',
-                'memrise', 'brilliant', 'datacamp', 'treehouse', 'freecodecamp', 'kaggle',
-                'leetcode', 'hackerrank', 'codewars', 'edmodo', 'google classroom', 'moodle',
-                'canvas', 'blackboard', 'zoom', 'teams', 'slack', 'notion', 'evernote', 'anki',
-                'quizlet', 'rosetta stone', 'babbel', 'busuu', 'lingoda', 'sololearn', 'grasshopper',
-                'scratch', 'code.org', 'w3schools', 'mdn web docs', 'stack overflow', 'github',
-                'gitlab', 'bitbucket', 'docker', 'kubernetes', 'aws', 'azure', 'google cloud',
-                'visual studio code', 'pycharm', 'intellij', 'jupyter notebook', 'rstudio',
-                'tableau', 'power bi', 'figma', 'adobe xd', 'sketch', 'invision', 'miro', 'trello',
-                'asana', 'clickup', 'notion', 'obsidian', 'roam research', 'logseq', 'remnote',
-                'zotero', 'mendeley', 'endnote', 'grammarly', 'hemingway', 'prowritingaid',
-                'google scholar', 'researchgate', 'academia.edu', 'arxiv', 'ieee xplore', 'jstor',
-                'pubmed', 'springer', 'elsevier', 'wiley', 'sage', 'taylor & francis', 'oxford academic',
-                'cambridge core', 'nature', 'science', 'cell', 'plos one', 'frontiers', 'bmc'
-            },
-            'self_improvement': {
-                # Growth
-                'growth', 'goals', 'progress', 'improvement', 'development', 'motivation',
-                'inspiration', 'success', 'achievement', 'mindset',
-                # Modern Self-Help
-                'productivity', 'time management', 'habit building', 'morning routine',
-                'journaling', 'goal setting', 'accountability', 'personal development',
-                # Mental Models
-                'decision making', 'critical thinking', 'problem solving', 'cognitive bias',
-                'systems thinking', 'first principles', 'mental models'
-                # Modern Self-Help
-                'productivity', 'time management', 'habit building', 'morning routine',
-                'journaling', 'goal setting', 'accountability', 'personal development',
-                'life design', 'habit stacking', 'deep work', 'flow state', 'focus',
-                'minimalism', 'digital declutter', 'time blocking', 'batching',
-                'intentional living', 'lifestyle design', 'self-optimization',
-
-                # Mental Models
-                'decision making', 'critical thinking', 'problem solving', 'cognitive bias',
-                'systems thinking', 'first principles', 'mental models', 'lateral thinking',
-                'strategic planning', 'root cause analysis', 'framework thinking',
-                'probabilistic thinking', 'inversion', 'second-order thinking',
-                'thought experiments', 'rationality', 'metacognition'
-            },
-            # Lifestyle & Interests
-            'health_wellness': {
-                # Physical Health
-                'health', 'fitness', 'exercise', 'yoga', 'meditation', 'mindfulness', 'wellness',
-                'nutrition', 'diet', 'mental health', 'self-care',
-                # Modern Wellness
-                'biohacking', 'intermittent fasting', 'keto', 'plant-based', 'supplements',
-                'sleep optimization', 'recovery', 'stress management', 'immune system',
-                # Mental Wellness
-                'therapy', 'counseling', 'anxiety', 'depression', 'burnout', 'work-life balance',
-                'digital wellbeing', 'mental fitness', 'emotional intelligence'
-                # Modern Wellness
-                'biohacking', 'intermittent fasting', 'keto', 'plant-based', 'supplements',
-                'sleep optimization', 'recovery', 'stress management', 'immune system',
-                'cold therapy', 'heat therapy', 'breathwork', 'circadian rhythm',
-                'hormesis', 'microbiome', 'nootropics', 'peptides', 'longevity',
-                'blood testing', 'wearable technology',
-
-                # Mental Wellness
-                'therapy', 'counseling', 'anxiety', 'depression', 'burnout', 'work-life balance',
-                'digital wellbeing', 'mental fitness', 'emotional intelligence',
-                'mindset coaching', 'positive psychology', 'cognitive behavioral therapy',
-                'trauma-informed care', 'stress resilience', 'boundary setting',
-                'self-compassion', 'emotional regulation', 'psychological safety'
-            },
-            'creativity_arts': {
-                # Traditional Arts
-                'art', 'music', 'photography', 'writing', 'creative', 'design', 'drawing',
-                'painting', 'dance', 'film', 'poetry', 'craft',
-                # Digital Arts
-                'digital art', 'graphic design', '3d modeling', 'animation', 'motion graphics',
-                'ui design', 'ux design', 'web design', 'illustration', 'video editing',
-                # Creative Tech
-                'generative art', 'creative coding', 'procedural generation', 'digital sculpture',
-                'virtual production', 'creative ai', 'nft art'
-                # Digital Arts
-                'digital art', 'graphic design', '3d modeling', 'animation', 'motion graphics',
-                'ui design', 'ux design', 'web design', 'illustration', 'video editing',
-                'digital painting', 'character design', 'concept art', 'typography',
-                'visual effects', 'compositing', 'color grading', 'digital composition',
-                'parametric design', 'interactive design',
-
-                # Creative Tech
-                'generative art', 'creative coding', 'procedural generation', 'digital sculpture',
-                'virtual production', 'creative ai', 'nft art', 'augmented reality',
-                'virtual reality', 'mixed reality', 'algorithmic art', 'shader art',
-                'real-time graphics', 'projection mapping', 'interactive installations',
-                'data visualization', 'sound design', 'experimental media'
-            },
-            'travel_adventure': {
-                # Travel
-                'travel', 'adventure', 'explore', 'journey', 'wanderlust', 'vacation', 'trip',
-                'destination', 'culture', 'experience',
-                # Modern Travel
-                'digital nomad', 'workation', 'slow travel', 'sustainable travel', 'local experience',
-                'travel hacking', 'remote work travel', 'vanlife', 'backpacking',
-                # Adventure Sports
-                'hiking', 'camping', 'climbing', 'surfing', 'skydiving', 'scuba diving',
-                'mountaineering', 'skiing', 'snowboarding'
-                # Modern Travel
-                'digital nomad', 'workation', 'slow travel', 'sustainable travel', 'local experience',
-                'travel hacking', 'remote work travel', 'vanlife', 'backpacking',
-                'house sitting', 'coworking abroad', 'travel blogging', 'minimalist travel',
-                'destination coworking', 'travel photography', 'travel vlogging',
-                'location independence', 'geo arbitrage', 'travel rewards',
-
-                # Adventure Sports
-                'hiking', 'camping', 'climbing', 'surfing', 'skydiving', 'scuba diving',
-                'mountaineering', 'skiing', 'snowboarding', 'paragliding', 'white water rafting',
-                'kayaking', 'canyoneering', 'bouldering', 'ice climbing', 'wingsuit flying',
-                'kiteboarding', 'mountain biking', 'trail running', 'free diving'
-            },
-            # Social & Community
-            'relationships': {
-                # Personal
-                'family', 'friends', 'relationship', 'love', 'partner', 'marriage', 'dating',
-                'social', 'community', 'connection', 'support',
-                # Modern Dating
-                'online dating', 'dating apps', 'virtual dating', 'long distance', 'relationship goals',
-                'conscious relationships', 'attachment styles', 'boundaries',
-                # Community Building
-                'community management', 'online communities', 'discord', 'slack', 'meetups',
-                'networking events', 'mentorship', 'accountability partners'
-            },
-            'emotional_depth': {
-                # Core Emotions
-                'happy', 'joyful', 'delighted', 'elated', 'ecstatic', 'jubilant', 'cheerful', 'blissful',
-                'content', 'pleased', 'thrilled', 'overjoyed', 'radiant', 'beaming', 'glowing', 'uplifted',
-                'sad', 'melancholy', 'heartbroken', 'blue', 'down', 'depressed', 'gloomy', 'sorrowful',
-                'grieving', 'mourning', 'tearful', 'hurting', 'devastated', 'lonely', 'hopeless', 'despair',
-                'angry', 'frustrated', 'irritated', 'furious', 'outraged', 'enraged', 'bitter', 'resentful',
-                'indignant', 'irate', 'hostile', 'annoyed', 'agitated', 'exasperated', 'livid', 'seething',
-                
-                # Complex Emotions
-                'grateful', 'thankful', 'blessed', 'appreciative', 'moved', 'touched', 'humbled', 'honored',
-                'indebted', 'recognized', 'valued', 'cherished', 'acknowledged', 'supported', 'seen', 'heard',
-                'love', 'adore', 'cherish', 'treasure', 'devoted', 'smitten', 'passionate', 'affectionate',
-                'tender', 'fond', 'warmth', 'caring', 'romantic', 'intimate', 'attached', 'connected',
-                'excited', 'eager', 'anticipating', 'hopeful', 'optimistic', 'enthusiastic', 'motivated',
-                'inspired', 'driven', 'ambitious', 'determined', 'focused', 'ready', 'energized',
-                
-                # Emotional Growth & Resilience
-                'strong', 'resilient', 'brave', 'courageous', 'persevering', 'enduring', 'tenacious',
-                'hardy', 'tough', 'unbreakable', 'steadfast', 'persistent', 'resolute', 'unwavering',
-                'vulnerable', 'open', 'authentic', 'raw', 'honest', 'exposed', 'sensitive', 'fragile',
-                'delicate', 'tender', 'emotional', 'genuine', 'transparent', 'real', 'true', 'unguarded',
-                
-                # Empathy & Connection
-                'understanding', 'compassionate', 'empathetic', 'sympathetic', 'caring', 'kind',
-                'considerate', 'thoughtful', 'nurturing', 'supportive', 'helping', 'comforting',
-                'consoling', 'validating', 'accepting', 'embracing', 'bonded', 'close', 'united',
-                'together', 'belonging', 'welcomed', 'understood',
-                
-                # Transformation & Healing
-                'transforming', 'evolving', 'growing', 'changing', 'developing', 'progressing',
-                'learning', 'improving', 'advancing', 'expanding', 'flourishing', 'thriving',
-                'blooming', 'blossoming', 'emerging', 'becoming', 'healing', 'recovering', 'mending',
-                'restoring', 'renewing', 'rebuilding', 'processing', 'overcoming', 'surviving',
-                'coping', 'adapting', 'reconciling', 'accepting', 'forgiving', 'releasing',
-                
-                # Common Expression Words
-                'feel', 'feeling', 'felt', 'emotion', 'mood', 'spirit', 'heart', 'soul',
-                'mind', 'peace', 'calm', 'storm', 'light', 'dark', 'deep', 'shallow',
-                'high', 'low', 'up', 'down', 'better', 'worse', 'good', 'bad',
-                'positive', 'negative', 'intense', 'mild', 'strong', 'weak'
-            },
-            'social_causes': {
-                # Traditional Causes
-                'environment', 'sustainability', 'climate', 'social justice', 'equality',
-                'diversity', 'inclusion', 'activism', 'volunteer',
-                # Modern Movements
-                'climate tech', 'renewable energy', 'zero waste', 'circular economy',
-                'ethical consumption', 'fair trade', 'social impact', 'green tech',
-                # Social Issues
-                'mental health awareness', 'lgbtq+ rights', 'racial justice', 'gender equality',
-                'accessibility', 'digital privacy', 'tech ethics', 'responsible ai'
-            },
-            # Entertainment & Media
-            'entertainment': {
-                # Traditional
-                'movie', 'film', 'tv', 'show', 'series', 'game', 'gaming', 'book',
-                'reading', 'literature', 'podcast', 'entertainment',
-                # Modern Gaming
-                'esports', 'streaming', 'twitch', 'youtube', 'content creation',
-                'indie games', 'mobile gaming', 'vr gaming', 'game development',
-                # Digital Media
-                'streaming services', 'podcasting', 'audiobooks', 'digital content',
-                'social media', 'influencer', 'creator economy', 'live streaming'
-            },
-            'sports': {
-                # Traditional Sports
-                'sports', 'football', 'basketball', 'soccer', 'tennis', 'athlete',
-                'team', 'competition', 'fitness', 'workout',
-                # Modern Sports
-                'esports', 'fantasy sports', 'sports analytics', 'sports tech',
-                'sports science', 'performance tracking', 'sports medicine',
-                # Fitness Tech
-                'wearables', 'fitness apps', 'smart equipment', 'virtual coaching',
-                'connected fitness', 'fitness tracking', 'home gym'
-            }
-        }
+    def _analyze_state(self, state):
+        themes = defaultdict(int)
+        total_words = state.total_words
 
-        for theme, keywords in theme_keywords.items():
-            theme_score = 0
-            matched_keywords = set()
-
-            for keyword in keywords:
-                # Handle multi-word keywords
-                if ' ' in keyword:
-                    count = combined_text.count(keyword)
-                    if count > 0:
-                        theme_score += count * 2  # More weight for multi-word matches
-                        matched_keywords.add(keyword)
-                else:
-                    count = word_freq.get(keyword, 0)
-                    if count > 0:
-                        theme_score += count
-                        matched_keywords.add(keyword)
+        # The window's keyword totals times the theme membership matrices
+        totals = dense_counts(state.keyword_counts, len(self.model.keywords))
+        theme_scores, matched_keywords = self.model.theme_scores(totals)
 
+        theme_columns = zip(
+            self.model.themes, theme_scores.tolist(), matched_keywords.tolist(), self.model.theme_sizes.tolist()
+        )
+        for theme, theme_score, matched, size in theme_columns:
             if theme_score > 0:
                 # Normalize by total words and keyword diversity
-                themes[theme] = (theme_score / total_words) * (len(matched_keywords) / len(keywords))
+                themes[theme] = (theme_score / total_words) * (matched / size)
 
         # Sentiment Metrics
-        tweet_count = len(tweets)
-        avg_sentiment = sum(sentiments) / tweet_count if tweet_count > 0 else 0
+        tweet_count = state.tweet_count
+        avg_sentiment = state.sentiment_average
 
         # Theme Distribution
         total_theme_score = sum(themes.values())
@@ -516,13 +162,13 @@ class TwitterTarotReader:
             for theme, score in themes.items()
         }
 
-        print(theme_distribution)
+        logger.debug("Theme distribution: %s", theme_distribution)
 
         # Dominant Themes
         sorted_themes = sorted(themes.items(), key=lambda x: x[1], reverse=True)
         dominant_themes = sorted_themes[:3] if sorted_themes else [('neutral', 0)]
 
-        print(dominant_themes)
+        logger.debug("Dominant themes: %s", dominant_themes)
 
         # Personality Indicators
         personality_indicators = {
@@ -536,8 +182,8 @@ class TwitterTarotReader:
 
         # Emotional Analysis
         emotional_analysis = {
-            'positivity_ratio': len([s for s in sentiments if s > 0]) / tweet_count if tweet_count > 0 else 0,
-            'emotional_volatility': np.std(sentiments) if sentiments else 0,
+            'positivity_ratio': state.positivity_ratio,
+            'emotional_volatility': state.sentiment_std,
             'emotional_depth': themes.get('emotional_depth', 0)
         }
 
@@ -548,20 +194,20 @@ class TwitterTarotReader:
                 'positivity_ratio': emotional_analysis['positivity_ratio'],
                 'emotional_volatility': emotional_analysis['emotional_volatility']
             },
-            'dominant_themes': [{'theme': theme, 'frequency': count / total_theme_score} 
+            'dominant_themes': [{'theme': theme, 'frequency': count / total_theme_score if total_theme_score > 0 else 0}
                                for theme, count in dominant_themes],
             'theme_distribution': theme_distribution,
             'personality_indicators': personality_indicators,
             'analysis_metadata': {
                 'tweet_count': tweet_count,
                 'unique_themes_detected': len([t for t in themes.values() if t > 0]),
-                'engagement_diversity': len(themes) / len(theme_keywords)
+                'engagement_diversity': len(themes) / len(self.model.theme_keywords)
             }
         }
     
     def fetch_user_details(self, username):
             """Fetch user details from the Twitter API."""
-            url = "https://twitter154.p.rapidapi.com/user/details"
+            url = f"{rapidapi.BASE_URL}/user/details"
             querystring = {"username": username} 
             headers = {
                 "x-rapidapi-host": os.environ.get("RAPIDAPI_HOST1"),
@@ -569,9 +215,7 @@ class TwitterTarotReader:
             }
 
             try:
-                response = requests.get(url, headers=headers, params=querystring)
-                response.raise_for_status() 
-                user_data = response.json()
+                user_data = rapidapi.get_json("details", url, headers, querystring)
 
                 user_details = {
                     "follower_count": user_data.get("follower_count", 0),
@@ -580,135 +224,52 @@ class TwitterTarotReader:
                 return user_details
 
             except requests.exceptions.RequestException as e:
-                print(f"Error fetching user details: {e}")
+                logger.warning("Error fetching user details for %s: %s", username, e)
                 return {"follower_count": 0, "number_of_tweets": 0} 
 
 
 
-    def select_tarot_card(self, analysis, user_scores, tweets, username):
-        """Select appropriate tarot card based on a percentile ranking of cumulative scores."""
+    def select_tarot_card(self, analysis, score_index, tweets, user_details):
+        """Select appropriate tarot card based on a percentile ranking of cumulative scores.
+
+        ``score_index`` is the ``PercentileIndex`` of all readings' scores; the
+        user's score is ranked against it and then added to it.
+        ``user_details`` is the result of ``fetch_user_details``, fetched by the
+        caller so it can overlap with the tweet requests.
+        """
         sentiment = analysis.get('sentiment', {}).get('average', 0)
         dominant_theme = analysis.get('dominant_themes', [{}])[0].get('theme', 'neutral')
-        theme_dist = analysis.get('theme_distribution', {})
-        personality = analysis.get('personality_indicators', {})
-
-        # Normalize scores for comparison
-        def normalize(value, max_value=100):
-            return value / max_value if max_value != 0 else 0
-
-        # Calculate composite scores
-        technical_score = normalize(theme_dist.get('technical_growth', 0) + personality.get('professional_focus', 0))
-        creative_score = normalize(theme_dist.get('creativity_arts', 0) + personality.get('creativity_level', 0))
-        growth_score = normalize(theme_dist.get('self_improvement', 0) + personality.get('growth_orientation', 0))
-        emotional_score = normalize(theme_dist.get('emotional_depth', 0) + personality.get('emotional_expression', 0))
-        social_score = normalize(personality.get('social_engagement', 0) + theme_dist.get('relationships', 0))
-        balance_score = normalize(personality.get('lifestyle_balance', 0))
-
-        # Fetch user details (follower_count and number_of_tweets)
-        user_details = self.fetch_user_details(username)
+
+        # User details (follower_count and number_of_tweets)
         follower_count = user_details.get('follower_count', 0)
         number_of_tweets = user_details.get('number_of_tweets', 0)
 
-        print(follower_count)
-        print(number_of_tweets)
-
-        # Calculate engagement metrics with error handling for None values
-        total_views = sum(tweet.get('views', 0) or 0 for tweet in tweets)
-        total_retweets = sum(tweet.get('retweet_count', 0) or 0 for tweet in tweets)
-        total_quotes = sum(tweet.get('quote_count', 0) or 0 for tweet in tweets)
-        total_replies = sum(tweet.get('reply_count', 0) or 0 for tweet in tweets)
-
-        # Normalize engagement metrics (assuming max values for normalization)
-        max_views = max((tweet.get('views', 0) or 0 for tweet in tweets), default=1)
-        max_retweets = max((tweet.get('retweet_count', 0) or 0 for tweet in tweets), default=1)
-        max_quotes = max((tweet.get('quote_count', 0) or 0 for tweet in tweets), default=1)
-        max_replies = max((tweet.get('reply_count', 0) or 0 for tweet in tweets), default=1)
-
-        # Calculate engagement score with logarithmic scaling for follower_count
-        engagement_score = (
-            normalize(total_views, max_views) * 0.3 +
-            normalize(total_retweets, max_retweets) * 0.25 +
-            normalize(total_quotes, max_quotes) * 0.15 +
-            normalize(total_replies, max_replies) * 0.10 +
-            normalize(math.log1p(follower_count), math.log1p(1000000)) * 0.15 +  # Logarithmic scaling for follower_count
-            normalize(number_of_tweets, 10000) * 0.05  # Normalize number_of_tweets
+        logger.debug("Followers: %s, tweets: %s", follower_count, number_of_tweets)
+
+        # Engagement over the (tweets x metrics) array, with logarithmic
+        # scaling for follower_count
+        engagement_score = scoring.engagement_score(
+            scoring.engagement_matrix(as_tweets(tweets)), follower_count or 0, number_of_tweets or 0
         )
 
-        # Calculate cumulative overall score (weighted average)
-        cumulative_score = (
-            technical_score * 0.2 +
-            creative_score * 0.2 +
-            growth_score * 0.15 +
-            emotional_score * 0.15 +
-            social_score * 0.15 +
-            balance_score * 0.10 +
-            engagement_score * 0.05  # Engagement contributes 5% to the overall score
+        # Cumulative overall score (weighted average of the composite scores)
+        cumulative_score = scoring.cumulative_score(analysis, engagement_score)
+
+        # Rank the user's cumulative score relative to everyone read so far
+        percentile = score_index.percentile(cumulative_score)
+        score_index.add(cumulative_score)
+        logger.info(
+            "Dominant theme: %s, cumulative score: %.2f, engagement score: %.2f, percentile: %.2f",
+            dominant_theme, cumulative_score, engagement_score, percentile
         )
 
-        print(f"Dominant theme: {dominant_theme}")
-        print(f"Cumulative overall score: {cumulative_score:.2f}")
-        print(f"Engagement score: {engagement_score:.2f}")
-
-        # Rank the user's cumulative score relative to others
-        def calculate_percentile(user_score, all_scores):
-            if not all_scores:
-                return 0
-            sorted_scores = sorted(all_scores)
-            for i, score in enumerate(sorted_scores):
-                if user_score <= score:
-                    return i / len(sorted_scores)
-            return 1.0
-
-        # Calculate percentile for the user
-        percentile = calculate_percentile(cumulative_score, user_scores)
-        print(f"Percentile: {percentile:.2f}")
-
-        # Map percentile to tarot cards
-        if percentile >= 0.95:
-            return "The World"  # Completion, fulfillment, and success
-        elif percentile >= 0.90:
-            return "The Sun"  # Joy, success, and positivity
-        elif percentile >= 0.85:
-            return "The Star"  # Hope, inspiration, and aspiration
-        elif percentile >= 0.80:
-            return "The Empress"  # Creativity, abundance, and nurturing
-        elif percentile >= 0.75:
-            return "The Emperor"  # Authority, structure, and leadership
-        elif percentile >= 0.70:
-            return "The Hierophant"  # Tradition, community, and expertise
-        elif percentile >= 0.65:
-            return "The Magician"  # Mastery, skill, and personal growth
-        elif percentile >= 0.60:
-            return "The High Priestess"  # Intuition, creativity, and mystery
-        elif percentile >= 0.55:
-            return "The Fool"  # New beginnings, spontaneity, and potential
-        elif percentile >= 0.50:
-            return "The Chariot"  # Determination, willpower, and victory
-        elif percentile >= 0.45:
-            return "Justice"  # Fairness, balance, and truth
-        elif percentile >= 0.40:
-            return "The Wheel of Fortune"  # Change, cycles, and destiny
-        elif percentile >= 0.35:
-            return "The Lovers"  # Relationships, harmony, and choices
-        elif percentile >= 0.30:
-            return "Strength"  # Courage, inner strength, and resilience
-        elif percentile >= 0.25:
-            return "The Hermit"  # Solitude, introspection, and wisdom
-        elif percentile >= 0.20:
-            return "The Hanged Man"  # Perspective, surrender, and new viewpoints
-        elif percentile >= 0.15:
-            return "Death"  # Transformation, endings, and new beginnings
-        elif percentile >= 0.10:
-            return "Temperance"  # Balance, moderation, and harmony
-        elif percentile >= 0.05:
-            return "The Devil"  # Bondage, materialism, and shadow self
-        else:
-            return "The Tower"  # Sudden change, upheaval, and revelation
-
-    def generate_reading(self, analysis, tweets, user_scores, username):
+        # Map the percentile to a card (see tarot_card.PERCENTILE_CARDS)
+        return CATALOG.card_for_percentile(percentile)
+
+    def generate_reading(self, analysis, tweets, score_index, user_details):
         """Generate a comprehensive tarot reading based on the analysis."""
-        card_name = self.select_tarot_card(analysis, user_scores, tweets, username)
-        card_info = self.TAROT_CARDS[card_name]
+        with metrics.stage_timer("card_selection"):
+            card_name = self.select_tarot_card(analysis, score_index, tweets, user_details)
 
         # Extract sentiment value from the analysis
         sentiment_value = analysis.get('sentiment', {}).get('average', 0)
@@ -719,9 +280,7 @@ class TwitterTarotReader:
         )
 
         reading = {
-            'card_name': card_name,
-            'card_meaning': card_info['meaning'],
-            'career_advice': card_info['career_advice'],
+            **CATALOG.payloads[card_name],
             'analysis_summary': {
                 'dominant_theme': analysis.get('dominant_themes', []),
                 'sentiment': sentiment_label,
@@ -732,59 +291,407 @@ class TwitterTarotReader:
         return reading
 
 
+# Featurization runs on ANALYSIS_WORKERS processes when set, otherwise on
+# the request thread. Each serving process starts its own pool in
+# init_worker(), or on first use.
+analysis_pool = AnalysisPool(
+    workers=int(os.environ.get("ANALYSIS_WORKERS", 0)),
+    start_method=os.environ.get("ANALYSIS_START_METHOD") or None
+)
+
+# Built once at startup and shared by every request thread
+reader = TwitterTarotReader(pool=analysis_pool)
+
+# Each user's latest 50 tweets with their already-computed analysis state
+tweet_store = TweetStore(
+    reader.extract_features_batch,
+    window=50,
+    maxsize=int(os.environ.get("TWEET_STORE_SIZE", 4096)),
+    ttl=float(os.environ.get("TWEET_STORE_TTL", 86400))
+)
+
+# Distribution of every reading's cumulative score, persisted across restarts.
+# A new index starts from the scores readings used to be ranked against.
+score_index = PercentileIndex(
+    path=os.environ.get("PERCENTILE_SNAPSHOT_PATH", "percentile_index.json"),
+    snapshot_every=int(os.environ.get("PERCENTILE_SNAPSHOT_EVERY", 100)),
+    seed_scores=[0.12, 0.18, 0.05, 0.22, 0.15, 0.10, 0.08, 0.20, 0.25, 0.30]
+)
+
+# Streaming mode folds tweets into the analysis as pages arrive and stops
+# paging once another chunk of tweets no longer moves the result
+STREAM_ANALYSIS = os.environ.get("STREAM_ANALYSIS", "1") == "1"
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 10))
+STREAM_MIN_TWEETS = int(os.environ.get("STREAM_MIN_TWEETS", 20))
+STREAM_THEME_TOLERANCE = float(os.environ.get("STREAM_THEME_TOLERANCE", 0.05))
+STREAM_SENTIMENT_TOLERANCE = float(os.environ.get("STREAM_SENTIMENT_TOLERANCE", 0.05))
+
+# Finished readings per username, tagged with the timeline they were built
+# from and when that timeline was last loaded
+reading_cache = TTLCache(
+    maxsize=int(os.environ.get("READING_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("READING_CACHE_TTL", 86400))
+)
+
+
+def cached_reading(cache_key):
+    """The user's ``(fingerprint, reading, loaded_at)`` entry, or None.
+
+    Falls back to the persistent store, so a reading any worker built - or
+    this one built before a restart - is found there.
+    """
+    cached = reading_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    store = disk_store.get_store()
+    if store is None:
+        return None
+    try:
+        stored = store.get("readings", cache_key)
+    except sqlite3.Error as e:
+        logger.warning("Could not load reading for %s: %s", cache_key, e)
+        return None
+    if stored is None:
+        return None
+    # Stored with wall-clock time; the in-memory entry uses the monotonic clock
+    loaded_at = time.monotonic() - max(time.time() - stored["loaded_at"], 0.0)
+    cached = (tuple(stored["fingerprint"]), stored["reading"], loaded_at)
+    reading_cache.set(cache_key, cached)
+    return cached
+
+
+def cache_reading(cache_key, fingerprint, reading):
+    """Remember the user's reading in memory and in the persistent store."""
+    reading_cache.set(cache_key, (fingerprint, reading, time.monotonic()))
+    store = disk_store.get_store()
+    if store is None:
+        return
+    try:
+        store.set("readings", cache_key, {
+            "fingerprint": fingerprint, "reading": reading, "loaded_at": time.time()
+        }, reading_cache.ttl)
+    except sqlite3.Error as e:
+        logger.warning("Could not persist reading for %s: %s", cache_key, e)
+
+# Bounded pool for the batch endpoint's concurrent upstream fetches
+MAX_BATCH_USERNAMES = int(os.environ.get("TAROT_BATCH_MAX_USERNAMES", 500))
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TAROT_BATCH_WORKERS", 16)),
+    thread_name_prefix="tarot-batch"
+)
+
+# Separate pool for side requests made while a reading is being built. Kept
+# apart from the batch pool so batch workers never wait on their own pool.
+upstream_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TAROT_UPSTREAM_WORKERS", 32)),
+    thread_name_prefix="tarot-upstream"
+)
+
+
+def analysis_converged(previous, current):
+    """Whether adding more tweets moved the analysis less than the tolerances."""
+    previous_dist = previous.get('theme_distribution', {})
+    current_dist = current.get('theme_distribution', {})
+    theme_drift = sum(
+        abs(current_dist.get(theme, 0) - previous_dist.get(theme, 0))
+        for theme in set(previous_dist) | set(current_dist)
+    )
+    sentiment_drift = abs(
+        current.get('sentiment', {}).get('average', 0) -
+        previous.get('sentiment', {}).get('average', 0)
+    )
+    same_dominant = (
+        previous.get('dominant_themes', [{}])[0].get('theme') ==
+        current.get('dominant_themes', [{}])[0].get('theme')
+    )
+    return same_dominant and theme_drift <= STREAM_THEME_TOLERANCE and sentiment_drift <= STREAM_SENTIMENT_TOLERANCE
+
+
+def fold_page(username, page, previous, first_page=False):
+    """Fold one page of tweets into the tweet store.
+
+    The ``first_page`` of a fetch says which tweet, if any, is pinned.
+
+    ``previous`` is the ``(state, analysis)`` pair the last chunk left behind;
+    the analysis is None if that state was never analyzed. In streaming mode
+    the page is folded in ``STREAM_CHUNK_SIZE`` tweets at a time, and each
+    chunk that changed the state is analyzed and compared with the analysis
+    before it. Returns the window's tweets and state, the latest pair and
+    whether the analysis has converged.
+    """
+    pinned_id = pinned_tweet_id(page) if first_page else None
+    if not STREAM_ANALYSIS or not page:
+        tweets, state = tweet_store.ingest(username, page, pinned_id)
+        return tweets, state, previous, False
+    for start in range(0, len(page), STREAM_CHUNK_SIZE):
+        # The pinned tweet heads the page, so it is in the first chunk
+        tweets, state = tweet_store.ingest(
+            username, page[start:start + STREAM_CHUNK_SIZE], pinned_id if start == 0 else None
+        )
+        # A chunk of tweets already stored leaves the analysis where it was
+        if not state.tweet_count or state == previous[0]:
+            continue
+        current = reader.analyze_state(state)
+        # Nothing to converge on until some theme has a score
+        if previous[1] is not None and current['theme_distribution'] \
+                and state.tweet_count >= STREAM_MIN_TWEETS and analysis_converged(previous[1], current):
+            return tweets, state, (state, current), True
+        previous = (state, current)
+    return tweets, state, previous, False
+
+
+def load_timeline(username):
+    """Fold the user's new tweets into the tweet store and return its window.
+
+    In streaming mode paging stops early once the theme distribution and
+    sentiment stop moving. Returns the window's tweets and analysis state,
+    and the state's analysis if streaming already made it (else None).
+    """
+    tweets, state = tweet_store.ingest(username, [])
+    previous = (state, None)
+    pages = tweet_provider.iter_tweet_pages(
+        username, since_id=tweet_store.newest_id(username), executor=upstream_executor
+    )
+    try:
+        for page_number, page in enumerate(pages):
+            tweets, state, previous, converged = fold_page(username, page, previous, page_number == 0)
+            if converged:
+                break
+    finally:
+        pages.close()
+    return tweets, state, previous[1] if previous[0] == state else None
+
+
+def timeline_fingerprint(tweets, user_details):
+    """Identify the timeline a reading was built from.
+
+    Returns the newest tweet ID plus a hash of the tweets' text and engagement
+    counts and of the user details - everything the reading depends on.
+    """
+    newest_id = max((tweet.tweet_id for tweet in tweets), key=tweet_id_key, default="")
+    digest = hashlib.blake2b(digest_size=16)
+    for tweet in tweets:
+        digest.update(repr((tweet.tweet_id, tweet.text) + tweet.engagement()).encode())
+    digest.update(repr(sorted(user_details.items())).encode())
+    return newest_id, digest.hexdigest()
+
+
+# Concurrent requests for the same username wait on one reading
+reading_flights = SingleFlight("reading")
+
+# Stale-while-revalidate for hot users: once a username scores REFRESH_HOT_SCORE
+# (decaying request count), a reading up to REFRESH_MAX_STALE seconds old is
+# served at once and refreshed in the background when older than
+# REFRESH_AFTER. The REFRESH_TOP_N hottest users are also re-warmed before
+# they go stale, spending at most REFRESH_CALL_BUDGET upstream calls per
+# REFRESH_BUDGET_WINDOW seconds.
+REFRESH_HOT_SCORE = float(os.environ.get("REFRESH_HOT_SCORE", 3))
+REFRESH_AFTER = float(os.environ.get("REFRESH_AFTER", 240))
+REFRESH_MAX_STALE = float(os.environ.get("REFRESH_MAX_STALE", 3600))
+REFRESH_INTERVAL = float(os.environ.get("REFRESH_INTERVAL", 30))
+
+hot_usernames = HotKeys(half_life=float(os.environ.get("REFRESH_HALF_LIFE", 600)))
+
+
+def refresh_due(cache_key):
+    """Whether the user's reading will be stale before the next refresh sweep."""
+    cached = cached_reading(cache_key)
+    return cached is None or time.monotonic() - cached[2] + REFRESH_INTERVAL >= REFRESH_AFTER
+
+
+def refresh_reading(cache_key):
+    # Background refreshes only get upstream capacity nobody is waiting for,
+    # unless a reader joins one, which then goes ahead at the reader's priority
+    quota.with_priority(quota.REFRESH, reading_flights.do, cache_key, _create_tarot_reading, cache_key)
+
+
+refresher = Refresher(
+    refresh_reading,
+    refresh_due,
+    hot_usernames,
+    CallBudget(
+        calls=int(os.environ.get("REFRESH_CALL_BUDGET", 600)),
+        window=float(os.environ.get("REFRESH_BUDGET_WINDOW", 3600))
+    ),
+    top_n=int(os.environ.get("REFRESH_TOP_N", 100)),
+    interval=REFRESH_INTERVAL,
+    min_score=REFRESH_HOT_SCORE,
+    workers=int(os.environ.get("REFRESH_WORKERS", 4))
+)
+
+
+def create_tarot_reading(username):
+    """Fetch a user's tweets and turn them into a tarot reading.
+
+    Concurrent calls for the same username are coalesced: one call fetches
+    and analyzes, the others get its reading (or its error). Hot usernames
+    are answered from the cached reading while it is refreshed behind them.
+    """
+    cache_key = username.lower()
+    reading = hot_cached_reading(cache_key)
+    if reading is not None:
+        return reading
+    return reading_flights.do(cache_key, _create_tarot_reading, username)
+
+
+def hot_cached_reading(cache_key):
+    """Count a request for the user; if they are hot, return their cached reading.
+
+    Returns None when the user is not hot or has no usable cached reading.
+    A returned reading that is older than ``REFRESH_AFTER`` gets a background
+    refresh scheduled.
+    """
+    if hot_usernames.hit(cache_key) < REFRESH_HOT_SCORE:
+        return None
+    refresher.ensure_started()
+    cached = cached_reading(cache_key)
+    if cached is None:
+        return None
+    age = time.monotonic() - cached[2]
+    if age >= REFRESH_MAX_STALE:
+        return None
+    if age >= REFRESH_AFTER:
+        refresher.schedule(cache_key)
+    return cached[1]
+
+
+def _create_tarot_reading(username):
+    # Start the user details request alongside the tweet pages so the
+    # reading waits on the slower of the two rather than on both in turn
+    user_details_future = upstream_executor.submit(
+        contextvars.copy_context().run, reader.fetch_user_details, username
+    )
+    try:
+        # Only tweets not seen before are tokenized and scored
+        tweets, state, analysis = load_timeline(username)
+    except Exception:
+        user_details_future.cancel()
+        raise
+    user_details = user_details_future.result()
+    return finish_reading(username, tweets, state, user_details, analysis)
+
+
+def finish_reading(username, tweets, state, user_details, analysis=None):
+    """Turn a loaded timeline into a reading, reusing the cached one if nothing changed.
+
+    ``analysis`` is the state's analysis if the caller already has it.
+    """
+    # An unchanged timeline gives an unchanged reading, so skip the analysis
+    fingerprint = timeline_fingerprint(tweets, user_details)
+    cache_key = username.lower()
+    cached = cached_reading(cache_key)
+    if cached is not None and cached[0] == fingerprint:
+        # Only the load time moves on; the persistent store already has this reading
+        reading_cache.set(cache_key, (fingerprint, cached[1], time.monotonic()))
+        return cached[1]
+
+    if analysis is None:
+        analysis = reader.analyze_state(state)
+    reading = reader.generate_reading(analysis, tweets, score_index, user_details)
+    # Overwriting the entry drops the reading for the user's previous timeline
+    cache_reading(cache_key, fingerprint, reading)
+    return reading
+
+
+def warm_up():
+    """Load what the first reading would otherwise load on demand.
+
+    Builds the analysis model (with the VADER lexicon), imports NumPy through
+    the scoring code and opens the persistent store. Safe to call again.
+    """
+    reader.model
+    scoring.engagement_score(scoring.engagement_matrix([]), 0, 0)
+    disk_store.get_store()
+
+
+# With LAZY_STARTUP=1 that is left to the first request or an explicit
+# warm_up() call, so new workers come up and accept requests sooner
+LAZY_STARTUP = os.environ.get("LAZY_STARTUP", "0") == "1"
+if not LAZY_STARTUP:
+    warm_up()
+
+
+def init_worker():
+    """Start what each process serving readings needs for itself.
+
+    Runs once the app is imported and warmed up: at import, or - when
+    gunicorn.conf.py preloads the app - in every worker after the fork,
+    never in the master.
+    """
+    score_index.save_at_exit()
+    if not LAZY_STARTUP:
+        analysis_pool.start()
+
+
+# A pool worker started with spawn or forkserver re-imports the main script,
+# and must not start a pool of its own
+PRELOADED = os.environ.get("GUNICORN_PRELOAD") == "1"
+if not PRELOADED and multiprocessing.parent_process() is None:
+    init_worker()
+
+
 @app.route("/user/tarot-reading", methods=["GET"])
 def get_tarot_reading():
     username = request.args.get('username')
     if not username:
         return jsonify({"error": "Username is required."}), 400
     
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": RAPIDAPI_HOST
-    }
-    
-    url_initial = f"https://twitter154.p.rapidapi.com/user/tweets"
-    params_initial = {
-        "username": username,
-        "limit": "20",
-        "include_replies": "false",
-        "include_pinned": "true"
-    }
-    
     try:
-        response_initial = requests.get(url_initial, headers=headers, params=params_initial)
-        response_initial.raise_for_status()
-        data = response_initial.json()
-        
-        tweets = data.get("results", [])
-        continuation_token = data.get("continuation_token")
-        
-        if len(tweets) < 50 and continuation_token:
-            url_continuation = f"https://twitter154.p.rapidapi.com/user/tweets/continuation"
-            params_continuation = {
-                "username": username,
-                "limit": "40",  
-                "continuation_token": continuation_token,
-                "include_replies": "false"
-            }
-            response_continuation = requests.get(url_continuation, headers=headers, params=params_continuation)
-            response_continuation.raise_for_status()
-            continuation_data = response_continuation.json()
-            
-            # Combine results
-            tweets += continuation_data.get("results", [])
-            tweets = tweets[:50]  # Ensure no more than 50 tweets
-        
-        # return jsonify({"tweets": tweets, "count": len(tweets)})
-        reader = TwitterTarotReader()
-        analysis = reader.analyze_personality(tweets)
-        user_scores = [0.12, 0.18, 0.05, 0.22, 0.15, 0.10, 0.08, 0.20, 0.25, 0.30]
-        reading = reader.generate_reading(analysis, tweets, user_scores, username)
+        reading = create_tarot_reading(username)
         return jsonify(reading)
     
     except requests.exceptions.RequestException as e:
         return jsonify({"error": str(e)}), 500
 
+
+@app.route("/user/tarot-readings", methods=["POST"])
+def get_tarot_readings():
+    """Generate readings for many usernames at once.
+
+    Expects a JSON body like ``{"usernames": ["a", "b"]}``. Users are fetched
+    concurrently on a bounded worker pool, so the request takes about as long
+    as the slowest user. A failure for one user is reported under ``errors``
+    without failing the rest of the batch.
+    """
+    payload = request.get_json(silent=True) or {}
+    usernames = payload.get("usernames")
+    if not isinstance(usernames, list) or not usernames:
+        return jsonify({"error": "A non-empty list of usernames is required."}), 400
+    if not all(isinstance(username, str) and username for username in usernames):
+        return jsonify({"error": "Usernames must be non-empty strings."}), 400
+
+    usernames = list(dict.fromkeys(usernames))  # Drop duplicates, keep order
+    if len(usernames) > MAX_BATCH_USERNAMES:
+        return jsonify({"error": f"At most {MAX_BATCH_USERNAMES} usernames per request."}), 400
+
+    futures = {
+        username: batch_executor.submit(quota.with_priority, quota.BATCH, create_tarot_reading, username)
+        for username in usernames
+    }
+
+    readings = {}
+    errors = {}
+    for username, future in futures.items():
+        try:
+            readings[username] = future.result()
+        except Exception as e:
+            errors[username] = str(e)
+
+    return jsonify({"readings": readings, "errors": errors, "count": len(readings)})
+
+
+@app.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    stats = rapidapi.cache_stats()
+    stats["readings"] = reading_cache.stats()
+    return jsonify(stats)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
 
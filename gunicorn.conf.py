@@ -0,0 +1,45 @@
+"""Gunicorn settings for serving the tarot app with a preloaded, shared model.
+
+    gunicorn -c gunicorn.conf.py
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master, which builds the analysis model
+and VADER lexicon (leave ``LAZY_STARTUP`` unset), and every worker is forked
+from it. Garbage collection is off in the master and everything it built is
+frozen before each fork, so collections in the workers never write to the
+shared pages; workers then only pay for their own request state, and more
+of them fit on a box. What each worker needs for itself, like its analysis
+pool, is started after the fork by ``fetch_tweets.init_worker``.
+"""
+import gc
+import os
+import sys
+
+wsgi_app = os.environ.get("GUNICORN_APP", "fetch_tweets:app")
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+preload_app = True
+
+# Tells fetch_tweets not to start per-worker state in the master
+os.environ["GUNICORN_PRELOAD"] = "1"
+
+# Tells quota how many workers split the RapidAPI rate limits
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Collections in the master would only leave freed holes in pages the
+# workers share
+gc.disable()
+
+
+def pre_fork(server, worker):
+    # Move every object the master built into the permanent generation, which
+    # collections in the workers skip
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    tarot = sys.modules.get("fetch_tweets")
+    if tarot is not None:
+        tarot.init_worker()
@@ -0,0 +1,99 @@
+"""Shared HTTP client for every outbound RapidAPI call.
+
+One ``requests.Session`` per process keeps TCP+TLS connections to
+twitter154.p.rapidapi.com alive between requests, applies default connect
+and read timeouts so a hung upstream cannot pin a worker thread, and
+retries 5xx responses and connection errors on idempotent GETs a bounded
+number of times with exponential backoff. A 429 is handed straight back:
+the quota belongs to the key, so the caller switches keys instead.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def max_retry_after():
+    """Longest a ``Retry-After`` header may hold a retry back, in seconds."""
+    return float(os.environ.get("HTTP_MAX_RETRY_AFTER", 5))
+
+
+class CappedRetry(Retry):
+    """Retry that honours ``Retry-After`` only up to ``HTTP_MAX_RETRY_AFTER``."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, max_retry_after())
+
+
+class PooledSession(requests.Session):
+    """Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session():
+    """Create a session with per-host connection pools, timeouts and retries.
+
+    Settings are read from the environment when the session is built, so
+    values loaded from ``.env`` by the apps are picked up.
+    """
+    retry = CappedRetry(
+        total=int(os.environ.get("HTTP_MAX_RETRIES", 3)),
+        backoff_factor=float(os.environ.get("HTTP_BACKOFF_FACTOR", 0.3)),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        # Hand the last response back so callers still see the real status
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", 10)),
+        pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", 64)),
+        max_retries=retry
+    )
+    timeout = (
+        float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05)),
+        float(os.environ.get("HTTP_READ_TIMEOUT", 10))
+    )
+    session = PooledSession(timeout=timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide session, building it on first use.
+
+    A process forked from one that already had a session (e.g. a preloaded
+    gunicorn worker) builds its own rather than share the parent's sockets.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = build_session()
+                _session_pid = os.getpid()
+    return _session
+
+
+def get(url, **kwargs):
+    """Send a GET through the shared session."""
+    return get_session().get(url, **kwargs)
@@ -0,0 +1,123 @@
+"""Single-pass multi-keyword matcher (Aho-Corasick automaton).
+
+All theme keywords are compiled into one automaton so a tweet text is
+scanned once, however many themes and keywords there are. Matching keeps
+the semantics ``analyze_personality`` has always used:
+
+* multi-word keywords are counted like ``str.count`` - plain substrings,
+  non-overlapping, leftmost first;
+* single-word keywords are counted like ``Counter(re.findall(r'\\b\\w+\\b'))`` -
+  only whole word tokens match, so a single keyword containing a non-word
+  character (``self-taught``) can never match.
+"""
+import re
+from collections import deque
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+def _is_word_char(ch):
+    # Same definition of a word character as the ``\w`` regex class
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """Compiled automaton that counts every keyword occurrence in one scan."""
+
+    __slots__ = ('keywords', '_goto', '_fail', '_out', '_is_phrase', '_lengths')
+
+    def __init__(self, keywords):
+        self.keywords = tuple(sorted(set(keywords)))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._is_phrase = []
+        self._lengths = []
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            is_phrase = ' ' in keyword
+            self._is_phrase.append(is_phrase)
+            self._lengths.append(len(keyword))
+            if not is_phrase and not all(_is_word_char(ch) for ch in keyword):
+                continue  # Never a whole token, so it can never match
+            self._add(keyword, keyword_id)
+
+        self._link()
+        # Fixed from here on; tuples are smaller than the lists they were built in
+        self._goto = tuple(self._goto)
+        self._fail = tuple(self._fail)
+        self._out = tuple(self._out)
+        self._is_phrase = tuple(self._is_phrase)
+        self._lengths = tuple(self._lengths)
+
+    def _add(self, keyword, keyword_id):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] += (keyword_id,)
+
+    def _link(self):
+        # Breadth-first so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def scan(self, text):
+        """Find every keyword in ``text`` in a single pass.
+
+        Returns ``(counts, total_words)`` where ``counts`` maps each matched
+        keyword to its number of occurrences and ``total_words`` is the number
+        of word tokens in the text.
+        """
+        counts, total_words = self.scan_ids(text)
+        keywords = self.keywords
+        return {keywords[keyword_id]: count for keyword_id, count in counts.items()}, total_words
+
+    def scan_ids(self, text):
+        """``scan`` keyed by keyword ID, the keyword's index in ``keywords``.
+
+        The counts are the text's sparse row of a (texts x keywords) matrix.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        is_phrase, lengths = self._is_phrase, self._lengths
+        counts = {}
+        last_end = {}
+        state = 0
+        last_index = len(text) - 1
+
+        for i, ch in enumerate(text):
+            next_state = goto[state].get(ch)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(ch)
+            state = next_state or 0
+
+            if not out[state]:
+                continue
+            for keyword_id in out[state]:
+                start = i - lengths[keyword_id] + 1
+                if is_phrase[keyword_id]:
+                    # Non-overlapping, like str.count
+                    if start < last_end.get(keyword_id, 0):
+                        continue
+                    last_end[keyword_id] = i + 1
+                elif (start > 0 and _is_word_char(text[start - 1])) or \
+                        (i < last_index and _is_word_char(text[i + 1])):
+                    continue  # Part of a longer word token
+                counts[keyword_id] = counts.get(keyword_id, 0) + 1
+
+        return counts, len(_WORD_RE.findall(text))
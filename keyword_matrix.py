@@ -0,0 +1,23 @@
+"""Sparse tweet x keyword count rows.
+
+Tokenizing a tweet yields one sparse row of a (tweets x keywords) count
+matrix, ``{keyword ID: count}`` (see ``KeywordMatcher.scan_ids``). Rows are
+computed once per tweet and summed over a window (``AnalysisState``) without
+tokenizing again; the sum, as a dense vector, times the analysis model's
+(keywords x themes) membership matrices gives the window's theme scores
+(``AnalysisModel.theme_scores``). Stacked dense rows give per-tweet scores
+the same way (``TwitterTarotReader.tweet_theme_vectors``).
+
+NumPy is imported on first use, like in ``scoring``.
+"""
+
+
+def dense_counts(counts, n_keywords):
+    """A sparse row, or a sum of rows, as a dense keyword-count vector."""
+    import numpy as np
+
+    vector = np.zeros(n_keywords)
+    if counts:
+        vector[list(counts)] = list(counts.values())
+    return vector
+
@@ -0,0 +1,44 @@
+"""Leveled, sampled logging for the apps.
+
+``LOG_LEVEL`` sets the threshold (default ``INFO``). ``LOG_SAMPLE_RATE``
+(0 to 1, default 1) keeps only that fraction of DEBUG and INFO records, so
+per-reading chatter can stay on under load; warnings and errors are always
+kept.
+"""
+import logging
+import os
+import random
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class SampleFilter(logging.Filter):
+    """Pass a random ``rate`` fraction of records below WARNING."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+_configured = False
+
+
+def configure_logging():
+    """Set up the root handler once per process from the environment."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(SampleFilter(float(os.environ.get("LOG_SAMPLE_RATE", 1))))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
@@ -0,0 +1,265 @@
+"""Growing distribution of reading scores with fast percentile queries.
+
+Every generated reading adds its cumulative score to a t-digest, a quantile
+sketch that keeps memory bounded (a few hundred centroids) however many
+readings it has seen. Percentile queries are a binary search over the
+centroids. The digest is snapshotted to a JSON file so the distribution
+survives restarts. Every worker process keeps its own digest, and each
+snapshot merges the scores it added into the file instead of overwriting it,
+so no worker's readings are lost to another's.
+"""
+import atexit
+import contextlib
+import json
+import logging
+import math
+import os
+import threading
+from bisect import bisect_left, insort
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows, where only one process writes the file
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TDigest:
+    """Merging t-digest using the k1 (arcsine) scale function."""
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = []
+        self._weights = []
+        self._cumulative = []  # Weight of all centroids before each one
+        self._buffer = []      # Sorted values not merged into centroids yet
+        self._buffer_size = compression * 5
+
+    def add(self, value):
+        value = float(value)
+        insort(self._buffer, value)
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self._buffer_size:
+            self.compress()
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k):
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def compress(self):
+        """Merge buffered values into the centroids."""
+        if not self._buffer:
+            return
+        self._rebuild(list(zip(self._means, self._weights)) + [(v, 1) for v in self._buffer])
+        self._buffer = []
+
+    def merge(self, other):
+        """Add every value ``other`` has seen to this digest."""
+        if not other.count:
+            return
+        self.compress()
+        other.compress()
+        self._rebuild(list(zip(self._means, self._weights)) + list(zip(other._means, other._weights)))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _rebuild(self, items):
+        # Merge (mean, weight) pairs into as few centroids as the scale function allows
+        items.sort()
+        total = sum(weight for _, weight in items)
+
+        means, weights = [], []
+        merged_weight = 0
+        mean, weight = items[0]
+        q_limit = self._q(self._k(0) + 1)
+        for next_mean, next_weight in items[1:]:
+            if (merged_weight + weight + next_weight) / total <= q_limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                merged_weight += weight
+                q_limit = self._q(self._k(merged_weight / total) + 1)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+
+        self._means, self._weights = means, weights
+        self._cumulative = []
+        running = 0
+        for weight in weights:
+            self._cumulative.append(running)
+            running += weight
+
+    def _centroid_rank(self, value):
+        """Interpolated weight of the centroids below ``value``."""
+        means, weights, cumulative = self._means, self._weights, self._cumulative
+        if not means:
+            return 0
+        i = bisect_left(means, value)
+        if i == 0:
+            # Between the smallest value seen and the first centroid
+            if value <= self.min or means[0] <= self.min:
+                return 0
+            return weights[0] / 2 * (value - self.min) / (means[0] - self.min)
+        if i == len(means):
+            last = len(means) - 1
+            low = cumulative[last] + weights[last] / 2
+            if value >= self.max or self.max <= means[last]:
+                return cumulative[last] + weights[last]
+            return low + weights[last] / 2 * (value - means[last]) / (self.max - means[last])
+        left = i - 1
+        low = cumulative[left] + weights[left] / 2
+        span = (weights[left] + weights[i]) / 2
+        return low + span * (value - means[left]) / (means[i] - means[left])
+
+    def cdf(self, value):
+        """Approximate fraction of the added values that are below ``value``."""
+        if self.count == 0:
+            return 0
+        rank = self._centroid_rank(value) + bisect_left(self._buffer, value)
+        return min(max(rank / self.count, 0.0), 1.0)
+
+    def to_dict(self):
+        self.compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": self._means,
+            "weights": self._weights
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(compression=data["compression"])
+        digest.count = data["count"]
+        if digest.count:
+            digest.min = data["min"]
+            digest.max = data["max"]
+        digest._means = list(data["means"])
+        digest._weights = list(data["weights"])
+        running = 0
+        for weight in digest._weights:
+            digest._cumulative.append(running)
+            running += weight
+        return digest
+
+
+class PercentileIndex:
+    """Thread-safe score distribution, snapshotted to ``path``.
+
+    ``seed_scores`` bootstrap a brand new index (no snapshot on disk yet) so
+    the first readings are not all ranked against an empty distribution.
+    """
+
+    def __init__(self, path=None, compression=100, snapshot_every=100, seed_scores=()):
+        self.path = path
+        self.compression = compression
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        # Scores added since the last snapshot, to be merged into the file
+        self._pending = TDigest(compression=compression)
+        self._exit_pid = None
+        self._digest = self._load()
+        if self._digest is None:
+            self._digest = TDigest(compression=compression)
+            for score in seed_scores:
+                self._digest.add(score)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                return TDigest.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable percentile snapshot %s: %s", self.path, e)
+            return None
+
+    def __len__(self):
+        return self._digest.count
+
+    def percentile(self, score):
+        """Fraction of recorded scores below ``score``, between 0 and 1."""
+        with self._lock:
+            return self._digest.cdf(score)
+
+    def add(self, score):
+        """Record a score, snapshotting every ``snapshot_every`` additions."""
+        with self._lock:
+            self._digest.add(score)
+            self._pending.add(score)
+            due = self.path and self._pending.count >= self.snapshot_every
+        if due:
+            self.snapshot()
+
+    def save_at_exit(self):
+        """Snapshot the scores this process adds when it exits.
+
+        Call it in the processes that serve readings, not in a parent that
+        only imports the app before forking them.
+        """
+        if self.path and self._exit_pid != os.getpid():
+            self._exit_pid = os.getpid()
+            atexit.register(self.snapshot)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def snapshot(self):
+        """Merge the scores added since the last snapshot into the file at ``path``.
+
+        The file is read, merged and atomically replaced under an exclusive
+        lock, and the merged digest - with every other process's scores in
+        it - becomes this process's digest.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            if not self._pending.count:
+                return
+            pending = self._pending
+            self._pending = TDigest(compression=self.compression)
+            current = self._digest.to_dict()
+        try:
+            with self._file_lock():
+                merged = self._load()
+                if merged is None:
+                    # First snapshot: the whole digest, seed scores included
+                    merged = TDigest.from_dict(current)
+                else:
+                    merged.merge(pending)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(merged.to_dict(), f)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not snapshot percentile index to %s: %s", self.path, e)
+            with self._lock:
+                self._pending.merge(pending)
+            return
+        with self._lock:
+            # Keep the scores added while the file was being written
+            merged.merge(self._pending)
+            self._digest = merged
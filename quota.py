@@ -0,0 +1,272 @@
+"""Quota-aware scheduling of outbound RapidAPI calls across key pairs.
+
+Every configured key pair (``RAPIDAPI_KEY``/``RAPIDAPI_HOST``,
+``RAPIDAPI_KEY1``/``RAPIDAPI_HOST1``) gets a token bucket. Each call is
+routed to a key for its API host with a token to spend, preferring the one
+with the most quota left according to the ``X-RateLimit-*`` headers RapidAPI
+sends back. A key that runs dry or is answered with 429 sits out until its
+quota resets. Callers that have to wait queue by priority, so interactive
+readings go ahead of batch and background refresh traffic.
+"""
+import asyncio
+import contextvars
+import itertools
+import math
+import os
+import threading
+import time
+
+INTERACTIVE = 0
+BATCH = 1
+REFRESH = 2
+
+request_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+# Longest a waiter sleeps before re-checking the buckets
+POLL_INTERVAL = 0.05
+
+
+class SharedPriority:
+    """The priority of a call that several callers wait on.
+
+    It starts at the priority of the caller that made the call and rises to
+    that of any caller that joins it, so nobody waits on it at a lower
+    priority than their own.
+    """
+
+    def __init__(self, priority):
+        self._priorities = [priority]
+
+    def join(self, priority):
+        self._priorities.append(priority)
+
+    def value(self):
+        return min(priority_value(priority) for priority in self._priorities)
+
+
+def priority_value(priority):
+    """The number a plain or shared priority currently stands for."""
+    return priority.value() if isinstance(priority, SharedPriority) else priority
+
+
+def with_priority(priority, fn, *args, **kwargs):
+    """Call ``fn`` with outbound calls it makes queued at ``priority``."""
+    token = request_priority.set(priority)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        request_priority.reset(token)
+
+
+def _header(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ApiKey:
+    """One key pair's token bucket and last known quota."""
+
+    def __init__(self, name, key, host, rate, burst, clock=time.monotonic):
+        self.name = name
+        self.key = key
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.remaining = math.inf  # Calls left in the quota period, once known
+        self.reset_at = 0.0        # When the quota period ends, once known
+        self.blocked_until = 0.0
+        self.in_flight = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until this key can be used."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.remaining <= 0:
+            if now < self.reset_at:
+                return self.reset_at - now
+            self.remaining = math.inf  # A new period; unknown until the next response
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def take(self):
+        self.tokens -= 1
+        self.remaining -= 1
+        self.in_flight += 1
+
+    def record(self, status, headers, now):
+        """Update the quota from a finished call's status and rate-limit headers.
+
+        ``status`` is None when the call failed without a response.
+        """
+        self.in_flight -= 1
+        remaining = _header(headers, "X-RateLimit-Requests-Remaining")
+        reset = _header(headers, "X-RateLimit-Requests-Reset")
+        if remaining is not None:
+            # Calls still in flight will each use up one more
+            self.remaining = remaining - self.in_flight
+            self.reset_at = now + (reset or 1.0)
+        if status == 429:
+            retry_after = _header(headers, "Retry-After")
+            self.blocked_until = max(self.blocked_until, now + (retry_after or reset or 1.0))
+            self.tokens = min(self.tokens, 0.0)
+
+    def apply(self, headers):
+        """``headers`` with this key pair's credentials in place of the caller's."""
+        headers = {
+            name: value for name, value in headers.items()
+            if name.lower() not in ("x-rapidapi-key", "x-rapidapi-host")
+        }
+        headers["X-RapidAPI-Key"] = self.key
+        headers["X-RapidAPI-Host"] = self.host
+        return headers
+
+
+class QuotaScheduler:
+    """Hands out key pairs to outbound calls, in priority order, within quota.
+
+    With no keys configured every call goes straight through unchanged.
+    """
+
+    def __init__(self, keys, clock=time.monotonic):
+        self.keys = list(keys)
+        self.clock = clock
+        self._cond = threading.Condition()
+        # (sequence, priority) tickets; shared priorities can rise while they
+        # wait, so the head is looked for afresh each time
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    def _candidates(self, host):
+        matching = [key for key in self.keys if key.host == host]
+        return matching or self.keys
+
+    def _head(self):
+        return min(self._waiters, key=lambda ticket: (priority_value(ticket[1]), ticket[0]))
+
+    def _try_acquire(self, ticket, host):
+        """Under the lock: a key for the head-of-queue ticket, or the seconds to wait."""
+        if self._head() != ticket:
+            return None, POLL_INTERVAL
+        now = self.clock()
+        waits = [(key.wait_time(now), -key.remaining, index, key)
+                 for index, key in enumerate(self._candidates(host))]
+        wait, _, _, key = min(waits)
+        if wait > 0:
+            return None, wait
+        key.take()
+        self._waiters.remove(ticket)
+        self._cond.notify_all()
+        return key, 0.0
+
+    def _enqueue(self):
+        ticket = (next(self._sequence), request_priority.get())
+        with self._cond:
+            self._waiters.append(ticket)
+        return ticket
+
+    def _abandon(self, ticket):
+        with self._cond:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def acquire(self, host):
+        """Block until a key for ``host`` may be used; returns it, or None without keys."""
+        if not self.keys:
+            return None
+        ticket = self._enqueue()
+        try:
+            with self._cond:
+                while True:
+                    key, wait = self._try_acquire(ticket, host)
+                    if key is not None:
+                        return key
+                    self._cond.wait(min(wait, 1.0))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    async def acquire_async(self, host):
+        """``acquire`` for coroutines; waits without blocking the event loop."""
+        if not self.keys:
+            return None
+        ticket = self._enqueue()
+        try:
+            while True:
+                with self._cond:
+                    key, wait = self._try_acquire(ticket, host)
+                if key is not None:
+                    return key
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def retry_delay(self, key, host, headers):
+        """Seconds until a call that ``key`` got a 429 for can be tried again.
+
+        With keys that is until the first key for ``host`` can be used again,
+        which need not be the benched one; without keys, the ``Retry-After``.
+        """
+        if key is None:
+            return _header(headers, "Retry-After") or 1.0
+        with self._cond:
+            now = self.clock()
+            return min(candidate.wait_time(now) for candidate in self._candidates(host))
+
+    def release(self, key):
+        """Give back a key whose call was abandoned before it was answered."""
+        if key is None:
+            return
+        with self._cond:
+            key.in_flight -= 1
+            self._cond.notify_all()
+
+    def record(self, key, status=None, headers=None):
+        """Feed a finished call's response (None if it failed) back into the key's quota."""
+        if key is None:
+            return
+        with self._cond:
+            key.record(status, headers or {}, self.clock())
+            self._cond.notify_all()
+
+
+def scheduler_from_env():
+    """A scheduler over every key pair configured in the environment.
+
+    ``RAPIDAPI_RATE``/``RAPIDAPI_BURST`` (and ``RAPIDAPI_RATE1``/
+    ``RAPIDAPI_BURST1``) set each key's sustained calls per second and burst.
+    Every serving process keeps buckets of its own, so these are split evenly
+    between the ``WEB_CONCURRENCY`` processes sharing the keys.
+    """
+    processes = max(int(os.environ.get("WEB_CONCURRENCY", 1)), 1)
+    keys = []
+    for suffix in ("", "1"):
+        key = os.environ.get(f"RAPIDAPI_KEY{suffix}")
+        if not key:
+            continue
+        rate = float(os.environ.get(f"RAPIDAPI_RATE{suffix}", 5))
+        burst = float(os.environ.get(f"RAPIDAPI_BURST{suffix}", max(rate, 1)))
+        keys.append(ApiKey(
+            name=f"RAPIDAPI_KEY{suffix}",
+            key=key,
+            host=os.environ.get(f"RAPIDAPI_HOST{suffix}"),
+            rate=rate / processes,
+            # A bucket that can't hold a whole token never lets a call out
+            burst=max(burst / processes, 1)
+        ))
+    return QuotaScheduler(keys)
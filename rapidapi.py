@@ -0,0 +1,276 @@
+"""Cached access to the twitter154 RapidAPI endpoints.
+
+Tweet pages, continuation pages and user details are each kept in their own
+TTL+LRU cache, so a repeat request for a popular username is answered
+without touching the network. Cache sizes and lifetimes are configured per
+endpoint type through the environment. Behind the in-memory caches sits the
+persistent store shared by every worker on the host (see ``disk_store``):
+pages any worker fetched are found there, and only one worker at a time
+fetches a page that is missing.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import requests
+
+import disk_store
+import http_client
+import metrics
+import quota
+import startup
+from cache import TTLCache
+from singleflight import AsyncSingleFlight, SingleFlight
+
+startup.load_env()
+
+logger = logging.getLogger(__name__)
+
+# Overridable so the apps can be pointed at a local stub (see benchmarks/)
+BASE_URL = os.environ.get("RAPIDAPI_BASE_URL", "https://twitter154.p.rapidapi.com").rstrip("/")
+
+CACHES = {
+    "tweets": TTLCache(
+        maxsize=int(os.environ.get("TWEETS_CACHE_SIZE", 2048)),
+        ttl=float(os.environ.get("TWEETS_CACHE_TTL", 300))
+    ),
+    "continuation": TTLCache(
+        maxsize=int(os.environ.get("CONTINUATION_CACHE_SIZE", 2048)),
+        ttl=float(os.environ.get("CONTINUATION_CACHE_TTL", 900))
+    ),
+    "details": TTLCache(
+        maxsize=int(os.environ.get("DETAILS_CACHE_SIZE", 4096)),
+        ttl=float(os.environ.get("DETAILS_CACHE_TTL", 3600))
+    )
+}
+
+# Spreads calls over the configured key pairs within their quotas
+scheduler = quota.scheduler_from_env()
+
+# Concurrent misses for the same page share one upstream request
+_flights = SingleFlight("upstream")
+_async_flights = AsyncSingleFlight("upstream")
+
+# How long a worker may hold the claim on fetching a page before another
+# worker gives up waiting for it and fetches the page itself
+UPSTREAM_LEASE_SECONDS = float(os.environ.get("UPSTREAM_LEASE_SECONDS", 15))
+
+
+def get_json(endpoint, url, headers, params):
+    """GET a RapidAPI endpoint and return its decoded JSON, using the endpoint's cache.
+
+    ``endpoint`` names the cache to use (``tweets``, ``continuation`` or
+    ``details``). Only successful responses are cached; errors are raised as
+    ``requests`` exceptions exactly as before. Concurrent misses for the same
+    page are coalesced into a single upstream request. The returned data may
+    be shared with other requests, so callers must not modify it.
+    """
+    cache = CACHES[endpoint]
+    key = (url, tuple(sorted(params.items())))
+    data = cache.get(key)
+    if data is not None:
+        return data
+    return _flights.do((endpoint,) + key, _fetch, endpoint, cache, key, url, headers, params)
+
+
+def _api_host(headers):
+    return next((value for name, value in headers.items() if name.lower() == "x-rapidapi-host"), None)
+
+
+def _store_key(key):
+    url, params = key
+    return json.dumps([url, params], separators=(",", ":"))
+
+
+# Returned by _claim_or_load while another worker is fetching the page
+POLL = object()
+
+
+def _claim_or_load(store, endpoint, cache, key):
+    """Look for the page in the store, or claim the lease on fetching it.
+
+    Returns ``(data, claimed)``: the stored page, or None if this worker
+    should fetch it (``claimed`` says whether it holds the lease to release
+    afterwards). ``data`` is ``POLL`` while another worker holds the lease;
+    the caller sleeps in its own way and asks again.
+    """
+    store_key = _store_key(key)
+    try:
+        data = store.get(endpoint, store_key)
+        if data is not None:
+            cache.set(key, data)
+            return data, False
+        if store.claim(endpoint, store_key, UPSTREAM_LEASE_SECONDS):
+            return None, True
+    except sqlite3.Error as e:
+        logger.warning("Persistent store unavailable, fetching %s directly: %s", endpoint, e)
+        return None, False
+    return POLL, False
+
+
+def _store_result(store, endpoint, cache, key, data):
+    try:
+        store.set(endpoint, _store_key(key), data, cache.ttl)
+    except sqlite3.Error as e:
+        logger.warning("Could not persist %s page: %s", endpoint, e)
+
+
+def _release(store, endpoint, key):
+    try:
+        store.release(endpoint, _store_key(key))
+    except sqlite3.Error as e:
+        logger.warning("Could not release %s lease: %s", endpoint, e)
+
+
+def _fetch(endpoint, cache, key, url, headers, params):
+    store = disk_store.get_store()
+    claimed = False
+    if store is not None:
+        data, claimed = _claim_or_load(store, endpoint, cache, key)
+        while data is POLL:
+            time.sleep(quota.POLL_INTERVAL)
+            data, claimed = _claim_or_load(store, endpoint, cache, key)
+        if data is not None:
+            return data
+    try:
+        data = _fetch_upstream(endpoint, url, headers, params)
+        cache.set(key, data)
+        if store is not None:
+            _store_result(store, endpoint, cache, key, data)
+        return data
+    finally:
+        if claimed:
+            _release(store, endpoint, key)
+
+
+def _rate_limit_attempts():
+    # A 429 benches the key it came back on, so each key gets one try, plus
+    # one more once the first of them is back
+    return max(len(scheduler.keys), 1) + 1
+
+
+def _rate_limit_retry_delay(endpoint, api_key, headers, response_headers, attempt, attempts):
+    """Seconds to sleep before retrying a 429, or None to give up on it.
+
+    A call is only retried if it can go out again within
+    ``HTTP_MAX_RETRY_AFTER``; with keys, ``acquire`` does the waiting.
+    """
+    if attempt == attempts - 1:
+        return None
+    delay = scheduler.retry_delay(api_key, _api_host(headers), response_headers)
+    if delay > http_client.max_retry_after():
+        return None
+    logger.info("%s rate limited on %s, retrying in %.1f s", endpoint, api_key.name if api_key else "no key", delay)
+    return 0.0 if api_key is not None else delay
+
+
+def _fetch_upstream(endpoint, url, headers, params):
+    attempts = _rate_limit_attempts()
+    for attempt in range(attempts):
+        with metrics.stage_timer("quota_wait"):
+            api_key = scheduler.acquire(_api_host(headers))
+        call_headers = api_key.apply(headers) if api_key is not None else headers
+        with metrics.stage_timer(f"upstream_{endpoint}"):
+            try:
+                response = http_client.get(url, headers=call_headers, params=params)
+            except requests.exceptions.RequestException:
+                scheduler.record(api_key)
+                metrics.UPSTREAM_RESPONSES.inc(endpoint, "error")
+                raise
+        scheduler.record(api_key, response.status_code, response.headers)
+        metrics.UPSTREAM_RESPONSES.inc(endpoint, response.status_code)
+        if response.status_code != 429:
+            break
+        delay = _rate_limit_retry_delay(endpoint, api_key, headers, response.headers, attempt, attempts)
+        if delay is None:
+            break
+        if delay:
+            time.sleep(delay)
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_json_async(endpoint, url, headers, params):
+    """``get_json`` for the async app, sharing the same caches.
+
+    Errors are raised as ``aiohttp.ClientError`` (``async_client.HTTPStatusError``
+    for error statuses) or ``asyncio.TimeoutError``.
+    """
+    cache = CACHES[endpoint]
+    key = (url, tuple(sorted(params.items())))
+    data = cache.get(key)
+    if data is not None:
+        return data
+    return await _async_flights.do((endpoint,) + key, _fetch_async, endpoint, cache, key, url, headers, params)
+
+
+async def _fetch_async(endpoint, cache, key, url, headers, params):
+    # SQLite blocks, if only briefly, so the store is queried off the loop
+    store = disk_store.get_store()
+    claimed = False
+    if store is not None:
+        data, claimed = await asyncio.to_thread(_claim_or_load, store, endpoint, cache, key)
+        while data is POLL:
+            await asyncio.sleep(quota.POLL_INTERVAL)
+            data, claimed = await asyncio.to_thread(_claim_or_load, store, endpoint, cache, key)
+        if data is not None:
+            return data
+    try:
+        data = await _fetch_upstream_async(endpoint, url, headers, params)
+        cache.set(key, data)
+        if store is not None:
+            await asyncio.to_thread(_store_result, store, endpoint, cache, key, data)
+        return data
+    finally:
+        if claimed:
+            await asyncio.to_thread(_release, store, endpoint, key)
+
+
+async def _fetch_upstream_async(endpoint, url, headers, params):
+    # Imported here so the sync apps don't need aiohttp installed
+    import async_client
+
+    attempts = _rate_limit_attempts()
+    for attempt in range(attempts):
+        with metrics.stage_timer("quota_wait"):
+            api_key = await scheduler.acquire_async(_api_host(headers))
+        call_headers = api_key.apply(headers) if api_key is not None else headers
+        with metrics.stage_timer(f"upstream_{endpoint}"):
+            try:
+                status, data, response_headers = await async_client.get_json(
+                    url, headers=call_headers, params=params
+                )
+            except async_client.HTTPStatusError as e:
+                scheduler.record(api_key, e.status, e.headers)
+                metrics.UPSTREAM_RESPONSES.inc(endpoint, e.status)
+                if e.status != 429:
+                    raise
+                delay = _rate_limit_retry_delay(endpoint, api_key, headers, e.headers, attempt, attempts)
+                if delay is None:
+                    raise
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            except asyncio.CancelledError:
+                # Not an upstream failure; just hand the key back
+                scheduler.release(api_key)
+                raise
+            except BaseException:
+                scheduler.record(api_key)
+                metrics.UPSTREAM_RESPONSES.inc(endpoint, "error")
+                raise
+        scheduler.record(api_key, status, response_headers)
+        metrics.UPSTREAM_RESPONSES.inc(endpoint, status)
+        return data
+
+
+def cache_stats():
+    """Return hit/miss/eviction counters for every endpoint cache."""
+    stats = {endpoint: cache.stats() for endpoint, cache in CACHES.items()}
+    store = disk_store.get_store()
+    if store is not None:
+        stats["persistent"] = store.stats()
+    return stats
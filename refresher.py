@@ -0,0 +1,162 @@
+"""Background refresh of hot usernames.
+
+``HotKeys`` keeps an exponentially decaying request count per username.
+``Refresher`` re-runs a refresh function on worker threads: on demand, when a
+hot user is served a stale reading, and proactively, for the most requested
+users whose readings are about to go stale. Proactive refreshes are paid for
+out of a ``CallBudget`` of upstream API calls so re-warming can never eat
+the RapidAPI quota.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class HotKeys:
+    """Request frequency per key, halving every ``half_life`` seconds."""
+
+    def __init__(self, half_life=600, maxsize=10000, clock=time.monotonic):
+        self.half_life = half_life
+        self.maxsize = maxsize
+        self.clock = clock
+        self._scores = {}  # key -> (score, last update time)
+        self._lock = threading.Lock()
+
+    def _decayed(self, entry, now):
+        score, updated = entry
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def hit(self, key):
+        """Count one request for ``key`` and return its updated score."""
+        now = self.clock()
+        with self._lock:
+            entry = self._scores.get(key)
+            score = (self._decayed(entry, now) if entry else 0.0) + 1.0
+            self._scores[key] = (score, now)
+            if len(self._scores) > self.maxsize:
+                self._prune(now)
+            return score
+
+    def _prune(self, now):
+        # Keep the hottest half; cold keys can always earn their way back in
+        keep = heapq.nlargest(
+            self.maxsize // 2, self._scores.items(), key=lambda item: self._decayed(item[1], now)
+        )
+        self._scores = dict(keep)
+
+    def top(self, n):
+        """The ``n`` hottest keys with their current scores, hottest first."""
+        now = self.clock()
+        with self._lock:
+            scored = [(self._decayed(entry, now), key) for key, entry in self._scores.items()]
+        return [(key, score) for score, key in heapq.nlargest(n, scored)]
+
+
+class CallBudget:
+    """Token bucket of upstream calls: ``calls`` per ``window`` seconds."""
+
+    def __init__(self, calls, window, clock=time.monotonic):
+        self.capacity = float(calls)
+        self.rate = calls / window if window > 0 else 0.0
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self, calls):
+        """Spend ``calls`` tokens if they are available; returns whether it did."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < calls:
+                return False
+            self._tokens -= calls
+            return True
+
+
+class Refresher:
+    """Runs ``refresh(key)`` in the background, at most once per key at a time.
+
+    Every ``interval`` seconds the ``top_n`` hottest keys (scoring at least
+    ``min_score``) that ``is_stale`` reports as due are refreshed, each
+    charged ``calls_per_refresh`` against ``budget``. The sweep thread starts
+    lazily in each process, so it also runs in forked workers.
+    """
+
+    def __init__(self, refresh, is_stale, hot_keys, budget, top_n=100, interval=30,
+                 calls_per_refresh=3, min_score=1.0, workers=4):
+        self.refresh = refresh
+        self.is_stale = is_stale
+        self.hot_keys = hot_keys
+        self.budget = budget
+        self.top_n = top_n
+        self.interval = interval
+        self.calls_per_refresh = calls_per_refresh
+        self.min_score = min_score
+        self.workers = workers
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self):
+        """Start the worker pool and sweep thread if this process has none yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending = set()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tarot-refresh")
+            if self.interval > 0 and self.top_n > 0:
+                threading.Thread(target=self._sweep_forever, name="tarot-refresh-sweep", daemon=True).start()
+            self._pid = os.getpid()
+
+    def schedule(self, key, trigger="stale"):
+        """Queue a background refresh of ``key`` unless one is already queued."""
+        self.ensure_started()
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._run, key, trigger)
+        return True
+
+    def _run(self, key, trigger):
+        try:
+            self.refresh(key)
+            metrics.BACKGROUND_REFRESHES.inc(trigger, "ok")
+        except Exception as e:
+            metrics.BACKGROUND_REFRESHES.inc(trigger, "error")
+            logger.warning("Background refresh of %s failed: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def sweep(self):
+        """Re-warm the hottest keys that are due, within the call budget."""
+        for key, score in self.hot_keys.top(self.top_n):
+            if score < self.min_score:
+                return
+            if key in self._pending or not self.is_stale(key):
+                continue
+            if not self.budget.take(self.calls_per_refresh):
+                metrics.BACKGROUND_REFRESHES.inc("proactive", "over_budget")
+                return
+            self.schedule(key, trigger="proactive")
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Refresh sweep failed")
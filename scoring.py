@@ -0,0 +1,123 @@
+"""Vectorized engagement and composite scoring.
+
+A user's tweets are turned into an (n_tweets x 4) array of views, retweets,
+quotes and replies, and the whole engagement calculation is a handful of
+NumPy column reductions. The ``*_scores`` functions take many users at once
+so batch and offline jobs score every user in a single call. NumPy is
+imported on first use rather than with the module, so worker processes that
+have not scored anyone yet start without it.
+"""
+import math
+
+ENGAGEMENT_FIELDS = ('views', 'retweet_count', 'quote_count', 'reply_count')
+ENGAGEMENT_WEIGHTS = (0.3, 0.25, 0.15, 0.10)
+FOLLOWER_WEIGHT = 0.15
+TWEET_COUNT_WEIGHT = 0.05
+MAX_FOLLOWERS = 1000000
+MAX_TWEET_COUNT = 10000
+
+# (theme_distribution key, personality_indicators key) pairs summed into
+# each composite score, in the order of COMPOSITE_WEIGHTS
+COMPOSITE_COMPONENTS = (
+    (('technical_growth',), ('professional_focus',)),    # technical
+    (('creativity_arts',), ('creativity_level',)),       # creative
+    (('self_improvement',), ('growth_orientation',)),    # growth
+    (('emotional_depth',), ('emotional_expression',)),   # emotional
+    (('relationships',), ('social_engagement',)),        # social
+    ((), ('lifestyle_balance',)),                        # balance
+)
+COMPOSITE_WEIGHTS = (0.2, 0.2, 0.15, 0.15, 0.15, 0.10)
+ENGAGEMENT_SHARE = 0.05  # Engagement contributes 5% to the overall score
+COMPOSITE_SCALE = 100
+
+
+def engagement_matrix(tweets):
+    """Build the (n_tweets x 4) engagement array for a list of ``Tweet`` records."""
+    import numpy as np
+
+    if not tweets:
+        return np.zeros((0, len(ENGAGEMENT_FIELDS)))
+    return np.array([tweet.engagement() for tweet in tweets], dtype=np.float64)
+
+
+def engagement_scores(matrices, follower_counts, tweet_counts):
+    """Engagement score for many users at once.
+
+    ``matrices`` holds one ``engagement_matrix`` per user. Each metric's total
+    is normalized by its per-user maximum, and the follower count (log
+    scaled) and lifetime tweet count are mixed in.
+    """
+    import numpy as np
+
+    width = len(ENGAGEMENT_FIELDS)
+    lengths = np.array([len(matrix) for matrix in matrices], dtype=np.intp)
+    sums = np.zeros((len(matrices), width))
+    maxes = np.ones((len(matrices), width))  # Users with no tweets score 0
+
+    nonempty = lengths > 0
+    if nonempty.any():
+        stacked = np.concatenate([matrix for matrix in matrices if len(matrix)])
+        starts = (np.cumsum(lengths) - lengths)[nonempty]
+        sums[nonempty] = np.add.reduceat(stacked, starts, axis=0)
+        maxes[nonempty] = np.maximum.reduceat(stacked, starts, axis=0)
+
+    ratios = np.divide(sums, maxes, out=np.zeros_like(sums), where=maxes != 0)
+    followers = np.log1p(np.asarray(follower_counts, dtype=np.float64)) / math.log1p(MAX_FOLLOWERS)
+    tweet_totals = np.asarray(tweet_counts, dtype=np.float64) / MAX_TWEET_COUNT
+    return ratios @ np.asarray(ENGAGEMENT_WEIGHTS) + followers * FOLLOWER_WEIGHT + tweet_totals * TWEET_COUNT_WEIGHT
+
+
+def engagement_score(matrix, follower_count, tweet_count):
+    """Engagement score for a single user."""
+    return float(engagement_scores([matrix], [follower_count], [tweet_count])[0])
+
+
+def composite_features(analysis):
+    """Return one analysis's six normalized composite scores.
+
+    In order: technical, creative, growth, emotional, social and balance.
+    """
+    import numpy as np
+
+    theme_dist = analysis.get('theme_distribution', {})
+    personality = analysis.get('personality_indicators', {})
+    return np.array([
+        sum(theme_dist.get(key, 0) for key in theme_keys) +
+        sum(personality.get(key, 0) for key in personality_keys)
+        for theme_keys, personality_keys in COMPOSITE_COMPONENTS
+    ], dtype=np.float64) / COMPOSITE_SCALE
+
+
+def cumulative_scores(features, engagement):
+    """Weighted overall score for many users.
+
+    ``features`` is a (n_users x 6) array of ``composite_features`` rows and
+    ``engagement`` the matching engagement scores.
+    """
+    import numpy as np
+
+    features = np.asarray(features, dtype=np.float64).reshape(-1, len(COMPOSITE_WEIGHTS))
+    return features @ np.asarray(COMPOSITE_WEIGHTS) + np.asarray(engagement, dtype=np.float64) * ENGAGEMENT_SHARE
+
+
+def cumulative_score(analysis, engagement):
+    """Weighted overall score for a single user."""
+    return float(cumulative_scores(composite_features(analysis), [engagement])[0])
+
+
+def score_users(analyses, tweet_lists, user_details_list):
+    """Score many users in one call.
+
+    Returns ``(cumulative, engagement)`` arrays aligned with the inputs.
+    """
+    import numpy as np
+
+    engagement = engagement_scores(
+        [engagement_matrix(tweets) for tweets in tweet_lists],
+        [details.get('follower_count', 0) or 0 for details in user_details_list],
+        [details.get('number_of_tweets', 0) or 0 for details in user_details_list]
+    )
+    features = np.array([composite_features(analysis) for analysis in analyses]).reshape(
+        -1, len(COMPOSITE_WEIGHTS)
+    )
+    return cumulative_scores(features, engagement), engagement
@@ -0,0 +1,95 @@
+"""Coalescing of concurrent calls for the same key.
+
+When several threads ask for the same thing at once - the same upstream
+page, the same username's reading - only the first (the leader) does the
+work; the others wait for its result, or its exception, instead of
+repeating it. The shared call's upstream requests queue at the highest
+priority among the callers waiting on it (see ``quota.SharedPriority``).
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import metrics
+import quota
+
+
+class SingleFlight:
+    """At most one in-flight call per key; concurrent callers share its outcome."""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` unless a call for ``key`` is already running."""
+        priority = quota.request_priority.get()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = (Future(), quota.SharedPriority(priority))
+            else:
+                call[1].join(priority)
+        future, shared_priority = call
+
+        if not leader:
+            metrics.COALESCED_CALLS.inc(self.name)
+            return future.result()
+
+        try:
+            result = quota.with_priority(shared_priority, fn, *args, **kwargs)
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        # Later callers start a fresh call rather than reuse this outcome
+        with self._lock:
+            self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines running on one event loop.
+
+    The shared call runs as a task of its own, so any caller - the first one
+    included - can be cancelled without cancelling it for the others.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key, fn, *args):
+        """Await ``fn(*args)`` unless a call for ``key`` is already running."""
+        priority = quota.request_priority.get()
+        call = self._calls.get(key)
+        if call is None:
+            shared_priority = quota.SharedPriority(priority)
+            task = asyncio.create_task(self._run(shared_priority, fn, *args))
+            call = self._calls[key] = (task, shared_priority)
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            call[1].join(priority)
+            metrics.COALESCED_CALLS.inc(self.name)
+        return await asyncio.shield(call[0])
+
+    @staticmethod
+    async def _run(shared_priority, fn, *args):
+        # The task runs in a copy of the caller's context, so this stays local to it
+        quota.request_priority.set(shared_priority)
+        return await fn(*args)
+
+    def _finish(self, key, task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # The callers re-raise it themselves, if any are still waiting;
+            # don't log it as unretrieved
+            task.exception()
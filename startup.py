@@ -0,0 +1,28 @@
+"""Process start-up helpers.
+
+``python-dotenv`` is only imported when there is a ``.env`` file to load,
+so deployments that configure the environment directly don't pay for it.
+"""
+import os
+
+
+def find_env_file():
+    """The nearest ``.env`` in this directory or a parent, like ``find_dotenv``, or None."""
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def load_env():
+    """Load the nearest ``.env`` into ``os.environ``, without overriding set variables."""
+    path = find_env_file()
+    if path is not None:
+        from dotenv import load_dotenv
+
+        load_dotenv(path)
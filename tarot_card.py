@@ -1,3 +1,6 @@
+"""The tarot card catalog: meanings, career guidance, groups and percentile thresholds."""
+import bisect
+
 tarot_card_mapping = {
     # Major Arcana Cards
     "The Fool": "New beginnings, spontaneity, free spirit, potential.",
@@ -55,3 +58,192 @@ tarot_card_mapping = {
     "Page of Swords": "Curiosity, restlessness, mental energy, new ideas.",
     "Queen of Swords": "Perceptiveness, independence, fairness, clear boundaries."
 }
+
+# Career guidance for the cards a reading can land on
+CARD_GUIDANCE = {
+    "The Fool": {
+        "career_advice": "Take that leap into a new technology or role - your fresh perspective is valuable."
+    },
+    "The Magician": {
+        "career_advice": "Time to showcase your technical skills and take initiative on projects."
+    },
+    "The High Priestess": {
+        "career_advice": "Trust your instincts when solving complex problems."
+    },
+    "The Empress": {
+        "career_advice": "Nurture your team's growth and foster creative solutions."
+    },
+    "The Emperor": {
+        "career_advice": "Establish strong coding standards and best practices."
+    },
+    "The Hierophant": {
+        "career_advice": "Seek mentorship and share knowledge with others."
+    },
+    "The Lovers": {
+        "career_advice": "Focus on team collaboration and partnership projects."
+    },
+    "The Chariot": {
+        "career_advice": "Drive projects forward with clear technical direction."
+    },
+    "Strength": {
+        "career_advice": "Take on challenging technical problems with confidence."
+    },
+    "The Hermit": {
+        "career_advice": "Focus on deep work and independent projects."
+    },
+    "Wheel of Fortune": {
+        "career_advice": "Be ready to adapt to technological changes."
+    },
+    "Justice": {
+        "career_advice": "Ensure code quality and ethical considerations."
+    },
+    "The Hanged Man": {
+        "career_advice": "Step back and review your technical approach."
+    },
+    "Death": {
+        "career_advice": "Time for major technical transitions or stack changes."
+    },
+    "Temperance": {
+        "career_advice": "Balance technical debt with new development.",
+        "tech_focus": "Optimize system integration and compatibility."
+    },
+    "The Devil": {
+        "career_advice": "Don't get trapped by outdated technologies.",
+        "tech_focus": "Address technical debt and dependencies."
+    },
+    "The Tower": {
+        "career_advice": "Be prepared for technical challenges and system failures.",
+        "tech_focus": "Time to rebuild and refactor problematic systems."
+    },
+    "The Star": {
+        "career_advice": "Great time for learning and starting new projects.",
+        "tech_focus": "Explore emerging technologies and innovative solutions."
+    },
+    "The Moon": {
+        "career_advice": "Don't let imposter syndrome hold you back.",
+        "tech_focus": "Look beyond surface-level solutions to find root causes."
+    },
+    "The Sun": {
+        "career_advice": "Your technical achievements will be recognized and celebrated.",
+        "tech_focus": "Share your knowledge and contribute to open source."
+    },
+    "Judgement": {
+        "career_advice": "Evaluate your technical journey and future direction.",
+        "tech_focus": "Audit and improve your technical skills."
+    },
+    "The World": {
+        "career_advice": "Celebrate project completions and plan next challenges.",
+        "tech_focus": "Integration and deployment of complete systems."
+    },
+    "Ace of Wands": {
+        "career_advice": "Start new technical initiatives with enthusiasm.",
+        "tech_focus": "Experiment with innovative technologies."
+    },
+    "Two of Wands": {
+        "career_advice": "Plan your technical roadmap carefully.",
+        "tech_focus": "Research and compare technical solutions."
+    },
+    "Ace of Swords": {
+        "career_advice": "Cut through technical complexity with clear thinking.",
+        "tech_focus": "Focus on algorithmic problem-solving."
+    },
+    "Two of Swords": {
+        "career_advice": "Evaluate technical trade-offs carefully.",
+        "tech_focus": "Compare competing technical solutions."
+    }
+}
+
+# Cards with similar traits; a reading may land on any card in its groups
+CARD_GROUPS = {
+    "growth_and_potential": ["The Fool", "Ace of Wands", "Page of Wands", "The Star", "The World", "The Magician"],
+    "leadership_and_authority": ["The Emperor", "King of Wands", "King of Swords", "The Chariot", "Queen of Wands"],
+    "learning_and_wisdom": ["The Hierophant", "The Hermit", "Page of Swords", "The High Priestess", "Queen of Swords"],
+    "transformation_and_change": ["Death", "The Tower", "The World", "Judgement", "Six of Swords"],
+    "success_and_achievement": ["The Sun", "Six of Wands", "The World", "The Chariot", "Ten of Wands"],
+    "challenges_and_obstacles": ["Five of Wands", "Seven of Wands", "Five of Swords", "The Tower", "The Devil"]
+}
+
+# Percentile thresholds, lowest first: a score at or above a threshold (and
+# below the next) draws that card
+PERCENTILE_CARDS = [
+    (0.00, "The Tower"),           # Sudden change, upheaval, and revelation
+    (0.05, "The Devil"),           # Bondage, materialism, and shadow self
+    (0.10, "Temperance"),          # Balance, moderation, and harmony
+    (0.15, "Death"),               # Transformation, endings, and new beginnings
+    (0.20, "The Hanged Man"),      # Perspective, surrender, and new viewpoints
+    (0.25, "The Hermit"),          # Solitude, introspection, and wisdom
+    (0.30, "Strength"),            # Courage, inner strength, and resilience
+    (0.35, "The Lovers"),          # Relationships, harmony, and choices
+    (0.40, "Wheel of Fortune"),    # Change, cycles, and destiny
+    (0.45, "Justice"),             # Fairness, balance, and truth
+    (0.50, "The Chariot"),         # Determination, willpower, and victory
+    (0.55, "The Fool"),            # New beginnings, spontaneity, and potential
+    (0.60, "The High Priestess"),  # Intuition, creativity, and mystery
+    (0.65, "The Magician"),        # Mastery, skill, and personal growth
+    (0.70, "The Hierophant"),      # Tradition, community, and expertise
+    (0.75, "The Emperor"),         # Authority, structure, and leadership
+    (0.80, "The Empress"),         # Creativity, abundance, and nurturing
+    (0.85, "The Star"),            # Hope, inspiration, and aspiration
+    (0.90, "The Sun"),             # Joy, success, and positivity
+    (0.95, "The World")            # Completion, fulfillment, and success
+]
+
+
+class CardCatalog:
+    """Every card's details, its similar cards and the percentile-to-card table.
+
+    Built and checked once: every card named by a group or threshold must be
+    in the catalog, and every threshold card must have career guidance.
+    Lookups are then dictionary hits and a bisect; the returned structures
+    are shared, so callers must not modify them.
+    """
+
+    def __init__(self, meanings, guidance, groups, percentile_cards):
+        self.cards = {
+            name: {"meaning": meaning, **guidance.get(name, {})}
+            for name, meaning in meanings.items()
+        }
+        unknown = sorted(
+            {card for cards in groups.values() for card in cards} |
+            {card for _, card in percentile_cards} |
+            set(guidance)
+        )
+        unknown = [card for card in unknown if card not in self.cards]
+        if unknown:
+            raise ValueError(f"Unknown tarot cards: {', '.join(unknown)}")
+        unguided = [card for _, card in percentile_cards if card not in guidance]
+        if unguided:
+            raise ValueError(f"Tarot cards without career guidance: {', '.join(unguided)}")
+        self.thresholds = [threshold for threshold, _ in percentile_cards]
+        if self.thresholds != sorted(self.thresholds) or self.thresholds[0] > 0:
+            raise ValueError("Percentile thresholds must be ascending and start at 0")
+        self.threshold_cards = [card for _, card in percentile_cards]
+
+        # Every card that shares a group with each card, in group order
+        similar = {}
+        for cards in groups.values():
+            for card in cards:
+                similar.setdefault(card, {}).update(dict.fromkeys(cards))
+        self.similar = {card: tuple(cards) for card, cards in similar.items()}
+
+        # The card part of a reading, ready to be merged with the analysis
+        self.payloads = {
+            card: {
+                "card_name": card,
+                "card_meaning": self.cards[card]["meaning"],
+                "career_advice": self.cards[card]["career_advice"]
+            }
+            for card in self.threshold_cards
+        }
+
+    def card_for_percentile(self, percentile):
+        """The card drawn by a score at ``percentile`` (0 to 1)."""
+        index = bisect.bisect_right(self.thresholds, percentile) - 1
+        return self.threshold_cards[max(index, 0)]
+
+    def similar_cards(self, card_name):
+        """Cards sharing a group with ``card_name`` (itself included), or ()."""
+        return self.similar.get(card_name, ())
+
+
+CATALOG = CardCatalog(tarot_card_mapping, CARD_GUIDANCE, CARD_GROUPS, PERCENTILE_CARDS)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The app is a set of top-level modules, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the snapshot and store files of a real deployment
+os.environ["PERCENTILE_SNAPSHOT_PATH"] = ""
+os.environ["PERSISTENT_STORE_PATH"] = ""
@@ -0,0 +1,32 @@
+from analysis_model import get_analysis_model
+from analysis_pool import AnalysisPool
+
+TEXTS = [
+    "learning python at a coding bootcamp",
+    "great hike in the mountains today",
+    "",
+] * 5
+
+
+def test_pool_is_only_created_on_first_use_and_matches_inline_featurization():
+    pool = AnalysisPool(workers=1, min_chunk=4)
+    assert pool._executor is None
+    try:
+        results = pool.featurize(TEXTS)
+        assert pool._executor is not None
+    finally:
+        pool.shutdown()
+
+    model = get_analysis_model()
+    expected = [
+        model.matcher.scan_ids(text) + (model.sentiment_analyzer.polarity_scores(text)['compound'],)
+        for text in TEXTS
+    ]
+    assert results == expected
+
+
+def test_disabled_pool_never_starts_workers():
+    pool = AnalysisPool(workers=0)
+    pool.start()
+    assert not pool.enabled
+    assert pool._executor is None
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+import disk_store
+import fetch_tweets
+from disk_store import DiskStore
+from tweet_record import Tweet
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return DiskStore(str(tmp_path / "store.sqlite3"), clock=clock)
+
+
+def in_other_thread(fn, *args):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)))
+    thread.start()
+    thread.join(5)
+    return result[0]
+
+
+def test_values_expire(store, clock):
+    store.set("tweets", "k", {"results": [1, 2]}, ttl=10)
+    assert store.get("tweets", "k") == {"results": [1, 2]}
+    assert store.get("details", "k") is None
+    clock.now += 10
+    assert store.get("tweets", "k") is None
+    store.set("tweets", "never", {}, ttl=0)
+    assert store.get("tweets", "never") is None
+
+
+def test_lease_is_held_against_other_owners_until_released(store):
+    assert store.claim("tweets", "page", ttl=15)
+    # The owner may renew its own lease; anyone else has to wait
+    assert store.claim("tweets", "page", ttl=15)
+    assert not in_other_thread(store.claim, "tweets", "page", 15)
+    assert in_other_thread(store.claim, "tweets", "other page", 15)
+    store.release("tweets", "page")
+    assert in_other_thread(store.claim, "tweets", "page", 15)
+
+
+def test_lease_of_a_stalled_owner_expires(store, clock):
+    assert store.claim("tweets", "page", ttl=15)
+    clock.now += 14
+    assert not in_other_thread(store.claim, "tweets", "page", 15)
+    clock.now += 1
+    assert in_other_thread(store.claim, "tweets", "page", 15)
+
+
+def test_leases_are_shared_between_store_instances(tmp_path, clock):
+    path = str(tmp_path / "store.sqlite3")
+    first, second = DiskStore(path, clock=clock), DiskStore(path, clock=clock)
+    # Claimed on this thread: a finished thread's ident may be handed to the next one
+    assert first.claim("tweets", "page", 15)
+    assert not in_other_thread(second.claim, "tweets", "page", 15)
+    second.set("tweets", "page", {"results": []}, ttl=60)
+    assert first.get("tweets", "page") == {"results": []}
+
+
+def test_purge_drops_expired_entries_and_leases(store, clock):
+    store.set("tweets", "k", {}, ttl=5)
+    store.claim("tweets", "k", ttl=5)
+    clock.now += 5
+    store.purge_expired()
+    connection = store._connection()
+    assert connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+    assert connection.execute("SELECT COUNT(*) FROM leases").fetchone()[0] == 0
+
+
+def test_unchanged_reading_is_not_written_again(monkeypatch, store):
+    monkeypatch.setattr(disk_store, "_store", store)
+    monkeypatch.setattr(disk_store, "_store_loaded", True)
+    writes = []
+    original_set = store.set
+    monkeypatch.setattr(store, "set", lambda *args: writes.append(args[:2]) or original_set(*args))
+
+    tweets = [Tweet("2", "learning python every day"), Tweet("1", "hiking in the mountains")]
+    state = fetch_tweets.reader.build_state(tweets)
+    user_details = {"follower_count": 10, "number_of_tweets": 2}
+    fetch_tweets.reading_cache.pop("pytest_reader")
+    try:
+        first = fetch_tweets.finish_reading("pytest_reader", tweets, state, user_details)
+        again = fetch_tweets.finish_reading("pytest_reader", tweets, state, user_details)
+        assert again is first
+        assert writes == [("readings", "pytest_reader")]
+
+        tweets[0].views = 100
+        fetch_tweets.finish_reading("pytest_reader", tweets, state, user_details)
+        assert writes == [("readings", "pytest_reader")] * 2
+    finally:
+        fetch_tweets.reading_cache.pop("pytest_reader")
@@ -0,0 +1,159 @@
+import pytest
+
+import fetch_tweets
+from tweet_store import AnalysisState
+
+KEYWORD_FREE = "had a sandwich for lunch today"
+TECH = "shipping python code with docker and kubernetes"
+
+
+def page(texts, start_id=1000):
+    return [{"tweet_id": str(start_id - i), "text": text} for i, text in enumerate(texts)]
+
+
+@pytest.fixture
+def username():
+    name = "pytest_user"
+    fetch_tweets.tweet_store.reset(name)
+    yield name
+    fetch_tweets.tweet_store.reset(name)
+
+
+def test_keyword_free_tweets_give_a_neutral_analysis():
+    analysis = fetch_tweets.reader.analyze_personality(page([KEYWORD_FREE] * 3))
+    assert analysis["dominant_themes"] == [{"theme": "neutral", "frequency": 0}]
+    assert analysis["theme_distribution"] == {}
+    assert analysis["analysis_metadata"]["tweet_count"] == 3
+
+
+def test_keyword_free_chunks_never_converge(monkeypatch, username):
+    monkeypatch.setattr(fetch_tweets, "STREAM_ANALYSIS", True)
+    monkeypatch.setattr(fetch_tweets, "STREAM_CHUNK_SIZE", 10)
+    monkeypatch.setattr(fetch_tweets, "STREAM_MIN_TWEETS", 10)
+    tweets, state, previous, converged = fetch_tweets.fold_page(
+        username, page([KEYWORD_FREE] * 30), (AnalysisState(), None), first_page=True
+    )
+    assert not converged
+    assert state.tweet_count == 30
+
+
+def test_themes_after_a_keyword_free_first_chunk(monkeypatch, username):
+    monkeypatch.setattr(fetch_tweets, "STREAM_ANALYSIS", True)
+    monkeypatch.setattr(fetch_tweets, "STREAM_CHUNK_SIZE", 10)
+    monkeypatch.setattr(fetch_tweets, "STREAM_MIN_TWEETS", 10)
+    tweets, state, previous, converged = fetch_tweets.fold_page(
+        username, page([KEYWORD_FREE] * 10 + [TECH] * 30), (AnalysisState(), None), first_page=True
+    )
+    assert converged
+    assert previous[1]["dominant_themes"][0]["theme"] == "technical_growth"
+    assert state.tweet_count == 30
+
+
+def test_chunks_already_stored_are_not_analyzed_again(monkeypatch, username):
+    monkeypatch.setattr(fetch_tweets, "STREAM_ANALYSIS", True)
+    monkeypatch.setattr(fetch_tweets, "STREAM_CHUNK_SIZE", 10)
+    monkeypatch.setattr(fetch_tweets, "STREAM_MIN_TWEETS", 100)
+    analyze_state = fetch_tweets.reader.analyze_state
+    analyzed = []
+    monkeypatch.setattr(fetch_tweets.reader, "analyze_state", lambda state: analyzed.append(state) or analyze_state(state))
+    texts = [TECH] * 20
+    tweets, state, previous, _ = fetch_tweets.fold_page(username, page(texts), (AnalysisState(), None), True)
+    assert len(analyzed) == 2
+    assert previous[0] == state
+
+    tweets, state, previous, _ = fetch_tweets.fold_page(username, page(texts), previous, True)
+    assert len(analyzed) == 2
+
+    # The last chunk's analysis goes on to the reading instead of being redone
+    fetch_tweets.finish_reading(username, tweets, state, {}, previous[1])
+    assert len(analyzed) == 2
+    fetch_tweets.reading_cache.pop(username)
+
+
+@pytest.fixture
+def batch_calls(monkeypatch):
+    calls = []
+
+    def create_tarot_reading(username):
+        calls.append(username)
+        if username == "broken":
+            raise RuntimeError("upstream down")
+        return {"card": username}
+
+    monkeypatch.setattr(fetch_tweets, "create_tarot_reading", create_tarot_reading)
+    return calls
+
+
+def post_batch(payload):
+    return fetch_tweets.app.test_client().post("/user/tarot-readings", json=payload)
+
+
+@pytest.mark.parametrize("payload", [{}, {"usernames": []}, {"usernames": "alice"}])
+def test_batch_needs_a_list_of_usernames(batch_calls, payload):
+    response = post_batch(payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    assert batch_calls == []
+
+
+@pytest.mark.parametrize("usernames", [["alice", 7], ["alice", ""], [None]])
+def test_batch_usernames_must_be_non_empty_strings(batch_calls, usernames):
+    response = post_batch({"usernames": usernames})
+    assert response.status_code == 400
+    assert batch_calls == []
+
+
+def test_batch_reads_each_username_once(batch_calls):
+    response = post_batch({"usernames": ["alice", "bob", "alice"]})
+    assert response.status_code == 200
+    assert sorted(batch_calls) == ["alice", "bob"]
+    assert response.get_json() == {
+        "readings": {"alice": {"card": "alice"}, "bob": {"card": "bob"}},
+        "errors": {},
+        "count": 2
+    }
+
+
+def test_batch_size_is_capped_after_dropping_duplicates(monkeypatch, batch_calls):
+    monkeypatch.setattr(fetch_tweets, "MAX_BATCH_USERNAMES", 2)
+    assert post_batch({"usernames": ["alice", "bob", "alice"]}).status_code == 200
+    response = post_batch({"usernames": ["alice", "bob", "carol"]})
+    assert response.status_code == 400
+    assert sorted(batch_calls) == ["alice", "bob"]
+
+
+def test_batch_reports_a_failed_user_without_failing_the_rest(batch_calls):
+    response = post_batch({"usernames": ["alice", "broken"]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["readings"] == {"alice": {"card": "alice"}}
+    assert body["errors"] == {"broken": "upstream down"}
+    assert body["count"] == 1
+
+
+def test_reading_is_rebuilt_only_when_the_timeline_changes(monkeypatch, username):
+    built = []
+    generate_reading = fetch_tweets.reader.generate_reading
+    monkeypatch.setattr(
+        fetch_tweets.reader, "generate_reading", lambda *args: built.append(args) or generate_reading(*args)
+    )
+    user_details = {"follower_count": 10, "number_of_tweets": 3}
+    fetch_tweets.reading_cache.pop(username)
+    try:
+        tweets, state = fetch_tweets.tweet_store.ingest(username, page([TECH, KEYWORD_FREE]), "")
+        first = fetch_tweets.finish_reading(username, tweets, state, user_details)
+
+        # The same timeline fetched again
+        tweets, state = fetch_tweets.tweet_store.ingest(username, page([TECH, KEYWORD_FREE]))
+        assert fetch_tweets.finish_reading(username, tweets, state, user_details) is first
+        assert len(built) == 1
+
+        tweets, state = fetch_tweets.tweet_store.ingest(username, page(["new day, new python release"], 1001))
+        fingerprint = fetch_tweets.timeline_fingerprint(tweets, user_details)
+        assert fingerprint != fetch_tweets.reading_cache.get(username)[0]
+        reading = fetch_tweets.finish_reading(username, tweets, state, user_details)
+        assert len(built) == 2
+        assert reading is not first
+        assert fetch_tweets.reading_cache.get(username)[:2] == (fingerprint, reading)
+    finally:
+        fetch_tweets.reading_cache.pop(username)
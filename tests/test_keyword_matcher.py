@@ -0,0 +1,68 @@
+import re
+from collections import Counter
+
+import pytest
+
+from analysis_model import THEME_KEYWORDS
+from keyword_matcher import KeywordMatcher
+
+KEYWORDS = sorted({keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords})
+
+TEXTS = [
+    "",
+    "   ",
+    "learning python and machine learning at a coding bootcamp",
+    "Machine Learning is not machine learning",
+    "machine learningmachine learning machine learning",
+    "ai ai ai, ai! said the ai-generated ai_bot",
+    "self-taught devs: self taught is not self-taught",
+    "remote work remote workremote work... remote  work",
+    "codecademy code coding codes encode",
+    "e-learning and microlearning for lifelong learning",
+    "deep learning deep learning deep learning",
+    "generative ai generative aigenerative ai",
+    "ui/ux design beats ui ux design",
+    "café ñandú data_science data science",
+    "école de code\tpython\nreact\r\nnode",
+]
+
+
+def regex_scan(keywords, text):
+    """The scan ``analyze_personality`` used before the matcher."""
+    words = re.findall(r'\b\w+\b', text)
+    word_freq = Counter(words)
+    counts = {}
+    for keyword in keywords:
+        count = text.count(keyword) if ' ' in keyword else word_freq.get(keyword, 0)
+        if count:
+            counts[keyword] = count
+    return counts, len(words)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return KeywordMatcher(KEYWORDS)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_scan_matches_regex_scan(matcher, text):
+    assert matcher.scan(text) == regex_scan(KEYWORDS, text)
+
+
+def test_scan_matches_regex_scan_on_joined_texts(matcher):
+    text = " ".join(TEXTS)
+    assert matcher.scan(text) == regex_scan(KEYWORDS, text)
+
+
+def test_overlapping_phrases_count_like_str_count():
+    keywords = ["aa aa", "aa aa aa", "a"]
+    text = "aa aa aa aa aa a"
+    assert KeywordMatcher(keywords).scan(text) == regex_scan(keywords, text)
+
+
+def test_scan_ids_index_into_keywords(matcher):
+    counts, total_words = matcher.scan_ids("python python docker")
+    assert {matcher.keywords[keyword_id]: count for keyword_id, count in counts.items()} == {
+        'python': 2, 'docker': 1
+    }
+    assert total_words == 3
@@ -0,0 +1,119 @@
+import json
+import random
+from bisect import bisect_left
+
+import pytest
+
+from percentile_index import PercentileIndex, TDigest
+
+QUANTILES = (0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999)
+
+
+def exact_cdf(values, value):
+    return bisect_left(values, value) / len(values)
+
+
+def assert_close_to_exact(digest, values, tolerance):
+    values = sorted(values)
+    for q in QUANTILES:
+        value = values[int(q * (len(values) - 1))]
+        assert abs(digest.cdf(value) - exact_cdf(values, value)) <= tolerance, q
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "normal", "exponential"])
+def test_cdf_error_is_bounded(distribution):
+    rng = random.Random(7)
+    draw = {
+        "uniform": lambda: rng.random(),
+        "normal": lambda: rng.gauss(0, 1),
+        "exponential": lambda: rng.expovariate(3),
+    }[distribution]
+    values = [draw() for _ in range(20000)]
+    digest = TDigest(compression=100)
+    for value in values:
+        digest.add(value)
+    assert_close_to_exact(digest, values, 0.01)
+    assert digest.cdf(min(values) - 1) == 0
+    assert digest.cdf(max(values) + 1) == 1
+    # Memory stays bounded however many values were added
+    digest.compress()
+    assert len(digest.to_dict()["means"]) <= 2 * digest.compression
+
+
+def test_merged_digests_match_one_digest_of_all_values():
+    rng = random.Random(11)
+    left_values = [rng.gauss(0, 1) for _ in range(5000)]
+    right_values = [rng.gauss(2, 0.5) for _ in range(3000)]
+    left, right = TDigest(), TDigest()
+    for value in left_values:
+        left.add(value)
+    for value in right_values:
+        right.add(value)
+
+    left.merge(right)
+    assert left.count == 8000
+    assert left.min == min(left_values + right_values)
+    assert left.max == max(left_values + right_values)
+    assert_close_to_exact(left, left_values + right_values, 0.01)
+
+
+def test_round_trip_through_dict():
+    digest = TDigest()
+    for value in range(1000):
+        digest.add(value)
+    restored = TDigest.from_dict(json.loads(json.dumps(digest.to_dict())))
+    for value in (0, 10, 500, 990, 999):
+        assert restored.cdf(value) == pytest.approx(digest.cdf(value))
+
+
+def stored_count(path):
+    with open(path) as f:
+        return json.load(f)["count"]
+
+
+def test_snapshot_without_new_scores_writes_nothing(tmp_path):
+    path = tmp_path / "index.json"
+    index = PercentileIndex(path=str(path), seed_scores=[0.1, 0.2])
+    index.snapshot()
+    assert not path.exists()
+
+    index.add(0.3)
+    index.snapshot()
+    assert stored_count(path) == 3
+    mtime = path.stat().st_mtime_ns
+    index.snapshot()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_snapshots_from_several_processes_add_up(tmp_path):
+    path = str(tmp_path / "index.json")
+    seeds = [0.1, 0.2, 0.3]
+    # Two workers forked from the same parent start from the same digest
+    first = PercentileIndex(path=path, seed_scores=seeds)
+    second = PercentileIndex(path=path, seed_scores=seeds)
+    for score in (0.4, 0.5, 0.6):
+        first.add(score)
+    for score in (0.7, 0.8):
+        second.add(score)
+
+    first.snapshot()
+    second.snapshot()
+    assert stored_count(path) == 8
+    # Each picks up the other's scores once it has snapshotted
+    assert len(second) == 8
+
+    # A parent that never added a score leaves the file alone
+    parent = PercentileIndex(path=path, seed_scores=seeds)
+    parent.snapshot()
+    assert stored_count(path) == 8
+    assert len(PercentileIndex(path=path)) == 8
+
+
+def test_snapshot_every(tmp_path):
+    path = tmp_path / "index.json"
+    index = PercentileIndex(path=str(path), snapshot_every=3)
+    index.add(1)
+    index.add(2)
+    assert not path.exists()
+    index.add(3)
+    assert stored_count(path) == 3
@@ -0,0 +1,214 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import quota
+import rapidapi
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_key(name, clock, rate=2.0, burst=2.0, host="twitter154.p.rapidapi.com"):
+    return quota.ApiKey(name, f"{name}-secret", host, rate, burst, clock=clock)
+
+
+def test_bucket_refills_at_its_rate():
+    clock = FakeClock()
+    key = make_key("a", clock)
+    key.take()
+    key.take()
+    assert key.wait_time(clock.now) == pytest.approx(0.5)
+    clock.now += 0.25
+    assert key.wait_time(clock.now) == pytest.approx(0.25)
+    clock.now += 0.25
+    assert key.wait_time(clock.now) == 0.0
+    clock.now += 60
+    key.wait_time(clock.now)
+    assert key.tokens == key.burst
+
+
+def test_429_benches_the_key_and_calls_go_to_the_other():
+    clock = FakeClock()
+    a, b = make_key("a", clock, burst=5), make_key("b", clock, burst=5)
+    scheduler = quota.QuotaScheduler([a, b], clock=clock)
+
+    first = scheduler.acquire(a.host)
+    scheduler.record(first, 429, {"Retry-After": "30"})
+    assert first.wait_time(clock.now) == pytest.approx(30)
+
+    other = b if first is a else a
+    assert [scheduler.acquire(a.host) for _ in range(3)] == [other] * 3
+    clock.now += 30
+    for key in (a, b):
+        key.record(200, {}, clock.now)
+    assert first.wait_time(clock.now) == 0.0
+
+
+def test_exhausted_quota_waits_for_reset():
+    clock = FakeClock()
+    key = make_key("a", clock, burst=5)
+    key.take()
+    key.record(200, {"X-RateLimit-Requests-Remaining": "0", "X-RateLimit-Requests-Reset": "10"}, clock.now)
+    assert key.wait_time(clock.now) == pytest.approx(10)
+    clock.now += 10
+    assert key.wait_time(clock.now) == 0.0
+
+
+def test_waiters_are_served_in_priority_order():
+    clock = FakeClock()
+    key = make_key("a", clock, rate=1.0, burst=1.0)
+    scheduler = quota.QuotaScheduler([key], clock=clock)
+    scheduler.acquire(key.host)  # Empty the bucket so everyone after has to queue
+    served = []
+
+    def wait(priority, name):
+        quota.with_priority(priority, scheduler.acquire, key.host)
+        served.append(name)
+
+    threads = []
+    for priority, name in ((quota.REFRESH, "refresh"), (quota.BATCH, "batch"), (quota.INTERACTIVE, "interactive")):
+        thread = threading.Thread(target=wait, args=(priority, name), daemon=True)
+        thread.start()
+        threads.append(thread)
+        while len(scheduler._waiters) < len(threads):
+            time.sleep(0.001)
+
+    for expected in range(1, len(threads) + 1):
+        clock.now += 1.0
+        with scheduler._cond:
+            scheduler._cond.notify_all()
+        deadline = time.monotonic() + 5
+        while len(served) < expected and time.monotonic() < deadline:
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+    assert served == ["interactive", "batch", "refresh"]
+
+
+def test_a_waiter_whose_shared_priority_rises_goes_first():
+    clock = FakeClock()
+    key = make_key("a", clock, rate=1.0, burst=1.0)
+    scheduler = quota.QuotaScheduler([key], clock=clock)
+    scheduler.acquire(key.host)
+    shared = quota.SharedPriority(quota.REFRESH)
+    served = []
+
+    def wait(priority, name):
+        quota.with_priority(priority, scheduler.acquire, key.host)
+        served.append(name)
+
+    threads = []
+    for priority, name in ((quota.BATCH, "batch"), (shared, "refresh")):
+        thread = threading.Thread(target=wait, args=(priority, name), daemon=True)
+        thread.start()
+        threads.append(thread)
+        while len(scheduler._waiters) < len(threads):
+            time.sleep(0.001)
+
+    # An interactive caller now waits on the refresh
+    shared.join(quota.INTERACTIVE)
+    for expected in range(1, len(threads) + 1):
+        clock.now += 1.0
+        with scheduler._cond:
+            scheduler._cond.notify_all()
+        deadline = time.monotonic() + 5
+        while len(served) < expected and time.monotonic() < deadline:
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+    assert served == ["refresh", "batch"]
+
+
+def test_rate_limits_are_split_between_worker_processes(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k0")
+    monkeypatch.delenv("RAPIDAPI_KEY1", raising=False)
+    monkeypatch.setenv("RAPIDAPI_RATE", "6")
+    monkeypatch.delenv("RAPIDAPI_BURST", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    key, = quota.scheduler_from_env().keys
+    assert (key.rate, key.burst) == (2.0, 2.0)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "12")
+    key, = quota.scheduler_from_env().keys
+    assert (key.rate, key.burst) == (0.5, 1.0)
+
+
+def _response(status, body=b"{}", retry_after="30"):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers["Retry-After"] = retry_after
+    return response
+
+
+def test_fetch_upstream_moves_a_429_to_another_key(monkeypatch):
+    clock = FakeClock()
+    a, b = make_key("a", clock), make_key("b", clock)
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([a, b], clock=clock))
+    used = []
+
+    def fake_get(url, headers, params):
+        used.append(headers["X-RapidAPI-Key"])
+        return _response(429) if len(used) == 1 else _response(200, b'{"ok": true}')
+
+    monkeypatch.setattr(rapidapi.http_client, "get", fake_get)
+    data = rapidapi._fetch_upstream("tweets", "https://example.test", {"X-RapidAPI-Host": a.host}, {})
+    assert data == {"ok": True}
+    assert len(used) == 2 and used[0] != used[1]
+
+
+def test_fetch_upstream_retries_a_429_on_the_only_key_once_it_is_back(monkeypatch):
+    key = make_key("a", time.monotonic)
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([key]))
+    responses = [_response(429, retry_after="0.1"), _response(200, b'{"ok": true}')]
+    monkeypatch.setattr(rapidapi.http_client, "get", lambda url, headers, params: responses.pop(0))
+
+    started = time.monotonic()
+    data = rapidapi._fetch_upstream("tweets", "https://example.test", {"X-RapidAPI-Host": key.host}, {})
+    assert data == {"ok": True}
+    assert responses == []
+    assert time.monotonic() - started >= 0.1
+
+
+def test_fetch_upstream_does_not_wait_out_a_long_retry_after(monkeypatch):
+    key = make_key("a", time.monotonic)
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([key]))
+    responses = [_response(429, retry_after="3600"), _response(200)]
+    monkeypatch.setattr(rapidapi.http_client, "get", lambda url, headers, params: responses.pop(0))
+    with pytest.raises(requests.HTTPError):
+        rapidapi._fetch_upstream("tweets", "https://example.test", {"X-RapidAPI-Host": key.host}, {})
+    assert len(responses) == 1
+
+
+def test_fetch_upstream_without_keys_sleeps_out_the_retry_after(monkeypatch):
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([]))
+    responses = [_response(429, retry_after="2"), _response(200, b'{"ok": true}')]
+    sleeps = []
+    monkeypatch.setattr(rapidapi.http_client, "get", lambda url, headers, params: responses.pop(0))
+    monkeypatch.setattr(rapidapi.time, "sleep", sleeps.append)
+    assert rapidapi._fetch_upstream("tweets", "https://example.test", {}, {}) == {"ok": True}
+    assert sleeps == [2.0]
+
+
+def test_fetch_upstream_gives_up_after_every_key_was_rate_limited(monkeypatch):
+    clock = FakeClock()
+    a, b = make_key("a", clock), make_key("b", clock)
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([a, b], clock=clock))
+    calls = []
+
+    def fake_get(url, headers, params):
+        calls.append(headers["X-RapidAPI-Key"])
+        return _response(429)
+
+    monkeypatch.setattr(rapidapi.http_client, "get", fake_get)
+    with pytest.raises(requests.HTTPError):
+        rapidapi._fetch_upstream("tweets", "https://example.test", {"X-RapidAPI-Host": a.host}, {})
+    assert sorted(calls) == ["a-secret", "b-secret"]
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the app like a preloading gunicorn master, then forks workers that
+# each record some readings' scores and exit the way gunicorn workers do
+PRELOADED_SERVER = textwrap.dedent("""
+    import os, sys
+    import fetch_tweets
+
+    assert fetch_tweets.score_index._exit_pid is None, "master registered an exit snapshot"
+    for scores in ({first}, {second}):
+        pid = os.fork()
+        if pid == 0:
+            fetch_tweets.init_worker()
+            for score in scores:
+                fetch_tweets.score_index.add(score)
+            sys.exit(0)
+        _, status = os.waitpid(pid, 0)
+        assert status == 0, status
+    print(len(fetch_tweets.score_index))
+""")
+
+RESTARTED = "import fetch_tweets; print(len(fetch_tweets.score_index))"
+
+
+def run(code, snapshot_path, **env):
+    env = dict(
+        os.environ,
+        PERCENTILE_SNAPSHOT_PATH=snapshot_path,
+        PERSISTENT_STORE_PATH="",
+        LAZY_STARTUP="1",
+        ANALYSIS_WORKERS="0",
+        LOG_LEVEL="WARNING",
+        **env
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return int(result.stdout.split()[-1])
+
+
+def test_score_index_survives_a_restart(tmp_path):
+    path = str(tmp_path / "percentile_index.json")
+    first, second = [0.3, 0.4, 0.5], [0.6, 0.7]
+
+    master_count = run(PRELOADED_SERVER.format(first=first, second=second), path, GUNICORN_PRELOAD="1")
+    # The master only has the seed scores, and must not write them over the workers'
+    assert master_count == 10
+    with open(path) as f:
+        assert json.load(f)["count"] == 15
+
+    assert run(RESTARTED, path) == 15
+    # A second round of workers adds to what the first round left
+    run(PRELOADED_SERVER.format(first=[0.1], second=[0.2]), path, GUNICORN_PRELOAD="1")
+    assert run(RESTARTED, path) == 17
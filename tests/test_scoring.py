@@ -0,0 +1,106 @@
+import math
+
+import pytest
+
+import scoring
+from tweet_record import as_tweets
+
+
+def loop_scores(analysis, tweets, user_details):
+    """``(cumulative, engagement)`` the way ``select_tarot_card`` computed them per tweet."""
+    def normalize(value, max_value=100):
+        return value / max_value if max_value != 0 else 0
+
+    theme_dist = analysis.get('theme_distribution', {})
+    personality = analysis.get('personality_indicators', {})
+    technical_score = normalize(theme_dist.get('technical_growth', 0) + personality.get('professional_focus', 0))
+    creative_score = normalize(theme_dist.get('creativity_arts', 0) + personality.get('creativity_level', 0))
+    growth_score = normalize(theme_dist.get('self_improvement', 0) + personality.get('growth_orientation', 0))
+    emotional_score = normalize(theme_dist.get('emotional_depth', 0) + personality.get('emotional_expression', 0))
+    social_score = normalize(personality.get('social_engagement', 0) + theme_dist.get('relationships', 0))
+    balance_score = normalize(personality.get('lifestyle_balance', 0))
+
+    follower_count = user_details.get('follower_count', 0)
+    number_of_tweets = user_details.get('number_of_tweets', 0)
+
+    total_views = sum(tweet.get('views', 0) or 0 for tweet in tweets)
+    total_retweets = sum(tweet.get('retweet_count', 0) or 0 for tweet in tweets)
+    total_quotes = sum(tweet.get('quote_count', 0) or 0 for tweet in tweets)
+    total_replies = sum(tweet.get('reply_count', 0) or 0 for tweet in tweets)
+    max_views = max((tweet.get('views', 0) or 0 for tweet in tweets), default=1)
+    max_retweets = max((tweet.get('retweet_count', 0) or 0 for tweet in tweets), default=1)
+    max_quotes = max((tweet.get('quote_count', 0) or 0 for tweet in tweets), default=1)
+    max_replies = max((tweet.get('reply_count', 0) or 0 for tweet in tweets), default=1)
+
+    engagement_score = (
+        normalize(total_views, max_views) * 0.3 +
+        normalize(total_retweets, max_retweets) * 0.25 +
+        normalize(total_quotes, max_quotes) * 0.15 +
+        normalize(total_replies, max_replies) * 0.10 +
+        normalize(math.log1p(follower_count), math.log1p(1000000)) * 0.15 +
+        normalize(number_of_tweets, 10000) * 0.05
+    )
+    cumulative_score = (
+        technical_score * 0.2 +
+        creative_score * 0.2 +
+        growth_score * 0.15 +
+        emotional_score * 0.15 +
+        social_score * 0.15 +
+        balance_score * 0.10 +
+        engagement_score * 0.05
+    )
+    return cumulative_score, engagement_score
+
+
+ANALYSIS = {
+    'theme_distribution': {'technical_growth': 0.5, 'creativity_arts': 0.3, 'relationships': 0.2},
+    'personality_indicators': {
+        'professional_focus': 0.4, 'creativity_level': 0.1, 'growth_orientation': 0.2,
+        'emotional_expression': 0.3, 'social_engagement': 0.25, 'lifestyle_balance': 0.05
+    }
+}
+
+USERS = [
+    # Busy timeline, with missing and None counts
+    (ANALYSIS, [
+        {'views': 1200, 'retweet_count': 4, 'quote_count': 1, 'reply_count': 9},
+        {'views': 300, 'retweet_count': None, 'reply_count': 2},
+        {'views': 45000, 'retweet_count': 120, 'quote_count': 7, 'reply_count': 0},
+    ], {'follower_count': 5400, 'number_of_tweets': 812}),
+    # No tweets at all
+    (ANALYSIS, [], {'follower_count': 10, 'number_of_tweets': 3}),
+    # Tweets nobody engaged with
+    ({}, [{'views': 0, 'retweet_count': 0, 'quote_count': 0, 'reply_count': 0}] * 4, {}),
+    # A single tweet, and more followers than the scale allows for
+    (ANALYSIS, [{'views': 7, 'retweet_count': 1, 'quote_count': 0, 'reply_count': 3}],
+     {'follower_count': 2500000, 'number_of_tweets': 20000}),
+]
+
+
+@pytest.mark.parametrize("analysis, tweets, user_details", USERS)
+def test_single_user_scores_match_the_loop(analysis, tweets, user_details):
+    expected_cumulative, expected_engagement = loop_scores(analysis, tweets, user_details)
+    engagement = scoring.engagement_score(
+        scoring.engagement_matrix(as_tweets(tweets)),
+        user_details.get('follower_count', 0), user_details.get('number_of_tweets', 0)
+    )
+    assert engagement == pytest.approx(expected_engagement)
+    assert scoring.cumulative_score(analysis, engagement) == pytest.approx(expected_cumulative)
+
+
+def test_batch_scores_match_the_loop():
+    analyses, tweet_lists, user_details_list = zip(*USERS)
+    cumulative, engagement = scoring.score_users(
+        analyses, [as_tweets(tweets) for tweets in tweet_lists], user_details_list
+    )
+    expected = [loop_scores(*user) for user in USERS]
+    assert cumulative.tolist() == pytest.approx([score for score, _ in expected])
+    assert engagement.tolist() == pytest.approx([score for _, score in expected])
+
+
+def test_batch_of_empty_timelines():
+    cumulative, engagement = scoring.score_users([{}, {}], [[], []], [{}, {}])
+    assert cumulative.tolist() == [0.0, 0.0]
+    assert engagement.tolist() == [0.0, 0.0]
+    cumulative, engagement = scoring.score_users([], [], [])
+    assert cumulative.shape == engagement.shape == (0,)
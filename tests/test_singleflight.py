@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import metrics
+import quota
+import rapidapi
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def coalesced(name):
+    return metrics.COALESCED_CALLS._values.get((name,), 0)
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight("test-share")
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while coalesced("test-share") < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert results == ["done"] * 4
+    assert calls == [1]
+    assert flights._calls == {}
+
+
+def test_followers_get_the_leaders_exception():
+    flights = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    def call():
+        try:
+            flights.do("k", fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["upstream down"] * 2
+    assert flights._calls == {}
+
+
+def test_a_caller_joining_a_refresh_raises_its_priority():
+    flights = SingleFlight("test")
+    started, joined, release = threading.Event(), threading.Event(), threading.Event()
+    seen = []
+
+    def work():
+        started.set()
+        joined.wait(5)
+        seen.append(quota.priority_value(quota.request_priority.get()))
+        release.wait(5)
+        return "reading"
+
+    leader = threading.Thread(target=quota.with_priority, args=(quota.REFRESH, flights.do, "k", work))
+    leader.start()
+    started.wait(5)
+    assert flights._calls["k"][1].value() == quota.REFRESH
+    follower = threading.Thread(target=flights.do, args=("k", work))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while flights._calls["k"][1].value() != quota.INTERACTIVE and time.monotonic() < deadline:
+        time.sleep(0.001)
+    joined.set()
+    release.set()
+    for thread in (leader, follower):
+        thread.join(5)
+    assert seen == [quota.INTERACTIVE]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_async_callers_share_one_call():
+    async def main():
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        results = await asyncio.gather(*(flights.do("k", work, 21) for _ in range(5)))
+        assert results == [42] * 5
+        assert calls == [21]
+        assert flights._calls == {}
+        assert await flights.do("k", work, 1) == 2
+
+    run(main())
+
+
+def test_cancelling_the_first_caller_leaves_the_call_running_for_the_others():
+    async def main():
+        flights = AsyncSingleFlight("test")
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "page"
+
+        leader = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await follower == "page"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    run(main())
+
+
+def test_async_call_runs_at_the_highest_priority_of_its_callers():
+    async def main():
+        flights = AsyncSingleFlight("test")
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return quota.priority_value(quota.request_priority.get())
+
+        async def call(priority):
+            quota.request_priority.set(priority)
+            return await flights.do("k", work)
+
+        leader = asyncio.create_task(call(quota.REFRESH))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(call(quota.BATCH))
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(leader, follower) == [quota.BATCH, quota.BATCH]
+
+    run(main())
+
+
+def test_call_finishes_even_if_every_caller_gives_up():
+    async def main():
+        flights = AsyncSingleFlight("test")
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            finished.set()
+            return "page"
+
+        caller = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.wait_for(finished.wait(), 1)
+        await asyncio.sleep(0)
+        assert flights._calls == {}
+
+    run(main())
+
+
+def test_async_followers_get_the_exception():
+    async def main():
+        flights = AsyncSingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert [str(result) for result in results] == ["upstream down"] * 3
+        assert all(isinstance(result, ValueError) for result in results)
+
+    run(main())
+
+
+def test_cancelled_upstream_call_hands_its_key_back(monkeypatch):
+    import async_client
+
+    key = quota.ApiKey("a", "a-secret", "twitter154.p.rapidapi.com", rate=5, burst=5)
+    monkeypatch.setattr(rapidapi, "scheduler", quota.QuotaScheduler([key]))
+    errors_before = metrics.UPSTREAM_RESPONSES._values.get(("tweets", "error"), 0)
+
+    async def hang(url, headers=None, params=None):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(async_client, "get_json", hang)
+
+    async def main():
+        call = asyncio.create_task(
+            rapidapi._fetch_upstream_async("tweets", "https://example.test", {"X-RapidAPI-Host": key.host}, {})
+        )
+        await asyncio.sleep(0.01)
+        assert key.in_flight == 1
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    run(main())
+    assert key.in_flight == 0
+    assert metrics.UPSTREAM_RESPONSES._values.get(("tweets", "error"), 0) == errors_before
@@ -0,0 +1,86 @@
+import pytest
+
+from tarot_card import CARD_GROUPS, CARD_GUIDANCE, CATALOG, PERCENTILE_CARDS, CardCatalog, tarot_card_mapping
+
+
+def chained_card_for_percentile(percentile):
+    """The if/elif chain ``select_tarot_card`` used before the catalog.
+
+    It named "The Wheel of Fortune", which is not a catalog card; the
+    catalog's "Wheel of Fortune" stands in for it here.
+    """
+    if percentile >= 0.95:
+        return "The World"
+    elif percentile >= 0.90:
+        return "The Sun"
+    elif percentile >= 0.85:
+        return "The Star"
+    elif percentile >= 0.80:
+        return "The Empress"
+    elif percentile >= 0.75:
+        return "The Emperor"
+    elif percentile >= 0.70:
+        return "The Hierophant"
+    elif percentile >= 0.65:
+        return "The Magician"
+    elif percentile >= 0.60:
+        return "The High Priestess"
+    elif percentile >= 0.55:
+        return "The Fool"
+    elif percentile >= 0.50:
+        return "The Chariot"
+    elif percentile >= 0.45:
+        return "Justice"
+    elif percentile >= 0.40:
+        return "Wheel of Fortune"
+    elif percentile >= 0.35:
+        return "The Lovers"
+    elif percentile >= 0.30:
+        return "Strength"
+    elif percentile >= 0.25:
+        return "The Hermit"
+    elif percentile >= 0.20:
+        return "The Hanged Man"
+    elif percentile >= 0.15:
+        return "Death"
+    elif percentile >= 0.10:
+        return "Temperance"
+    elif percentile >= 0.05:
+        return "The Devil"
+    else:
+        return "The Tower"
+
+
+PERCENTILES = sorted(
+    {threshold + offset for threshold, _ in PERCENTILE_CARDS for offset in (-1e-9, 0.0, 1e-9)} |
+    {-0.5, 0.42, 0.999, 1.0, 1.5}
+)
+
+
+@pytest.mark.parametrize("percentile", PERCENTILES)
+def test_card_for_percentile_matches_the_old_chain(percentile):
+    assert CATALOG.card_for_percentile(percentile) == chained_card_for_percentile(percentile)
+
+
+def test_wheel_of_fortune_is_drawn_between_40_and_45():
+    for percentile in (0.40, 0.42, 0.4499):
+        assert CATALOG.card_for_percentile(percentile) == "Wheel of Fortune"
+    assert "career_advice" in CATALOG.payloads["Wheel of Fortune"]
+
+
+def test_unknown_threshold_card_is_rejected():
+    cards = PERCENTILE_CARDS[:-1] + [(0.95, "The Wheel of Fortune")]
+    with pytest.raises(ValueError, match="Unknown tarot cards: The Wheel of Fortune"):
+        CardCatalog(tarot_card_mapping, CARD_GUIDANCE, CARD_GROUPS, cards)
+
+
+def test_unknown_group_card_is_rejected():
+    groups = dict(CARD_GROUPS, extra=["The Joker"])
+    with pytest.raises(ValueError, match="Unknown tarot cards: The Joker"):
+        CardCatalog(tarot_card_mapping, CARD_GUIDANCE, groups, PERCENTILE_CARDS)
+
+
+def test_threshold_card_without_guidance_is_rejected():
+    guidance = {card: advice for card, advice in CARD_GUIDANCE.items() if card != "Justice"}
+    with pytest.raises(ValueError, match="without career guidance: Justice"):
+        CardCatalog(tarot_card_mapping, guidance, CARD_GROUPS, PERCENTILE_CARDS)
@@ -0,0 +1,72 @@
+import glob
+import json
+import os
+import re
+from collections import Counter, defaultdict
+
+import pytest
+
+import fetch_tweets
+from analysis_model import THEME_KEYWORDS
+from keyword_matrix import dense_counts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "benchmarks", "fixtures", "*.json")))
+
+
+def fixture_tweets(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data["tweets_page"]["results"] + data["continuation_page"]["results"]
+
+
+def dict_theme_scores(tweets):
+    """Theme scores the way ``analyze_personality`` computed them before the matrices."""
+    combined_text = ' '.join(tweet['text'].lower() for tweet in tweets)
+    words = re.findall(r'\b\w+\b', combined_text)
+    word_freq = Counter(words)
+    themes = defaultdict(int)
+    for theme, keywords in THEME_KEYWORDS.items():
+        theme_score = 0
+        matched_keywords = set()
+        for keyword in keywords:
+            count = combined_text.count(keyword) if ' ' in keyword else word_freq.get(keyword, 0)
+            if count > 0:
+                theme_score += count * 2 if ' ' in keyword else count
+                matched_keywords.add(keyword)
+        if theme_score > 0:
+            themes[theme] = (theme_score / len(words)) * (len(matched_keywords) / len(keywords))
+    return themes
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_matrix_scores_match_the_dict_scores(path):
+    tweets = fixture_tweets(path)
+    themes = dict_theme_scores(tweets)
+    total = sum(themes.values())
+
+    analysis = fetch_tweets.reader.analyze_personality(tweets)
+    assert analysis["theme_distribution"] == pytest.approx({theme: score / total for theme, score in themes.items()})
+    expected_dominant = sorted(themes.items(), key=lambda item: item[1], reverse=True)[:3]
+    assert [entry["theme"] for entry in analysis["dominant_themes"]] == [theme for theme, _ in expected_dominant]
+    assert [entry["frequency"] for entry in analysis["dominant_themes"]] == pytest.approx(
+        [score / total for _, score in expected_dominant]
+    )
+    assert analysis["personality_indicators"]["professional_focus"] == pytest.approx(
+        themes.get('professional_development', 0) + themes.get('technical_growth', 0)
+    )
+    assert analysis["analysis_metadata"]["unique_themes_detected"] == len(themes)
+
+
+def test_per_tweet_theme_scores_sum_to_the_window_scores():
+    reader = fetch_tweets.reader
+    model = reader.model
+    tweets = fixture_tweets(FIXTURES[0])
+    features = reader.extract_features_batch(fetch_tweets.as_tweets(tweets))
+    per_tweet = reader.tweet_theme_vectors(features)
+    totals = sum((dense_counts(feature.keyword_counts, len(model.keywords)) for feature in features))
+    window, matched = model.theme_scores(totals)
+    assert per_tweet.shape == (len(tweets), len(model.themes))
+    assert per_tweet.sum(axis=0) == pytest.approx(window)
+    assert (matched <= model.theme_sizes).all()
+    assert reader.tweet_theme_vectors([]).shape == (0, len(model.themes))
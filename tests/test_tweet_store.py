@@ -0,0 +1,103 @@
+from tweet_record import Tweet
+from tweet_store import AnalysisState, TweetFeatures, TweetStore, pinned_tweet_id
+
+
+def tweet(tweet_id, text="", views=0):
+    return {"tweet_id": tweet_id, "text": text, "views": views}
+
+
+class Featurizer:
+    """Counts each word of a tweet as a keyword ID, its length."""
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, tweets):
+        self.seen.extend(tweet.tweet_id for tweet in tweets)
+        return [
+            TweetFeatures(
+                tweet.tweet_id,
+                {len(word): tweet.text.split().count(word) for word in tweet.text.split()},
+                len(tweet.text.split()),
+                0.5 if "good" in tweet.text else -0.5
+            )
+            for tweet in tweets
+        ]
+
+
+def assert_state_matches(store, state, tweets):
+    expected = AnalysisState.from_features(store.featurize(tweets))
+    assert dict(state.keyword_counts) == dict(expected.keyword_counts)
+    assert state.total_words == expected.total_words
+    assert state.tweet_count == expected.tweet_count
+    assert state.positive_count == expected.positive_count
+    assert abs(state.sentiment_sum - expected.sentiment_sum) < 1e-9
+
+
+def test_window_keeps_the_newest_tweets_by_numeric_id():
+    store = TweetStore(Featurizer(), window=3)
+    store.ingest("alice", [tweet("9", "a good day"), tweet("10", "bb"), tweet("8", "ccc dd")])
+    tweets, state = store.ingest("Alice", [tweet("11", "good good"), tweet("100", "e")])
+    assert [t.tweet_id for t in tweets] == ["100", "11", "10"]
+    assert store.newest_id("ALICE") == "100"
+    assert_state_matches(store, state, tweets)
+
+
+def test_seen_tweets_are_not_featurized_again_but_get_new_engagement():
+    featurizer = Featurizer()
+    store = TweetStore(featurizer, window=10)
+    store.ingest("bob", [tweet("1", "x", views=5), tweet("2", "y")])
+    tweets, state = store.ingest("bob", [tweet("3", "z"), tweet("1", "x", views=50), tweet("3", "z")])
+    assert featurizer.seen == ["1", "2", "3"]
+    assert {t.tweet_id: t.views for t in tweets}["1"] == 50
+    assert state.tweet_count == 3
+
+
+def test_pinned_tweet_stays_in_the_window_ahead_of_newer_tweets():
+    store = TweetStore(Featurizer(), window=3)
+    first_page = [tweet("5", "pinned good"), tweet("20"), tweet("19"), tweet("18"), tweet("17")]
+    tweets, state = store.ingest("carol", first_page, pinned_tweet_id(first_page))
+    assert [t.tweet_id for t in tweets] == ["5", "20", "19"]
+    assert_state_matches(store, state, tweets)
+
+    # Newer tweets push out older ones, never the pinned tweet
+    tweets, state = store.ingest("carol", [tweet("21")])
+    assert [t.tweet_id for t in tweets] == ["5", "21", "20"]
+    assert_state_matches(store, state, tweets)
+
+
+def test_unpinned_tweet_leaves_the_window_by_age():
+    store = TweetStore(Featurizer(), window=3)
+    first_page = [tweet("5", "pinned"), tweet("20"), tweet("19")]
+    store.ingest("dave", first_page, pinned_tweet_id(first_page))
+    first_page = [tweet("22"), tweet("21"), tweet("20")]
+    tweets, state = store.ingest("dave", first_page, pinned_tweet_id(first_page))
+    assert [t.tweet_id for t in tweets] == ["22", "21", "20"]
+    assert_state_matches(store, state, tweets)
+
+
+def test_tweets_without_an_id_are_skipped():
+    store = TweetStore(Featurizer(), window=10)
+    tweets, state = store.ingest("erin", [tweet(None, "one"), tweet("", "two"), {"text": "three"}, tweet("7", "x")])
+    assert [t.tweet_id for t in tweets] == ["7"]
+    assert state.tweet_count == 1
+
+
+def test_pinned_tweet_id():
+    assert pinned_tweet_id([tweet("5"), tweet("20"), tweet("19")]) == "5"
+    assert pinned_tweet_id([tweet("21"), tweet("20"), tweet("19")]) == ""
+    assert pinned_tweet_id([tweet("5")]) == ""
+    assert pinned_tweet_id([tweet(None), tweet("20")]) == ""
+    assert pinned_tweet_id([]) == ""
+
+
+def test_merged_states_cover_both_sets():
+    featurizer = Featurizer()
+    left = AnalysisState.from_features(featurizer([Tweet("1", "good a")]))
+    right = AnalysisState.from_features(featurizer([Tweet("2", "bb bb")]))
+    merged = left.merge(right)
+    assert dict(merged.keyword_counts) == {1: 1, 4: 1, 2: 2}
+    assert merged.tweet_count == 2 and merged.total_words == 4
+    assert merged.sentiment_average == 0
+    assert left.tweet_count == 1  # Unchanged by the merge
+
@@ -0,0 +1,155 @@
+"""In-process access to a user's latest tweets.
+
+Both apps page through RapidAPI the same way: a first page of 20 tweets
+(pinned tweet included), then continuation pages of up to 40, capped at
+``MAX_TWEETS``. ``app.py`` serves the result as JSON and the tarot reader
+consumes it directly, so no request has to go through the loopback
+``/user/tweets`` endpoint.
+"""
+import asyncio
+import contextvars
+import os
+
+import rapidapi
+from tweet_store import tweet_id_key
+
+MAX_TWEETS = 50
+
+RAPIDAPI_HOST = os.environ.get("RAPIDAPI_HOST")
+RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
+
+
+def page_request(username, continuation_token=None):
+    """``(endpoint, url, headers, params)`` for the first page or the page after ``continuation_token``."""
+    headers = {
+        "X-RapidAPI-Key": RAPIDAPI_KEY,
+        "X-RapidAPI-Host": RAPIDAPI_HOST
+    }
+
+    if continuation_token is None:
+        url_initial = f"{rapidapi.BASE_URL}/user/tweets"
+        params_initial = {
+            "username": username,
+            "limit": "20",
+            "include_replies": "false",
+            "include_pinned": "true"
+        }
+        return "tweets", url_initial, headers, params_initial
+
+    url_continuation = f"{rapidapi.BASE_URL}/user/tweets/continuation"
+    params_continuation = {
+        "username": username,
+        "limit": "40",
+        "continuation_token": continuation_token,
+        "include_replies": "false"
+    }
+    return "continuation", url_continuation, headers, params_continuation
+
+
+def fetch_tweet_page(username, continuation_token=None):
+    """Fetch the first page of a user's tweets, or the page after ``continuation_token``."""
+    return rapidapi.get_json(*page_request(username, continuation_token))
+
+
+async def fetch_tweet_page_async(username, continuation_token=None):
+    """``fetch_tweet_page`` for the async app."""
+    return await rapidapi.get_json_async(*page_request(username, continuation_token))
+
+
+def _take_page(data, fetched, max_tweets, since_id, first_page):
+    """Cut a page of results to the cap and decide whether to fetch the next one.
+
+    Returns the page, the running tweet count and the continuation token to
+    follow, or None when paging should stop.
+    """
+    page = data.get("results", [])[:max_tweets - fetched]
+    fetched += len(page)
+    continuation_token = data.get("continuation_token")
+
+    # The first result may be an older pinned tweet, so it can't show overlap
+    overlap_from = 1 if first_page else 0
+    caught_up = since_id is not None and any(
+        tweet_id_key(tweet.get("tweet_id")) <= tweet_id_key(since_id)
+        for tweet in page[overlap_from:]
+    )
+    if not (page and continuation_token and fetched < max_tweets and not caught_up):
+        continuation_token = None
+    return page, fetched, continuation_token
+
+
+def iter_tweet_pages(username, since_id=None, max_tweets=MAX_TWEETS, executor=None):
+    """Yield a user's tweets page by page, newest first, up to ``max_tweets``.
+
+    With an ``executor``, the next continuation page is requested in the
+    background as soon as a page is yielded, so it downloads while the
+    caller works on the current one. Paging stops once a page reaches back
+    to ``since_id``, the newest tweet the caller already has.
+    """
+    data = fetch_tweet_page(username)
+    fetched = 0
+    first_page = True
+    while True:
+        page, fetched, continuation_token = _take_page(data, fetched, max_tweets, since_id, first_page)
+        first_page = False
+        next_page = None
+        if continuation_token and executor is not None:
+            # Carry the caller's context (e.g. its quota priority) into the worker
+            next_page = executor.submit(
+                contextvars.copy_context().run, fetch_tweet_page, username, continuation_token
+            )
+        try:
+            yield page
+        except GeneratorExit:
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if continuation_token is None:
+            return
+        if next_page is not None:
+            data = next_page.result()
+        else:
+            data = fetch_tweet_page(username, continuation_token)
+
+
+async def iter_tweet_pages_async(username, since_id=None, max_tweets=MAX_TWEETS):
+    """``iter_tweet_pages`` for the async app; the next page is always prefetched."""
+    data = await fetch_tweet_page_async(username)
+    fetched = 0
+    first_page = True
+    while True:
+        page, fetched, continuation_token = _take_page(data, fetched, max_tweets, since_id, first_page)
+        first_page = False
+        next_page = None
+        if continuation_token:
+            next_page = asyncio.ensure_future(fetch_tweet_page_async(username, continuation_token))
+        try:
+            yield page
+        except GeneratorExit:
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if next_page is None:
+            return
+        data = await next_page
+
+
+def fetch_user_tweets(username, since_id=None, max_tweets=MAX_TWEETS, executor=None):
+    """Fetch up to ``max_tweets`` of the user's latest tweets as upstream dicts.
+
+    The returned dicts may be shared with the response cache, so callers must
+    not modify them.
+    """
+    return [
+        tweet
+        for page in iter_tweet_pages(username, since_id, max_tweets, executor)
+        for tweet in page
+    ]
+
+
+async def fetch_user_tweets_async(username, since_id=None, max_tweets=MAX_TWEETS):
+    """``fetch_user_tweets`` for the async app."""
+    return [
+        tweet
+        async for page in iter_tweet_pages_async(username, since_id, max_tweets)
+        for tweet in page
+    ]
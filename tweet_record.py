@@ -0,0 +1,61 @@
+"""Compact tweet record carried through the analysis pipeline.
+
+Upstream tweets arrive as large JSON dicts, but the analysis only ever reads
+the text, the ID and four engagement counts. ``Tweet`` keeps just those in
+``__slots__``, which is a fraction of the dict's size, so hundreds of tweets
+per user and many users per worker stay cheap to hold.
+"""
+
+
+def _count(value):
+    # Missing, None or non-numeric counts are treated as zero
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+class Tweet:
+    """The fields of a tweet the analysis uses."""
+
+    __slots__ = ('tweet_id', 'text', 'views', 'retweet_count', 'quote_count', 'reply_count')
+
+    def __init__(self, tweet_id, text, views=0, retweet_count=0, quote_count=0, reply_count=0):
+        self.tweet_id = tweet_id
+        self.text = text
+        self.views = views
+        self.retweet_count = retweet_count
+        self.quote_count = quote_count
+        self.reply_count = reply_count
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a record from an upstream tweet dict."""
+        return cls(
+            str(data.get('tweet_id') or ''),
+            data.get('text') or '',
+            _count(data.get('views')),
+            _count(data.get('retweet_count')),
+            _count(data.get('quote_count')),
+            _count(data.get('reply_count'))
+        )
+
+    def update_engagement(self, data):
+        """Refresh the engagement counts from a newer copy of the tweet."""
+        self.views = _count(data.get('views'))
+        self.retweet_count = _count(data.get('retweet_count'))
+        self.quote_count = _count(data.get('quote_count'))
+        self.reply_count = _count(data.get('reply_count'))
+
+    def engagement(self):
+        return self.views, self.retweet_count, self.quote_count, self.reply_count
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"Tweet({self.tweet_id!r}, {self.text[:30]!r})"
+
+
+def as_tweets(tweets):
+    """Return ``tweets`` as ``Tweet`` records, converting any upstream dicts."""
+    return [tweet if isinstance(tweet, Tweet) else Tweet.from_api(tweet) for tweet in tweets]
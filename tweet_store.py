@@ -0,0 +1,265 @@
+"""Per-user tweet store with mergeable analysis state.
+
+Each tweet is tokenized and sentiment-scored once, when it is first seen,
+into a ``TweetFeatures`` record. A user's reading window is summarized by an
+``AnalysisState`` - keyword counts, word count and sentiment sums - that new
+tweets are folded into and tweets leaving the window are subtracted from.
+A refresh therefore costs work proportional to the number of new tweets,
+not to the size of the history.
+
+The window holds the newest tweets by ID, plus the user's pinned tweet,
+which stays in the window however old it is, like it did when every
+reading analyzed the first page as fetched.
+"""
+import logging
+import math
+import threading
+from collections import Counter
+
+from cache import TTLCache
+from tweet_record import Tweet
+
+logger = logging.getLogger(__name__)
+
+
+def tweet_id_key(tweet_id):
+    """Sort key for tweet IDs, which are numeric strings of varying length."""
+    tweet_id = str(tweet_id or "")
+    return len(tweet_id), tweet_id
+
+
+def pinned_tweet_id(first_page):
+    """The ID of the pinned tweet heading a user's first page of tweets, or "".
+
+    Upstream lists the pinned tweet first, ahead of newer tweets, so it is
+    told apart by being older than the tweet after it.
+    """
+    if len(first_page) < 2:
+        return ""
+    pinned_id = str(first_page[0].get("tweet_id") or "")
+    if pinned_id and tweet_id_key(pinned_id) < tweet_id_key(first_page[1].get("tweet_id")):
+        return pinned_id
+    return ""
+
+
+class TweetFeatures:
+    """Everything the analysis needs from a single tweet.
+
+    ``keyword_counts`` is the tweet's sparse row of the tweet x keyword
+    matrix, ``{keyword ID: count}`` (see ``keyword_matrix``).
+    """
+
+    __slots__ = ('tweet_id', 'keyword_counts', 'word_count', 'sentiment')
+
+    def __init__(self, tweet_id, keyword_counts, word_count, sentiment):
+        self.tweet_id = tweet_id
+        self.keyword_counts = keyword_counts
+        self.word_count = word_count
+        self.sentiment = sentiment
+
+
+class AnalysisState:
+    """Mergeable summary of a set of tweets' features.
+
+    Holds keyword counts, the total word count and the sum and squared sum of
+    the per-tweet sentiment scores, so two states can be merged and a tweet
+    can be added or removed without revisiting the others.
+    """
+
+    __slots__ = (
+        'keyword_counts', 'total_words', 'tweet_count',
+        'sentiment_sum', 'sentiment_sq_sum', 'positive_count'
+    )
+
+    def __init__(self):
+        self.keyword_counts = Counter()
+        self.total_words = 0
+        self.tweet_count = 0
+        self.sentiment_sum = 0.0
+        self.sentiment_sq_sum = 0.0
+        self.positive_count = 0
+
+    @classmethod
+    def from_features(cls, features):
+        state = cls()
+        for feature in features:
+            state.add(feature)
+        return state
+
+    def add(self, features):
+        """Fold one tweet's features into the state."""
+        self.keyword_counts.update(features.keyword_counts)
+        self.total_words += features.word_count
+        self.tweet_count += 1
+        self.sentiment_sum += features.sentiment
+        self.sentiment_sq_sum += features.sentiment * features.sentiment
+        if features.sentiment > 0:
+            self.positive_count += 1
+
+    def remove(self, features):
+        """Take a previously added tweet's features back out of the state."""
+        for keyword, count in features.keyword_counts.items():
+            remaining = self.keyword_counts[keyword] - count
+            if remaining > 0:
+                self.keyword_counts[keyword] = remaining
+            else:
+                del self.keyword_counts[keyword]
+        self.total_words -= features.word_count
+        self.tweet_count -= 1
+        self.sentiment_sum -= features.sentiment
+        self.sentiment_sq_sum -= features.sentiment * features.sentiment
+        if features.sentiment > 0:
+            self.positive_count -= 1
+
+    def merge(self, other):
+        """Return a new state covering the tweets of both states."""
+        merged = self.copy()
+        merged.keyword_counts.update(other.keyword_counts)
+        merged.total_words += other.total_words
+        merged.tweet_count += other.tweet_count
+        merged.sentiment_sum += other.sentiment_sum
+        merged.sentiment_sq_sum += other.sentiment_sq_sum
+        merged.positive_count += other.positive_count
+        return merged
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisState):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def copy(self):
+        state = AnalysisState()
+        state.keyword_counts = Counter(self.keyword_counts)
+        state.total_words = self.total_words
+        state.tweet_count = self.tweet_count
+        state.sentiment_sum = self.sentiment_sum
+        state.sentiment_sq_sum = self.sentiment_sq_sum
+        state.positive_count = self.positive_count
+        return state
+
+    @property
+    def sentiment_average(self):
+        return self.sentiment_sum / self.tweet_count if self.tweet_count > 0 else 0
+
+    @property
+    def positivity_ratio(self):
+        return self.positive_count / self.tweet_count if self.tweet_count > 0 else 0
+
+    @property
+    def sentiment_std(self):
+        """Population standard deviation of the sentiment scores, like ``np.std``."""
+        if self.tweet_count <= 0:
+            return 0
+        mean = self.sentiment_sum / self.tweet_count
+        # Clamp the rounding error left by repeated add/remove
+        return math.sqrt(max(self.sentiment_sq_sum / self.tweet_count - mean * mean, 0.0))
+
+
+class UserTimeline:
+    """A user's current reading window: tweets, their features and the merged state."""
+
+    __slots__ = ('tweets', 'features', 'state', 'pinned_id', 'lock')
+
+    def __init__(self):
+        self.tweets = {}
+        self.features = {}
+        self.state = AnalysisState()
+        self.pinned_id = ""
+        self.lock = threading.Lock()
+
+    @property
+    def newest_id(self):
+        return max(self.tweets, key=tweet_id_key, default=None)
+
+    def ordered_ids(self):
+        """The stored tweet IDs, pinned tweet first, then newest first."""
+        ordered_ids = sorted(
+            (tweet_id for tweet_id in self.tweets if tweet_id != self.pinned_id),
+            key=tweet_id_key, reverse=True
+        )
+        if self.pinned_id in self.tweets:
+            ordered_ids.insert(0, self.pinned_id)
+        return ordered_ids
+
+
+class TweetStore:
+    """Keeps each user's latest ``window`` tweets and their analysis state.
+
+    ``featurize`` turns a list of ``Tweet`` records into their
+    ``TweetFeatures``, in order; it is only given tweets the store has not
+    seen before, all of one ``ingest`` call's new tweets at once.
+    """
+
+    def __init__(self, featurize, window=50, maxsize=4096, ttl=86400):
+        self.featurize = featurize
+        self.window = window
+        self._timelines = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _timeline(self, username):
+        key = username.lower()
+        with self._lock:
+            timeline = self._timelines.get(key)
+            if timeline is None:
+                timeline = UserTimeline()
+            # Re-set on every access so active users stay in the store
+            self._timelines.set(key, timeline)
+            return timeline
+
+    def newest_id(self, username):
+        """Return the newest tweet ID stored for the user, or None."""
+        timeline = self._timelines.get(username.lower())
+        if timeline is None:
+            return None
+        with timeline.lock:
+            return timeline.newest_id
+
+    def ingest(self, username, tweets, pinned_id=None):
+        """Fold freshly fetched tweets into the user's window.
+
+        ``tweets`` are upstream tweet dicts. Only tweets not seen before are
+        turned into ``Tweet`` records and featurized; already stored records
+        just get their engagement counts refreshed. Tweets without an ID can't
+        be told apart from one fetch to the next, so they are skipped. Tweets
+        pushed out of the window are subtracted from the state.
+
+        ``pinned_id`` is the ID of the tweet pinned now ("" for none), as
+        found on the user's first page by ``pinned_tweet_id``; None leaves the
+        pinned tweet as it was. Returns the window's records (pinned tweet
+        first, then newest first) and a copy of its state.
+        """
+        timeline = self._timeline(username)
+        with timeline.lock:
+            new_tweets = {}
+            for data in tweets:
+                tweet_id = str(data.get("tweet_id") or "")
+                if not tweet_id:
+                    logger.debug("Skipping a tweet of %s with no tweet_id", username)
+                    continue
+                stored = timeline.tweets.get(tweet_id) or new_tweets.get(tweet_id)
+                if stored is not None:
+                    stored.update_engagement(data)
+                    continue
+                new_tweets[tweet_id] = Tweet.from_api(data)
+
+            # Featurized as one batch so it can be farmed out in one go
+            all_features = self.featurize(list(new_tweets.values()))
+            for (tweet_id, tweet), features in zip(new_tweets.items(), all_features):
+                timeline.features[tweet_id] = features
+                timeline.state.add(features)
+                timeline.tweets[tweet_id] = tweet
+
+            if pinned_id is not None:
+                timeline.pinned_id = pinned_id
+            ordered_ids = timeline.ordered_ids()
+            for tweet_id in ordered_ids[self.window:]:
+                timeline.state.remove(timeline.features.pop(tweet_id))
+                del timeline.tweets[tweet_id]
+
+            window_tweets = [timeline.tweets[tweet_id] for tweet_id in ordered_ids[:self.window]]
+            return window_tweets, timeline.state.copy()
+
+    def reset(self, username):
+        """Forget everything stored for the user."""
+        with self._lock:
+            self._timelines.pop(username.lower())